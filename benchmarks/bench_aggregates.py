@@ -0,0 +1,79 @@
+"""Benchmark the columnar spending aggregates against a loop over transaction dicts.
+
+Run with `python -m benchmarks.bench_aggregates`.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from nordigen_lib.aggregates import AVERAGE_DAYS, AccountColumns, merchant, transaction_columns
+
+DAYS = 730
+MERCHANTS = [f"merchant-{i}" for i in range(200)]
+REPEAT = 20
+
+
+def history(count, today):
+    return [
+        {
+            "bookingDate": (today - timedelta(days=DAYS * i // count)).isoformat(),
+            "transactionAmount": {"amount": f"{random.uniform(-200, 100):.2f}"},
+            "creditorName": random.choice(MERCHANTS),
+        }
+        for i in range(count)
+    ]
+
+
+def naive(transactions, today):
+    """Compute the sensors with a pass over the transaction dicts, as every refresh would without columns."""
+    month = today.replace(day=1).isoformat()
+    start = (today - timedelta(days=AVERAGE_DAYS - 1)).isoformat()
+    spent, outflow, merchants = 0.0, 0.0, {}
+    for transaction in transactions:
+        booked, amount = transaction["bookingDate"], float(transaction["transactionAmount"]["amount"])
+        if amount >= 0:
+            continue
+        if booked >= month:
+            spent -= amount
+        if booked >= start:
+            outflow -= amount
+            merchants[merchant(transaction)] = merchants.get(merchant(transaction), 0.0) - amount
+    top = sorted(merchants.items(), key=lambda item: item[1], reverse=True)[:5]
+    return spent, outflow / AVERAGE_DAYS, top
+
+
+def columnar(columns, today):
+    end = today.toordinal()
+    start = (today - timedelta(days=AVERAGE_DAYS - 1)).toordinal()
+    return (
+        columns.outflow(today.replace(day=1).toordinal(), end),
+        columns.outflow(start, end) / AVERAGE_DAYS,
+        columns.top_merchants(start, end),
+    )
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(*args)
+    return (time.perf_counter() - start) / REPEAT
+
+
+def main():
+    today = date.today()
+    print(f"{'transactions':>12} {'naive':>10} {'columnar':>10} {'load':>10}")
+    for count in (1_000, 10_000, 100_000, 500_000):
+        transactions = history(count, today)
+        start = time.perf_counter()
+        columns = AccountColumns()
+        columns.extend(map(transaction_columns, transactions))
+        load = time.perf_counter() - start
+        print(
+            f"{count:>12} {timed(naive, transactions, today) * 1000:>8.2f}ms "
+            f"{timed(columnar, columns, today) * 1000:>8.2f}ms {load * 1000:>8.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
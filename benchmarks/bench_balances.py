@@ -0,0 +1,73 @@
+"""Benchmark the balance parser against merging the response into a defaults dict and parsing on every read.
+
+Run with `python -m benchmarks.bench_balances`.
+"""
+
+import random
+import time
+
+from nordigen_lib.balances import DEFAULT_BALANCE_TYPES, BalanceParser
+
+RESPONSES = 10_000
+READS = 3
+OTHER_TYPES = [f"informational{i}" for i in range(8)]
+
+
+def response():
+    """Recorded-style response with every default balance type plus informational ones sensors do not show."""
+    return {
+        "balances": [
+            {
+                "balanceAmount": {"amount": f"{random.uniform(-5000, 50000):.2f}", "currency": "EUR"},
+                "balanceType": balance_type,
+                "referenceDate": "2024-03-01",
+            }
+            for balance_type in DEFAULT_BALANCE_TYPES + OTHER_TYPES
+        ]
+    }
+
+
+def merged(responses, balance_types):
+    """Merge every response into the defaults and parse the configured amounts on each sensor read."""
+    for payload in responses:
+        data = {
+            **dict.fromkeys(DEFAULT_BALANCE_TYPES),
+            **{balance["balanceType"]: balance["balanceAmount"]["amount"] for balance in payload["balances"]},
+        }
+        for _ in range(READS):
+            for balance_type in balance_types:
+                balance = data[balance_type]
+                if balance:
+                    round(float(balance), 2)
+
+
+def parsed(responses, balance_types, decimal=False):
+    """Parse every response once, sensor reads are lookups."""
+    parser = BalanceParser(balance_types, decimal=decimal)
+    for payload in responses:
+        data = parser.parse(payload["balances"])
+        for _ in range(READS):
+            for balance_type in balance_types:
+                data[balance_type]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    responses = [response() for _ in range(RESPONSES)]
+    print(f"{RESPONSES} responses, {READS} reads per sensor")
+    print(f"{'types':>6} {'merged':>10} {'parsed':>10} {'decimal':>10}")
+    for balance_types in (DEFAULT_BALANCE_TYPES[3:4], DEFAULT_BALANCE_TYPES[3:5], DEFAULT_BALANCE_TYPES):
+        print(
+            f"{len(balance_types):>6} {timed(merged, responses, balance_types) * 1000:>8.1f}ms "
+            f"{timed(parsed, responses, balance_types) * 1000:>8.1f}ms "
+            f"{timed(parsed, responses, balance_types, True) * 1000:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
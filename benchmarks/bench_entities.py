@@ -0,0 +1,104 @@
+"""Benchmark the memory of balance sensors with shared account metadata against per-sensor copies.
+
+Run with `python -m benchmarks.bench_entities`. The memory is measured once
+the sensors are built and again after Home Assistant's state write path read
+their properties, so the values the shared sensors cache count too; the copied
+ones rebuilt them on every read.
+"""
+
+import tracemalloc
+
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from nordigen_lib.account import AccountMetadata
+from nordigen_lib.sensor import DEFAULT_BALANCE_TYPES, BalanceSensor
+
+ACCOUNTS = 1_000
+ICONS = {"default": "mdi:currency-usd-circle"}
+
+
+class Coordinator:
+    pass
+
+
+class CopiedBalanceSensor(CoordinatorEntity):
+    """Balance sensor copying every account field into its own attributes, as before the shared metadata."""
+
+    def __init__(self, domain, icons, coordinator, balance_type, batched=False, **fields):
+        """Initialize the sensor."""
+        self._icons = icons
+        self._domain = domain
+        self._balance_type = balance_type
+        self._batched = batched
+        for field, value in fields.items():
+            setattr(self, f"_{field}", value)
+
+        super().__init__(coordinator)
+
+
+def account(i):
+    return {
+        "id": f"account-{i}",
+        "iban": f"NL{i:016d}",
+        "bban": f"{i:010d}",
+        "unique_ref": f"NL{i:016d}",
+        "name": f"Account {i}",
+        "owner": f"Owner {i}",
+        "currency": "EUR",
+        "product": "Current account",
+        "status": "enabled",
+        "bic": "ABNANL2A",
+        "requisition": {"reference": f"ref-{i}"},
+        "config": {},
+    }
+
+
+def copied(accounts, coordinator):
+    return [
+        CopiedBalanceSensor("nordigen", ICONS, coordinator, balance_type, **account)
+        for account in accounts
+        for balance_type in DEFAULT_BALANCE_TYPES
+    ]
+
+
+def shared(accounts, coordinator):
+    sensors = []
+    for account in accounts:
+        metadata = AccountMetadata(**account)
+        sensors.extend(
+            BalanceSensor("nordigen", ICONS, coordinator, balance_type, account=metadata)
+            for balance_type in DEFAULT_BALANCE_TYPES
+        )
+    return sensors
+
+
+def written(sensor):
+    """Read the properties the state write path reads, on sensors that retain them."""
+    if isinstance(sensor, BalanceSensor):
+        return sensor.unique_id, sensor.name, sensor.device_info, sensor.icon, sensor.state_attributes
+
+
+def measured(build, accounts):
+    coordinator = Coordinator()
+    tracemalloc.start()
+    sensors = build(accounts, coordinator)
+    built, _ = tracemalloc.get_traced_memory()
+    for sensor in sensors:
+        written(sensor)
+    read, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del sensors
+    return built, read
+
+
+def main():
+    accounts = [account(i) for i in range(ACCOUNTS)]
+    sensors = ACCOUNTS * len(DEFAULT_BALANCE_TYPES)
+    print(f"{ACCOUNTS} accounts, {sensors} sensors")
+    for label, build in (("copied", copied), ("shared", shared)):
+        built, read = measured(build, accounts)
+        print(f"{label:>8} built {built / ACCOUNTS:>6.0f}B/account, read {read / ACCOUNTS:>6.0f}B/account")
+
+
+if __name__ == "__main__":
+    main()
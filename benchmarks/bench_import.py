@@ -0,0 +1,60 @@
+"""Benchmark the cold import time of nordigen_lib against a regression budget.
+
+Run with `python -m benchmarks.bench_import`, it exits with 1 when the median
+time to import the package and build its config schema, as the integration
+does when it loads, is over BUDGET_MS.
+"""
+
+import statistics
+import subprocess
+import sys
+
+BUDGET_MS = 100
+RUNS = 5
+TOP = 10
+
+# Stand-ins for voluptuous and Home Assistant's config validation, which the integration brings itself.
+LOAD = """
+from collections import defaultdict
+from time import perf_counter
+from types import SimpleNamespace
+
+
+def stub(*args, **kwargs):
+    return args
+
+
+vol = SimpleNamespace(Schema=stub, Required=stub, Optional=stub, All=stub, Coerce=stub, Range=stub, ALLOW_EXTRA=None)
+start = perf_counter()
+import nordigen_lib
+
+nordigen_lib.config_schema(vol, SimpleNamespace(string=str, boolean=bool), defaultdict(str))
+print((perf_counter() - start) * 1000)
+"""
+
+
+def load():
+    """Load the package in a fresh interpreter, returning its milliseconds and the cumulative ones per module."""
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", LOAD], capture_output=True, check=True, text=True)
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative) / 1000
+    return float(res.stdout), times
+
+
+def main():
+    runs = [load() for _ in range(RUNS)]
+    total = statistics.median(elapsed for elapsed, _ in runs)
+    slowest = sorted(runs[-1][1].items(), key=lambda item: item[1], reverse=True)[:TOP]
+
+    for name, cumulative in slowest:
+        print(f"{cumulative:>8.1f}ms {name}")
+    print(f"nordigen_lib with its config schema {total:.1f}ms, budget {BUDGET_MS}ms")
+    return 0 if total <= BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Benchmark how many entity properties a balance sensor serves per second on the state write path.
+
+Run with `python -m benchmarks.bench_properties`.
+"""
+
+import time
+
+from nordigen_lib.sensor import BalanceSensor, snake
+
+READS = 100_000
+ACCOUNT = {
+    "id": "account-1",
+    "iban": "NL00ABNA0000000001",
+    "bban": "0000000001",
+    "unique_ref": "NL00ABNA0000000001",
+    "name": "Account",
+    "owner": "Owner",
+    "currency": "EUR",
+    "product": "Current account",
+    "status": "enabled",
+    "bic": "ABNANL2A",
+    "requisition": {"reference": "ref", "details": {"id": "ABNA", "name": "Bank"}},
+    "config": {},
+}
+ICONS = {"default": "mdi:currency-usd-circle"}
+
+
+class Coordinator:
+    data = {"interimAvailable": "100.0"}
+
+
+def uncached(sensor):
+    """Rebuild the properties on every read, as the sensor did before caching them."""
+    account = sensor._account
+    balance_type = snake(sensor._balance_type)
+    return (
+        f"{account.unique_ref}-{balance_type}",
+        f"{account.owner} {account.name} ({balance_type})",
+        dict(
+            default_manufacturer="Nordigen",
+            default_name=account.requisition.get("details", {}).get("name"),
+            identifiers={(sensor._domain, account.requisition.get("details", {}).get("id"))},
+            suggested_area="External",
+            sw_version="V2",
+        ),
+        sensor._icons.get(account.currency, sensor._icons.get("default")),
+        sensor._build_attributes(),
+    )
+
+
+def cached(sensor):
+    return sensor.unique_id, sensor.name, sensor.device_info, sensor.icon, sensor.state_attributes
+
+
+def rate(fn, sensor):
+    start = time.perf_counter()
+    for _ in range(READS):
+        fn(sensor)
+    return 5 * READS / (time.perf_counter() - start)
+
+
+def main():
+    sensor = BalanceSensor("nordigen", ICONS, Coordinator(), "interimAvailable", **ACCOUNT)
+    for label, fn in (("uncached", uncached), ("cached", cached)):
+        print(f"{label:>8} {rate(fn, sensor) / 1e6:>8.2f}M properties/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark requisition bootstrap time against requisition count.
+
+Run with `python -m benchmarks.bench_requisitions`.
+"""
+
+import logging
+import time
+from unittest.mock import MagicMock
+
+from nordigen_lib.ng import get_requisitions
+
+LATENCY = 0.05
+CONST = {"INSTITUTION_ID": "institution_id"}
+
+
+def slow(fn):
+    def wrapped(*args, **kwargs):
+        time.sleep(LATENCY)
+        return fn(*args, **kwargs)
+
+    return wrapped
+
+
+def simulated_client(count):
+    """Client where every other requisition is expired and needs a remove plus a create."""
+    client = MagicMock()
+    client.requisitions.list.return_value = {
+        "results": [
+            {"id": f"req-{i}", "status": "EX" if i % 2 else "LN", "reference": f"user-{i}"} for i in range(count)
+        ]
+    }
+    client.requisitions.remove = slow(lambda **kwargs: None)
+    client.requisitions.create = slow(lambda **kwargs: {"id": kwargs["reference"], "status": "CR", "link": "link"})
+    return client
+
+
+def run(count, workers):
+    configs = [{"enduser_id": "user", "institution_id": i} for i in range(count)]
+    client = simulated_client(count)
+    start = time.perf_counter()
+    get_requisitions(client=client, configs=configs, logger=logging.getLogger("bench"), const=CONST, workers=workers)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"latency per call: {LATENCY * 1000:.0f}ms")
+    print(f"{'requisitions':>12} {'serial':>10} {'workers=8':>10} {'workers=16':>10}")
+    for count in (1, 10, 30, 60):
+        serial, eight, sixteen = (run(count, workers) for workers in (1, 8, 16))
+        print(f"{count:>12} {serial:>9.2f}s {eight:>9.2f}s {sixteen:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark the transaction store with a million rows.
+
+Run with `python -m benchmarks.bench_store [rows]`.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from nordigen_lib.store import TransactionStore
+
+ACCOUNTS = 50
+DAYS = 730
+BATCH = 10000
+QUERIES = 100
+
+
+def transactions(account, count, start):
+    for i in range(count):
+        yield {
+            "transactionId": f"{account}-{i}",
+            "bookingDate": (start + timedelta(days=i * DAYS // count)).isoformat(),
+            "transactionAmount": {"amount": f"{random.uniform(-500, 500):.2f}", "currency": "EUR"},
+            "remittanceInformationUnstructured": "Card payment",
+        }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    res = fn(*args)
+    return time.perf_counter() - start, res
+
+
+def fill(store, rows, start):
+    per_account = rows // ACCOUNTS
+    for account in range(ACCOUNTS):
+        batch = []
+        for transaction in transactions(f"account-{account}", per_account, start):
+            batch.append(transaction)
+            if len(batch) == BATCH:
+                store.upsert(f"account-{account}", batch)
+                batch = []
+        store.upsert(f"account-{account}", batch)
+
+
+def queries(store, fn, start):
+    elapsed = []
+    for _ in range(QUERIES):
+        account = f"account-{random.randrange(ACCOUNTS)}"
+        first = start + timedelta(days=random.randrange(DAYS - 30))
+        seconds, _ = timed(fn, account, first.isoformat(), (first + timedelta(days=30)).isoformat())
+        elapsed.append(seconds)
+    elapsed.sort()
+    return elapsed[len(elapsed) // 2], elapsed[int(len(elapsed) * 0.99)]
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    start = date.today() - timedelta(days=DAYS)
+    with tempfile.TemporaryDirectory() as directory:
+        store = TransactionStore(os.path.join(directory, "transactions.db"))
+
+        seconds, _ = timed(fill, store, rows, start)
+        print(f"upsert {rows} rows over {ACCOUNTS} accounts: {seconds:.1f}s ({rows / seconds:,.0f} rows/s)")
+
+        seconds, _ = timed(store.upsert, "account-0", list(transactions("account-0", BATCH, start)))
+        print(f"re-upsert {BATCH} existing rows: {seconds * 1000:.0f}ms")
+
+        for name, fn in (("30 day range", store.range), ("30 day aggregate", store.aggregate)):
+            median, p99 = queries(store, fn, start)
+            print(f"{name:>16}: median {median * 1000:.2f}ms, p99 {p99 * 1000:.2f}ms")
+
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,54 @@
-from .ng import get_client, get_requisitions
+import importlib
+from datetime import timedelta
+
+from .aggregates import SpendingAggregates
+from .auth import TokenStore
+from .cache import DEFAULT_TTL, DetailsCache
+from .changes import DEFAULT_DEADBAND, ChangeDetector
+from .defaults import DEFAULT_ACCOUNT_WORKERS, DEFAULT_POOL_SIZE, DEFAULT_RETRIES, DEFAULT_TIMEOUT
+from .flight import SingleFlight
+from .history import DEFAULT_CAPACITY, BalanceHistory
+from .polling import RequisitionPoller
+from .scheduler import RateLimitScheduler
+from .stagger import Stagger
+from .transactions import DEFAULT_HISTORICAL_DAYS, TransactionSync
+
+# Modules pulling in nordigen, requests, aiohttp or sqlite3 are imported on first use,
+# so importing the package for its config schema stays cheap.
+LAZY_IMPORTS = {
+    "build_async_client": ".aio",
+    "config_reference": ".ng",
+    "get_client": ".ng",
+    "get_option": ".ng",
+    "get_requisitions": ".ng",
+    "reference_index": ".ng",
+    "Resilience": ".resilience",
+    "TransactionStore": ".store",
+    "PooledTransport": ".transport",
+}
+
+
+def __getattr__(name):
+    """Import the lazily exported names on first access.
+
+    The package's own functions import these names from the package too, so
+    patching `nordigen_lib.<name>` reaches them.
+    """
+    if name not in LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(LAZY_IMPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 PLATFORMS = ["sensor"]
+TOKEN_REFRESH_INTERVAL = timedelta(minutes=1)
+
+
+def optional(vol, const, name, default):
+    """Declare an optional setting under the key get_option reads it from."""
+    return vol.Optional(const.get(name, name.lower()), default=default)
 
 
 def config_schema(vol, cv, const):
@@ -11,15 +59,33 @@ def config_schema(vol, cv, const):
                     vol.Required(const["SECRET_ID"]): cv.string,
                     vol.Required(const["SECRET_KEY"]): cv.string,
                     vol.Optional(const["DEBUG"], default=False): cv.string,
+                    optional(vol, const, "ASYNC_CLIENT", False): cv.boolean,
+                    optional(vol, const, "BOOTSTRAP_WORKERS", 1): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    optional(vol, const, "POOL_SIZE", DEFAULT_POOL_SIZE): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    optional(vol, const, "TIMEOUT", DEFAULT_TIMEOUT): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    optional(vol, const, "RETRIES", DEFAULT_RETRIES): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    optional(vol, const, "DETAILS_TTL", DEFAULT_TTL): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    optional(vol, const, "DEADBAND", DEFAULT_DEADBAND): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    optional(vol, const, "HISTORY_CAPACITY", DEFAULT_CAPACITY): vol.All(
+                        vol.Coerce(int), vol.Range(min=1)
+                    ),
                     vol.Required(const["REQUISITIONS"]): [
                         {
                             vol.Required(const["ENDUSER_ID"]): cv.string,
                             vol.Required(const["INSTITUTION_ID"]): cv.string,
                             vol.Optional(const["REFRESH_RATE"], default=240): cv.string,
                             vol.Optional(const["BALANCE_TYPES"], default=[]): [cv.string],
-                            vol.Optional(const["HISTORICAL_DAYS"], default=30): cv.string,
+                            vol.Optional(const["HISTORICAL_DAYS"], default=DEFAULT_HISTORICAL_DAYS): vol.All(
+                                vol.Coerce(int), vol.Range(min=1)
+                            ),
                             vol.Optional(const["IGNORE_ACCOUNTS"], default=[]): [cv.string],
                             vol.Optional(const["ICON_FIELD"], default="mdi:currency-usd-circle"): cv.string,
+                            optional(vol, const, "ACCOUNT_WORKERS", DEFAULT_ACCOUNT_WORKERS): vol.All(
+                                vol.Coerce(int), vol.Range(min=1)
+                            ),
+                            optional(vol, const, "DECIMAL_AMOUNTS", False): cv.boolean,
+                            optional(vol, const, "SYNC_TRANSACTIONS", False): cv.boolean,
+                            optional(vol, const, "TRANSACTION_EVENTS", False): cv.boolean,
                         },
                     ],
                 },
@@ -31,31 +97,83 @@ def config_schema(vol, cv, const):
 
 
 def get_config(configs, requisition):
-    """Get the associated config."""
-    for config in configs:
-        ref = f"{config['enduser_id']}-{config['institution_id']}"
-        if requisition["reference"] == ref:
-            return config
+    """Get the associated config, `configs` may be a list or a reference_index."""
+    from . import config_reference, reference_index
+
+    if not isinstance(configs, dict):
+        configs = reference_index(configs, config_reference)
+
+    return configs.get(requisition.get("reference"))
+
+
+def setup_domain(hass, domain_config, const):
+    """Build the client and the layers shared through hass.data, returning the client; blocking."""
+    from . import PooledTransport, Resilience, TransactionStore, get_client, get_option
+
+    transport = PooledTransport(
+        pool_size=int(get_option(domain_config, const, "POOL_SIZE", DEFAULT_POOL_SIZE)),
+        timeout=float(get_option(domain_config, const, "TIMEOUT", DEFAULT_TIMEOUT)),
+    )
+    client = get_client(
+        secret_id=domain_config[const["SECRET_ID"]],
+        secret_key=domain_config[const["SECRET_KEY"]],
+        transport=transport,
+    )
+    scheduler = RateLimitScheduler()
+    transport.add_response_hook(scheduler.observe)
+    token_store = TokenStore(client=client, path=hass.config.path(".storage", "nordigen_tokens.json"))
+    hass.helpers.event.track_time_interval(token_store.refresh_ahead, TOKEN_REFRESH_INTERVAL)
+    transaction_store = TransactionStore(path=hass.config.path(".storage", "nordigen_transactions.db"))
+    hass.data[const["DOMAIN"]] = {
+        "client": client,
+        "token_store": token_store,
+        "transport": transport,
+        "scheduler": scheduler,
+        "flight": SingleFlight(),
+        "stagger": Stagger(),
+        "poller": RequisitionPoller(),
+        "transactions": TransactionSync(),
+        "transaction_store": transaction_store,
+        "aggregates": SpendingAggregates(store=transaction_store),
+        "balance_history": BalanceHistory(
+            capacity=int(get_option(domain_config, const, "HISTORY_CAPACITY", DEFAULT_CAPACITY))
+        ),
+        "changes": ChangeDetector(deadband=float(get_option(domain_config, const, "DEADBAND", DEFAULT_DEADBAND))),
+        "resilience": Resilience(retries=int(get_option(domain_config, const, "RETRIES", DEFAULT_RETRIES))),
+        "details_cache": DetailsCache(
+            path=hass.config.path(".storage", "nordigen_details.json"),
+            ttl=int(get_option(domain_config, const, "DETAILS_TTL", DEFAULT_TTL)),
+        ),
+    }
+
+    if get_option(domain_config, const, "ASYNC_CLIENT", False):
+        from . import build_async_client
+
+        async_client = build_async_client(hass=hass, client=client, timeout=transport.timeout)
+        async_client.add_response_hook(scheduler.observe)
+        hass.data[const["DOMAIN"]]["async_client"] = async_client
+
+    return client
 
 
 def entry(hass, config, const, logger):
     """Nordigen platform entry."""
+    from . import get_option, get_requisitions
+
     domain_config = config.get(const["DOMAIN"])
     if domain_config is None:
         logger.warning("Nordigen not configured")
         return True
 
     logger.debug("config: %s", config[const["DOMAIN"]])
-    client = get_client(secret_id=domain_config[const["SECRET_ID"]], secret_key=domain_config[const["SECRET_KEY"]])
-    hass.data[const["DOMAIN"]] = {
-        "client": client,
-    }
+    client = setup_domain(hass, domain_config, const)
 
     requisitions = get_requisitions(
         client=client,
         configs=domain_config[const["REQUISITIONS"]],
         logger=logger,
         const=const,
+        workers=int(get_option(domain_config, const, "BOOTSTRAP_WORKERS", 1)),
     )
 
     discovery = {
@@ -66,3 +184,26 @@ def entry(hass, config, const, logger):
         hass.helpers.discovery.load_platform(platform, const["DOMAIN"], discovery, config)
 
     return True
+
+
+async def async_entry(hass, config, const, logger):
+    """Nordigen platform entry returning before any API call.
+
+    The client and shared layers are built in the executor, requisitions are
+    reconciled by a background Bootstrap that loads the platforms for each
+    requisition as soon as it resolves.
+    """
+    from .bootstrap import Bootstrap
+
+    domain_config = config.get(const["DOMAIN"])
+    if domain_config is None:
+        logger.warning("Nordigen not configured")
+        return True
+
+    logger.debug("config: %s", config[const["DOMAIN"]])
+    bootstrap = Bootstrap()
+    client = await hass.async_add_executor_job(setup_domain, hass, domain_config, const)
+    hass.data[const["DOMAIN"]]["bootstrap"] = bootstrap
+    hass.async_create_task(bootstrap.run(hass=hass, client=client, config=config, const=const, logger=logger))
+
+    return True
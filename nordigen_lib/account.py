@@ -0,0 +1,87 @@
+"""Shared account metadata for the sensors of an account."""
+
+FIELDS = (
+    "id",
+    "iban",
+    "bban",
+    "unique_ref",
+    "name",
+    "owner",
+    "currency",
+    "product",
+    "status",
+    "bic",
+    "requisition",
+    "config",
+)
+
+
+class AccountMetadata:
+    """Account fields every sensor of an account reads.
+
+    All sensors of an account reference one instance instead of each copying
+    the fields into its own attributes. It only has slots, no per-instance
+    dict, and builds the values derived from the account alone, its device
+    info and static state attributes, once for all of its sensors.
+    """
+
+    __slots__ = FIELDS + ("_device_info", "_icon", "_static_attributes")
+    _fields = FIELDS
+
+    def __init__(self, id, iban, bban, unique_ref, name, owner, currency, product, status, bic, requisition, config):
+        """Initialize the metadata."""
+        self.id = id
+        self.iban = iban
+        self.bban = bban
+        self.unique_ref = unique_ref
+        self.name = name
+        self.owner = owner
+        self.currency = currency
+        self.product = product
+        self.status = status
+        self.bic = bic
+        self.requisition = requisition
+        self.config = config
+        self._device_info = None
+        self._icon = None
+        self._static_attributes = None
+
+    def device_info(self, domain):
+        """Return the device info of the account, the domain is the same for all of its sensors."""
+        if self._device_info is None:
+            details = self.requisition.get("details", {})
+            self._device_info = dict(
+                default_manufacturer="Nordigen",
+                default_name=details.get("name"),
+                identifiers={(domain, details.get("id"))},
+                suggested_area="External",
+                sw_version="V2",
+            )
+        return self._device_info
+
+    def icon(self, icons):
+        """Return the icon of the account's currency, the icons are the same for all of its sensors."""
+        if self._icon is None:
+            self._icon = icons.get(self.currency, icons.get("default"))
+        return self._icon
+
+    @property
+    def static_attributes(self):
+        """Return the state attributes that are the same for every sensor and update of the account."""
+        if self._static_attributes is None:
+            self._static_attributes = {
+                "iban": self.iban,
+                "unique_ref": self.unique_ref,
+                "name": self.name,
+                "owner": self.owner,
+                "product": self.product,
+                "status": self.status,
+                "bic": self.bic,
+                "reference": self.requisition["reference"],
+            }
+        return self._static_attributes
+
+
+def account_metadata(account):
+    """Return the metadata of an account dict, or account itself when it is metadata already."""
+    return account if isinstance(account, AccountMetadata) else AccountMetadata(**account)
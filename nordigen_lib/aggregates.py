@@ -0,0 +1,147 @@
+"""Columnar spending aggregates over transaction history."""
+
+import heapq
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+
+from .transactions import booking_date, transaction_id
+
+AVERAGE_DAYS = 30
+TOP_MERCHANTS = 5
+SPENDING_TYPES = ["spentThisMonth", "averageDailyOutflow"]
+
+
+MERCHANT_FIELDS = ["creditorName", "debtorName", "remittanceInformationUnstructured"]
+
+
+def merchant(transaction):
+    return next((transaction[field] for field in MERCHANT_FIELDS if transaction.get(field)), None)
+
+
+def transaction_columns(transaction):
+    """Return the (day ordinal, amount, merchant) of a transaction, None when it has no date or amount."""
+    booked = booking_date(transaction)
+    amount = (transaction.get("transactionAmount") or {}).get("amount")
+    if not booked or amount is None:
+        return None
+    return date.fromisoformat(booked[:10]).toordinal(), float(amount), merchant(transaction)
+
+
+class AccountColumns:
+    """Transaction history of one account as parallel arrays sorted by booking day.
+
+    Outflow prefix sums are rebuilt lazily after a change, so any window sum
+    is two bisects and a subtraction instead of a pass over the history.
+    """
+
+    def __init__(self):
+        """Initialize the columns."""
+        self.days = array("l")
+        self.amounts = array("d")
+        self.merchants = array("l")
+        self.ids = set()
+        self._names = []
+        self._codes = {}
+        self._outflow = None
+
+    def _code(self, name):
+        if name not in self._codes:
+            self._codes[name] = len(self._names)
+            self._names.append(name)
+        return self._codes[name]
+
+    def extend(self, rows):
+        """Add (day ordinal, amount, merchant) rows, keeping the columns sorted by day."""
+        rows = sorted(rows, key=lambda row: row[0])
+        if not rows:
+            return
+
+        if self.days and rows[0][0] < self.days[-1]:
+            names = self._names
+            rows = sorted(
+                list(zip(self.days, self.amounts, (names[code] for code in self.merchants))) + rows,
+                key=lambda row: row[0],
+            )
+            self.days, self.amounts, self.merchants = array("l"), array("d"), array("l")
+
+        self.days.extend(row[0] for row in rows)
+        self.amounts.extend(row[1] for row in rows)
+        self.merchants.extend(self._code(row[2]) for row in rows)
+        self._outflow = None
+
+    def window(self, start, end):
+        """Return the index slice of the days between start and end ordinals, inclusive."""
+        return bisect_left(self.days, start), bisect_right(self.days, end)
+
+    def outflow(self, start, end):
+        if self._outflow is None:
+            outflows = (-amount if amount < 0 else 0.0 for amount in self.amounts)
+            self._outflow = array("d", accumulate(outflows, initial=0.0))
+        lo, hi = self.window(start, end)
+        return self._outflow[hi] - self._outflow[lo]
+
+    def top_merchants(self, start, end, count=TOP_MERCHANTS):
+        lo, hi = self.window(start, end)
+        totals = {}
+        for code, amount in zip(self.merchants[lo:hi], self.amounts[lo:hi]):
+            if amount < 0:
+                totals[code] = totals.get(code, 0.0) - amount
+        top = heapq.nlargest(count, totals.items(), key=lambda item: item[1])
+        return [{"merchant": self._names[code], "amount": round(total, 2)} for code, total in top]
+
+
+class SpendingAggregates:
+    """Columnar history per account, loaded lazily from the transaction store.
+
+    New transactions are appended after they were upserted to the store, an
+    account not loaded yet picks them up from the store on first use. Ids
+    already in the columns are skipped, so a sync returning stored
+    transactions again, like the backfill after a restart, counts them once.
+    """
+
+    def __init__(self, store=None, today=date.today):
+        """Initialize the aggregates."""
+        self._store = store
+        self._today = today
+        self._lock = threading.RLock()
+        self._accounts = {}
+
+    def columns(self, account_id):
+        """Get the columns of an account, loading its history from the store on first use; blocking."""
+        with self._lock:
+            if account_id not in self._accounts:
+                columns = AccountColumns()
+                if self._store:
+                    self._extend(columns, self._store.history(account_id))
+                self._accounts[account_id] = columns
+            return self._accounts[account_id]
+
+    def _extend(self, columns, transactions):
+        new = []
+        for transaction in transactions:
+            id = transaction_id(transaction)
+            if id not in columns.ids:
+                columns.ids.add(id)
+                new.append(transaction)
+        columns.extend(filter(None, map(transaction_columns, new)))
+
+    def add(self, account_id, transactions):
+        with self._lock:
+            if account_id in self._accounts:
+                self._extend(self._accounts[account_id], transactions)
+
+    def summary(self, account_id):
+        """Aggregate the spending of an account for its sensors; blocking."""
+        today = self._today()
+        end = today.toordinal()
+        start = (today - timedelta(days=AVERAGE_DAYS - 1)).toordinal()
+        with self._lock:
+            columns = self.columns(account_id)
+            return {
+                "spentThisMonth": round(columns.outflow(today.replace(day=1).toordinal(), end), 2),
+                "averageDailyOutflow": round(columns.outflow(start, end) / AVERAGE_DAYS, 2),
+                "topMerchants": columns.top_merchants(start, end),
+            }
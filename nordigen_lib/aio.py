@@ -0,0 +1,93 @@
+"""Non-blocking client for the endpoints polled by the sensors."""
+
+from time import time
+
+import aiohttp
+
+from .defaults import DEFAULT_TIMEOUT
+
+DEFAULT_BASE_URL = "https://bankaccountdata.gocardless.com/api/v2"
+
+
+class AsyncNordigenClient:
+    """aiohttp based client for the balances, details and requisition calls.
+
+    It reuses the authentication object of the blocking client, so tokens
+    (and the TokenStore wrapping them) stay shared. Only a token exchange,
+    which is rare with proactive refreshing, is pushed to the executor.
+    """
+
+    def __init__(self, session_factory, auth, async_executor, base_url=DEFAULT_BASE_URL, timeout=DEFAULT_TIMEOUT):
+        """Initialize the client."""
+        self._session_factory = session_factory
+        self._auth = auth
+        self._async_executor = async_executor
+        self._base_url = base_url
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._hooks = []
+        self.account = AsyncAccountClient(self)
+        self.requisitions = AsyncRequisitionsClient(self)
+
+    def add_response_hook(self, hook):
+        """Call hook(response) for every response, e.g. to read rate limit headers."""
+        self._hooks.append(hook)
+
+    def token_valid(self):
+        expiration = getattr(self._auth, "_token_expiration", None)
+        return bool(expiration and expiration >= time())
+
+    async def headers(self):
+        if self.token_valid():
+            # Built from the valid token itself: get_headers goes through the TokenStore's lock, which a refresh
+            # holds while it waits on the network.
+            return {"Authorization": f"Bearer {self._auth._access_token}"}
+
+        return await self._async_executor(self._auth.get_headers)
+
+    async def get(self, fragment, params=None):
+        session = self._session_factory()
+        headers = await self.headers()
+        async with session.get(
+            f"{self._base_url}/{fragment}/", params=params, headers=headers, timeout=self._timeout
+        ) as response:
+            for hook in self._hooks:
+                hook(response)
+
+            response.raise_for_status()
+            return await response.json()
+
+
+class AsyncAccountClient:
+    def __init__(self, client):
+        """Initialize the account endpoints."""
+        self._client = client
+
+    async def balances(self, id):
+        return await self._client.get(f"accounts/{id}/balances")
+
+    async def details(self, id):
+        return await self._client.get(f"accounts/{id}/details")
+
+    async def transactions(self, id, date_from):
+        return await self._client.get(f"accounts/{id}/transactions", params={"date_from": date_from})
+
+
+class AsyncRequisitionsClient:
+    def __init__(self, client):
+        """Initialize the requisition endpoints."""
+        self._client = client
+
+    async def by_id(self, id):
+        return await self._client.get(f"requisitions/{id}")
+
+
+def build_async_client(hass, client, timeout=DEFAULT_TIMEOUT):
+    """Build an async client on Home Assistant's shared aiohttp session."""
+    from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+    return AsyncNordigenClient(
+        session_factory=lambda: async_get_clientsession(hass),
+        auth=client.account.get_authentication_method(),
+        async_executor=hass.async_add_executor_job,
+        timeout=timeout,
+    )
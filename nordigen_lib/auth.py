@@ -0,0 +1,79 @@
+"""Persistent, proactively refreshed tokens for the Nordigen OAuth authentication."""
+
+import threading
+from time import time
+
+from .cache import atomic_write_json, read_json
+
+REFRESH_MARGIN = 5 * 60
+
+TOKEN_FIELDS = {
+    "access": "_access_token",
+    "access_expiration": "_token_expiration",
+    "refresh": "_refresh_token",
+    "refresh_expiration": "_refresh_expiration",
+}
+
+
+class TokenStore:
+    """Keep the client's access and refresh tokens on disk.
+
+    Every sub-client of a `get_client` instance shares one authentication
+    object, so wrapping it here covers every caller of the shared client.
+    Tokens are loaded on first use, written back whenever they change and
+    `refresh_ahead` renews the access token before it expires so requests
+    never wait on a token exchange.
+    """
+
+    def __init__(self, client, path, margin=REFRESH_MARGIN, clock=time):
+        """Initialize the token store."""
+        self._auth = client.account.get_authentication_method()
+        self._path = path
+        self._margin = margin
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._refresh = self._auth.refresh_token
+        self._auth.refresh_token = self.refresh_token
+
+    def tokens(self):
+        return {key: getattr(self._auth, attr) for key, attr in TOKEN_FIELDS.items()}
+
+    def load(self):
+        """Restore tokens from disk unless the refresh token has already expired."""
+        self._loaded = True
+        tokens = read_json(self._path, default={})
+        if (tokens.get("refresh_expiration") or 0) <= self._clock():
+            return False
+
+        for key, attr in TOKEN_FIELDS.items():
+            setattr(self._auth, attr, tokens.get(key))
+        return True
+
+    def save(self):
+        atomic_write_json(self._path, self.tokens())
+
+    def refresh_token(self):
+        """Authenticate when needed, persisting any new tokens."""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+            before = self.tokens()
+            self._refresh()
+            if self.tokens() != before:
+                self.save()
+        return True
+
+    def refresh_ahead(self, *args):
+        """Renew the access token when it expires within the margin."""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+
+            expiration = self._auth._token_expiration
+            if expiration and expiration - self._clock() > self._margin:
+                return False
+
+            self._auth._token_expiration = None
+            return self.refresh_token()
@@ -0,0 +1,50 @@
+"""Parse balance responses once into the values the sensors show."""
+
+from decimal import Decimal
+
+DEFAULT_BALANCE_TYPES = [
+    "expected",
+    "closingBooked",
+    "openingBooked",
+    "interimAvailable",
+    "interimBooked",
+    "forwardAvailable",
+    "nonInvoiced",
+]
+
+CENT = Decimal("0.01")
+
+
+def float_amount(amount):
+    return round(float(amount), 2)
+
+
+def decimal_amount(amount):
+    return Decimal(str(amount)).quantize(CENT)
+
+
+class BalanceParser:
+    """Project balance responses onto the configured balance types.
+
+    The result starts as a copy of a dict prefilled with None for every
+    configured type, amounts of other types are skipped. Amounts are
+    converted and rounded to cents once per response, as floats or, with
+    `decimal`, as exact Decimals, so sensors show them as they are.
+    """
+
+    def __init__(self, balance_types=DEFAULT_BALANCE_TYPES, decimal=False):
+        """Initialize the parser."""
+        self._template = dict.fromkeys(balance_types)
+        self._convert = decimal_amount if decimal else float_amount
+
+    def parse(self, balances):
+        """Get the converted amount of every configured balance type in balances, None when missing."""
+        data = self._template.copy()
+        for balance in balances:
+            balance_type = balance["balanceType"]
+            if balance_type in data:
+                data[balance_type] = self._convert(balance["balanceAmount"]["amount"])
+        return data
+
+
+DEFAULT_PARSER = BalanceParser()
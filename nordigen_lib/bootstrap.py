@@ -0,0 +1,86 @@
+"""Background requisition bootstrap for the async entry."""
+
+import asyncio
+import functools
+from time import monotonic
+
+from . import PLATFORMS
+from .ng import get_option, index_requisitions, process_requisition
+
+RETRY_DELAY = 60
+
+
+class Bootstrap:
+    """Reconcile requisitions in the background, loading the platforms per requisition as it resolves.
+
+    Every blocking API call runs in the executor, at most BOOTSTRAP_WORKERS
+    at once. `metrics` counts the requisitions resolved and failed, the runs
+    that raised in `errors`, and keeps the seconds from the start of the
+    entry until the first entity was added in `time_to_first_entity`. A run
+    that raised is retried after RETRY_DELAY seconds, requisitions already
+    loaded are not loaded again.
+    """
+
+    def __init__(self, clock=monotonic, retry_delay=RETRY_DELAY):
+        """Initialize the bootstrap."""
+        self._clock = clock
+        self._started = clock()
+        self._retry_delay = retry_delay
+        self._loaded = set()
+        self.metrics = {"requisitions": 0, "resolved": 0, "failed": 0, "errors": 0, "time_to_first_entity": None}
+
+    def entity_added(self):
+        """Record the time to the first entity, called by entities once added to Home Assistant."""
+        if self.metrics["time_to_first_entity"] is None:
+            self.metrics["time_to_first_entity"] = self._clock() - self._started
+
+    async def run(self, hass, client, config, const, logger):
+        """Run the bootstrap, scheduling another run when it fails."""
+        try:
+            await self._run(hass, client, config, const, logger)
+        except Exception as err:
+            self.metrics["errors"] += 1
+            logger.error("Nordigen bootstrap failed, retrying in %s seconds: %s", self._retry_delay, err)
+
+            async def retry(_now):
+                await self.run(hass, client, config, const, logger)
+
+            hass.helpers.event.async_call_later(self._retry_delay, retry)
+
+    async def _run(self, hass, client, config, const, logger):
+        domain_config = config[const["DOMAIN"]]
+        configs = domain_config[const["REQUISITIONS"]]
+        self.metrics.update(requisitions=len(configs), failed=0)
+        requisitions = await hass.async_add_executor_job(index_requisitions, client, configs, logger)
+        workers = asyncio.Semaphore(int(get_option(domain_config, const, "BOOTSTRAP_WORKERS", 1)))
+
+        async def resolve(requisition_config):
+            process = functools.partial(
+                process_requisition,
+                client=client,
+                config=requisition_config,
+                requisitions=requisitions,
+                logger=logger,
+                const=const,
+            )
+            async with workers:
+                return await hass.async_add_executor_job(process)
+
+        for resolved in asyncio.as_completed([resolve(requisition_config) for requisition_config in configs]):
+            await self._load(hass, await resolved, config, const)
+
+        logger.info("Nordigen bootstrap finished: %s", self.metrics)
+
+    async def _load(self, hass, requisition, config, const):
+        if not requisition:
+            self.metrics["failed"] += 1
+            return
+        if requisition["id"] in self._loaded:
+            return
+
+        for platform in PLATFORMS:
+            await hass.helpers.discovery.async_load_platform(
+                platform, const["DOMAIN"], {"requisitions": [requisition]}, config
+            )
+        self._loaded.add(requisition["id"])
+        self.metrics["resolved"] += 1
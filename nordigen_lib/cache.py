@@ -0,0 +1,81 @@
+"""Persistent on-disk cache for account details."""
+
+import json
+import os
+import tempfile
+import threading
+from time import time
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+def read_json(path, default=None):
+    """Read a JSON file, returning the default when it is missing or unreadable."""
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return default
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file (mode 0600) and move it over path in one step."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            json.dump(data, fh)
+        os.replace(tmp, path)
+    except BaseException:
+        # Also on a value that is not serializable or an interrupt, never leave the temp file behind.
+        os.unlink(tmp)
+        raise
+
+
+class DetailsCache:
+    """JSON file backed cache keyed by account id.
+
+    Entries older than `ttl` seconds are treated as missing. The file is
+    read lazily on first use and every write replaces it atomically, so a
+    crash mid-write never leaves a truncated cache behind.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL, clock=time):
+        """Initialize the cache."""
+        self._path = path
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = None
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = read_json(self._path, default={})
+        return self._entries
+
+    def _save(self):
+        atomic_write_json(self._path, self._entries)
+
+    def get(self, key):
+        """Get a fresh entry, None when missing or expired."""
+        with self._lock:
+            entry = self._load().get(key)
+
+        if not entry or self._clock() - entry["stored"] > self._ttl:
+            return None
+
+        return entry["value"]
+
+    def set(self, key, value):
+        with self._lock:
+            self._load()[key] = {"stored": self._clock(), "value": value}
+            self._save()
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when no key is given."""
+        with self._lock:
+            entries = self._load()
+            if key is None:
+                entries.clear()
+            else:
+                entries.pop(key, None)
+            self._save()
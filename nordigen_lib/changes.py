@@ -0,0 +1,51 @@
+"""Change detection to skip redundant entity state writes."""
+
+import hashlib
+import json
+import numbers
+from decimal import Decimal
+
+DEFAULT_DEADBAND = 0.0
+
+
+def content_hash(value):
+    """Hash any JSON-like value independent of key order."""
+    return hashlib.blake2b(json.dumps(value, sort_keys=True, default=str).encode(), digest_size=16).digest()
+
+
+def is_number(value):
+    return isinstance(value, (numbers.Real, Decimal)) and not isinstance(value, bool)
+
+
+class ChangeDetector:
+    """Tell whether a key's value changed since it was last written.
+
+    Numbers within the deadband of the last written value count as unchanged,
+    anything else is compared by content hash. Counters keep the writes let
+    through and the ones suppressed.
+    """
+
+    def __init__(self, deadband=DEFAULT_DEADBAND):
+        """Initialize the change detector."""
+        self._deadband = deadband
+        self._last = {}
+        self.counters = {"writes": 0, "suppressed": 0}
+
+    def _fingerprint(self, value):
+        return value if is_number(value) else content_hash(value)
+
+    def _same(self, last, fingerprint):
+        if is_number(last) and is_number(fingerprint):
+            return abs(fingerprint - last) <= self._deadband
+        return last == fingerprint
+
+    def changed(self, key, value):
+        """Record value for key and return whether it should be written."""
+        fingerprint = self._fingerprint(value)
+        if key in self._last and self._same(self._last[key], fingerprint):
+            self.counters["suppressed"] += 1
+            return False
+
+        self._last[key] = fingerprint
+        self.counters["writes"] += 1
+        return True
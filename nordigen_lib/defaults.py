@@ -0,0 +1,6 @@
+"""Defaults of the settings, free of dependencies so the config schema can be built without the clients."""
+
+DEFAULT_ACCOUNT_WORKERS = 4
+DEFAULT_RETRIES = 3
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30.0
@@ -0,0 +1,86 @@
+"""Single-flight coalescing of identical in-flight API calls."""
+
+import asyncio
+import functools
+import threading
+
+
+class _Call:
+    def __init__(self):
+        """Initialize the in-flight call."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Share one call, and its result or error, between concurrent callers of the same key.
+
+    Blocking and coroutine calls are tracked separately, a key is only
+    coalesced while its call is in flight and nothing is cached after.
+    """
+
+    def __init__(self):
+        """Initialize the single-flight group."""
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+        self.counters = {"hits": 0, "misses": 0}
+
+    def _join(self, calls, key, start):
+        """Return the in-flight call of key and whether the caller leads it."""
+        with self._lock:
+            if key in calls:
+                self.counters["hits"] += 1
+                return calls[key], False
+
+            self.counters["misses"] += 1
+            calls[key] = start()
+            return calls[key], True
+
+    def _leave(self, calls, key):
+        with self._lock:
+            calls.pop(key, None)
+
+    def call(self, key, fn, *args, **kwargs):
+        call, leader = self._join(self._calls, key, _Call)
+        if not leader:
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            self._leave(self._calls, key)
+            call.done.set()
+
+        return call.result
+
+    async def async_call(self, key, fn, *args, **kwargs):
+        task, leader = self._join(self._tasks, key, lambda: asyncio.ensure_future(fn(*args, **kwargs)))
+        if leader:
+            task.add_done_callback(lambda _: self._leave(self._tasks, key))
+
+        # Shielded so a cancelled caller does not cancel the call for the others.
+        return await asyncio.shield(task)
+
+    def wrap(self, endpoint, fn):
+        """Wrap fn so concurrent calls with the same arguments share one call to `endpoint`."""
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapped(*args):
+                return await self.async_call((endpoint, *args), fn, *args)
+
+            return async_wrapped
+
+        @functools.wraps(fn)
+        def wrapped(*args):
+            return self.call((endpoint, *args), fn, *args)
+
+        return wrapped
@@ -0,0 +1,112 @@
+"""In-memory balance history in fixed-capacity ring buffers."""
+
+from array import array
+from time import time
+
+DEFAULT_CAPACITY = 1024
+DAY = 24 * 60 * 60
+
+
+class RingBuffer:
+    """Timestamps and amounts in two preallocated typed arrays.
+
+    Appending overwrites the oldest record once full, so memory stays at
+    16 bytes per record. Timestamps are appended in order, which lets
+    windowed reads bisect to their first record.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        """Initialize the ring buffer."""
+        self._capacity = capacity
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        """Return the number of records."""
+        return self._size
+
+    def _at(self, i):
+        return (self._start + i) % self._capacity
+
+    def append(self, timestamp, value):
+        end = self._at(self._size)
+        self._times[end] = timestamp
+        self._values[end] = value
+        if self._size < self._capacity:
+            self._size += 1
+        else:
+            self._start = self._at(1)
+
+    def _first_since(self, since):
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._times[self._at(mid)] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(self, since):
+        """Get the (timestamp, amount) records from since on, oldest first."""
+        indexes = [self._at(i) for i in range(self._first_since(since), self._size)]
+        return [(self._times[i], self._values[i]) for i in indexes]
+
+    def delta(self, since):
+        """Get the change of the amount since the first record at or after since, None without records."""
+        first = self._first_since(since)
+        if first == self._size:
+            return None
+        return self._values[self._at(self._size - 1)] - self._values[self._at(first)]
+
+    def trend(self, since):
+        """Get the least squares slope of the amount per day since since, None with fewer than two records."""
+        records = self.window(since)
+        if len(records) < 2:
+            return None
+
+        t0 = records[0][0]
+        xs = [(timestamp - t0) / DAY for timestamp, _ in records]
+        ys = [value for _, value in records]
+        mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+        variance = sum((x - mean_x) ** 2 for x in xs)
+        if not variance:
+            return None
+        return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+class BalanceHistory:
+    """Ring buffer per account and balance type, filled by the balance updates."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, clock=time):
+        """Initialize the balance history."""
+        self._capacity = capacity
+        self._clock = clock
+        self._buffers = {}
+
+    def record(self, account_id, balances):
+        now = self._clock()
+        for balance_type, amount in balances.items():
+            if amount is None:
+                continue
+            key = (account_id, balance_type)
+            if key not in self._buffers:
+                self._buffers[key] = RingBuffer(self._capacity)
+            self._buffers[key].append(now, float(amount))
+
+    def buffer(self, account_id, balance_type):
+        return self._buffers.get((account_id, balance_type))
+
+    def attributes(self, account_id, balance_type):
+        """Get the delta and trend attributes of a balance, empty without history."""
+        buffer = self.buffer(account_id, balance_type)
+        if not buffer:
+            return {}
+
+        now = self._clock()
+        return {
+            "delta_24h": buffer.delta(now - DAY),
+            "trend_7d": buffer.trend(now - 7 * DAY),
+        }
@@ -1,16 +1,53 @@
-import requests
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+
+from apiclient.exceptions import APIClientError
 
 from nordigen import wrapper as Client
+from .transport import PooledTransport
+
+REQUISITION_PAGE_SIZE = 100
+
 
+def get_client(transport=None, **kwargs):
+    return (transport or PooledTransport()).attach(Client(**kwargs))
 
-def get_client(**kwargs):
-    return Client(**kwargs)
+
+def get_option(config, const, name, default=None):
+    """Get an optional setting, falling back to the lower cased name when not in const."""
+    return config.get(const.get(name, name.lower()), default)
 
 
 def get_reference(enduser_id, institution_id, *args, **kwargs):
     return f"{enduser_id}-{institution_id}"
 
 
+def config_reference(config):
+    return get_reference(**config)
+
+
+def requisition_reference(requisition):
+    return requisition.get("reference")
+
+
+def reference_index(items, key, logger=None, index=None):
+    """Index items by reference, the first item wins when a reference is duplicated."""
+    index = {} if index is None else index
+    duplicates = set()
+    for item in items:
+        ref = key(item)
+        if ref in index:
+            duplicates.add(ref)
+            continue
+        index[ref] = item
+
+    if duplicates and logger:
+        logger.warning("Duplicate references found, using the first match: %s", sorted(duplicates))
+
+    return index
+
+
 def unique_ref(id, account):
     for key in ["iban", "bban", "resourceId"]:
         val = account.get(key)
@@ -19,30 +56,101 @@ def unique_ref(id, account):
     return id
 
 
-def get_requisitions(client, configs, logger, const):
-    """Get requisitions."""
-    requisitions = []
+def map_concurrent(fn, items, workers=1):
+    """Map fn over items using up to `workers` threads, keeping the input order."""
+    items = list(items)
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(items))) as executor:
+        return list(executor.map(fn, items))
+
+
+def next_offset(url):
+    """Get the offset of the next page from the pagination url."""
+    if not url:
+        return None
+
+    offset = parse_qs(urlparse(url).query).get("offset")
+    return int(offset[0]) if offset else None
+
+
+def iter_requisition_pages(client, limit=REQUISITION_PAGE_SIZE):
+    """Follow the pagination cursor, yielding the results of each page as it arrives."""
+    offset = None
+    while True:
+        page = client.requisitions.list(limit=limit, offset=offset)
+        yield page["results"]
+
+        offset = next_offset(page.get("next"))
+        if offset is None:
+            return
+
+
+def iter_requisitions(client, references=None, limit=REQUISITION_PAGE_SIZE):
+    """Lazily list requisitions.
+
+    When `references` is given the listing stops as soon as every one of
+    them has been seen, skipping the remaining pages.
+    """
+    pending = set(references or [])
+    for results in iter_requisition_pages(client, limit=limit):
+        for requisition in results:
+            yield requisition
+
+            pending.discard(requisition_reference(requisition))
+            if references is not None and not pending:
+                return
+
+
+def index_requisitions(client, configs, logger):
+    """Index the existing requisitions of the configs by reference, empty when they can not be listed."""
+    references = {config_reference(config) for config in configs}
+    requisitions = {}
     try:
-        requisitions = client.requisitions.list()["results"]
-    except (requests.exceptions.HTTPError, KeyError) as error:
+        matched = (
+            requisition
+            for requisition in iter_requisitions(client, references=references)
+            if requisition_reference(requisition) in references
+        )
+        reference_index(matched, requisition_reference, logger=logger, index=requisitions)
+    except (APIClientError, KeyError) as error:
         logger.error("Unable to fetch Nordigen requisitions: %s", error)
 
-    processed = []
-    for config in configs:
-        processed.append(
-            get_or_create_requisition(
-                fn_create=client.requisitions.create,
-                fn_remove=client.requisitions.remove,
-                fn_info=client.requisitions.by_id,
-                requisitions=requisitions,
-                reference=get_reference(**config),
-                institution_id=config[const["INSTITUTION_ID"]],
-                logger=logger,
-                config=config,
-            )
-        )
+    return requisitions
+
+
+def get_requisitions(client, configs, logger, const, workers=1):
+    """Get requisitions.
 
-    return processed
+    With `workers` > 1 the configs are reconciled concurrently, results are
+    still returned in config order and a failing config is logged and skipped.
+    """
+    requisitions = index_requisitions(client, configs, logger)
+
+    def process(config):
+        return process_requisition(client=client, config=config, requisitions=requisitions, logger=logger, const=const)
+
+    processed = map_concurrent(process, configs, workers=workers)
+    return [requisition for requisition in processed if requisition]
+
+
+def process_requisition(client, config, requisitions, logger, const):
+    """Reconcile a single config, logging instead of raising so other configs are unaffected."""
+    reference = config_reference(config)
+    try:
+        return get_or_create_requisition(
+            fn_create=client.requisitions.create,
+            fn_remove=client.requisitions.remove,
+            fn_info=client.requisitions.by_id,
+            requisitions=requisitions,
+            reference=reference,
+            institution_id=config[const["INSTITUTION_ID"]],
+            logger=logger,
+            config=config,
+        )
+    except Exception as error:
+        logger.error("Unable to setup Nordigen requisition %s: %s", reference, error)
 
 
 def get_or_create_requisition(fn_create, fn_remove, fn_info, requisitions, reference, institution_id, logger, config):
@@ -86,33 +194,102 @@ def get_or_create_requisition(fn_create, fn_remove, fn_info, requisitions, refer
     return requisition
 
 
-def get_accounts(fn, requisition, logger, ignored):
-    accounts = []
+def wanted_accounts(requisition, logger, ignored):
+    account_ids = []
     for account_id in requisition.get("accounts", []):
         if account_id in ignored:
             logger.info("Account ignored due to configuration :%s", account_id)
             continue
 
-        accounts.append(
-            get_account(
+        account_ids.append(account_id)
+    return account_ids
+
+
+def get_accounts(fn, requisition, logger, ignored, workers=1, cache=None):
+    """Get account details, fetching up to `workers` accounts at once."""
+    account_ids = wanted_accounts(requisition=requisition, logger=logger, ignored=ignored)
+
+    def fetch(account_id):
+        return get_account(
+            fn=fn,
+            id=account_id,
+            requisition=requisition,
+            logger=logger,
+            cache=cache,
+        )
+
+    accounts = map_concurrent(fetch, account_ids, workers=workers)
+    return [account for account in accounts if account]
+
+
+async def async_get_accounts(fn, requisition, logger, ignored, async_executor, workers=1, cache=None):
+    """Get account details from an async `fn`, awaiting up to `workers` accounts at once.
+
+    Cache reads and writes touch the disk so they go through `async_executor`.
+    """
+    semaphore = asyncio.Semaphore(max(workers, 1))
+
+    async def fetch(account_id):
+        async with semaphore:
+            return await async_get_account(
                 fn=fn,
                 id=account_id,
                 requisition=requisition,
                 logger=logger,
+                async_executor=async_executor,
+                cache=cache,
             )
-        )
+
+    account_ids = wanted_accounts(requisition=requisition, logger=logger, ignored=ignored)
+    accounts = await asyncio.gather(*[fetch(account_id) for account_id in account_ids])
     return [account for account in accounts if account]
 
 
-def get_account(fn, id, requisition, logger):
+def get_account_details(fn, id, cache=None):
+    """Get the account details, served from the cache while it is fresh."""
+    account = cache.get(id) if cache else None
+    if account is None:
+        account = fn(id).get("account", {})
+        if cache:
+            cache.set(id, account)
+
+    return account
+
+
+async def async_get_account_details(fn, id, async_executor, cache=None):
+    """Async variant of get_account_details."""
+    account = await async_executor(cache.get, id) if cache else None
+    if account is None:
+        account = (await fn(id)).get("account", {})
+        if cache:
+            await async_executor(cache.set, id, account)
+
+    return account
+
+
+def get_account(fn, id, requisition, logger, cache=None):
     account = {}
     try:
-        account = fn(id)
-        account = account.get("account", {})
+        account = get_account_details(fn=fn, id=id, cache=cache)
     except Exception as error:
         logger.error("Unable to fetch account details from Nordigen: %s", error)
         return
 
+    return build_account(id=id, account=account, requisition=requisition, logger=logger)
+
+
+async def async_get_account(fn, id, requisition, logger, async_executor, cache=None):
+    account = {}
+    try:
+        account = await async_get_account_details(fn=fn, id=id, async_executor=async_executor, cache=cache)
+    except Exception as error:
+        logger.error("Unable to fetch account details from Nordigen: %s", error)
+        return
+
+    return build_account(id=id, account=account, requisition=requisition, logger=logger)
+
+
+def build_account(id, account, requisition, logger):
     if not account.get("iban"):
         logger.warn("No iban: %s | %s", requisition, account)
 
@@ -134,10 +311,14 @@ def get_account(fn, id, requisition, logger):
     return account
 
 
+def get_transactions(client, id, date_from):
+    """Fetch the transactions of an account booked since date_from, `client` is the account client."""
+    return client.get(client.url(fragment=f"accounts/{id}/transactions"), params={"date_from": date_from})
+
+
 def matched_requisition(ref, requisitions):
-    """Get the requisition for current ref."""
-    for requisition in requisitions:
-        if requisition["reference"] == ref:
-            return requisition
+    """Get the requisition for current ref, `requisitions` may be a list or a reference_index."""
+    if not isinstance(requisitions, dict):
+        requisitions = reference_index(requisitions, requisition_reference)
 
-    return {}
+    return requisitions.get(ref) or {}
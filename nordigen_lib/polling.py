@@ -0,0 +1,69 @@
+"""Adaptive polling of requisitions that are waiting to be linked."""
+
+from datetime import timedelta
+
+FAST_INTERVAL = timedelta(seconds=15)
+LINKED_INTERVAL = timedelta(seconds=120)
+MAX_INTERVAL = timedelta(hours=1)
+BACKOFF_FACTOR = 2
+
+LINKED = "LN"
+# Nothing will change any more, a new requisition is created on the next setup.
+TERMINAL = ["EX", "SU", "RJ"]
+
+
+class RequisitionPoller:
+    """Back off polling of unchanged requisitions and pause terminal ones.
+
+    A requisition waiting for the user starts at the fast interval and doubles
+    it on every poll where its status did not change, up to the maximum. Any
+    status change, such as the user starting the link flow, snaps it back to
+    fast polling. Per requisition counters keep the polls saved against the
+    fixed fast loop.
+    """
+
+    def __init__(self, fast=FAST_INTERVAL, linked=LINKED_INTERVAL, maximum=MAX_INTERVAL, factor=BACKOFF_FACTOR):
+        """Initialize the poller."""
+        self._fast = fast
+        self._linked = linked
+        self._maximum = maximum
+        self._factor = factor
+        self._status = {}
+        self._unchanged = {}
+        self.counters = {}
+
+    def _backoff(self, requisition_id, status):
+        if self._status.get(requisition_id) == status:
+            self._unchanged[requisition_id] += 1
+        else:
+            self._unchanged[requisition_id] = 0
+        self._status[requisition_id] = status
+
+        return min(self._fast * self._factor ** self._unchanged[requisition_id], self._maximum)
+
+    def interval(self, requisition_id, status):
+        """Record a poll of requisition_id and return the interval until the next one, None to pause."""
+        self._unchanged.setdefault(requisition_id, 0)
+        counters = self.counters.setdefault(requisition_id, {"polls": 0, "saved": 0, "paused": False})
+        counters["polls"] += 1
+
+        if status in TERMINAL:
+            counters["paused"] = True
+            return None
+
+        interval = self._backoff(requisition_id, status)
+        if status == LINKED:
+            interval = self._linked
+
+        counters["saved"] += int(interval / self._fast) - 1
+        return interval
+
+    def wrap(self, coordinator, updater, requisition_id):
+        """Wrap a requisition coordinator update method to set the next interval from its status."""
+
+        async def update():
+            data = await updater()
+            coordinator.update_interval = self.interval(requisition_id, data.get("status"))
+            return data
+
+        return update
@@ -0,0 +1,186 @@
+"""Retries with jittered backoff and per-institution circuit breakers."""
+
+import asyncio
+import functools
+import random
+import threading
+import time
+
+import aiohttp
+import requests
+from apiclient.exceptions import ServerError, UnexpectedError
+
+from .defaults import DEFAULT_RETRIES
+
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 300
+
+RETRYABLE_ERRORS = (
+    ServerError,
+    UnexpectedError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    aiohttp.ClientConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an institution whose circuit is open."""
+
+
+def is_retryable(error):
+    """Server side and connection errors are worth retrying, client errors are not."""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+
+    return isinstance(error, aiohttp.ClientResponseError) and error.status >= 500
+
+
+def backoff_delays(retries, base, cap, rand=random.uniform):
+    """Full jitter exponential backoff delays."""
+    return [rand(0, min(cap, base * 2**attempt)) for attempt in range(retries)]
+
+
+class CircuitBreaker:
+    """Open after `threshold` consecutive failures, let one trial call through after `reset_timeout`."""
+
+    def __init__(self, threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT, clock=time.time):
+        """Initialize the circuit breaker."""
+        self._threshold = threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+
+        return "half_open" if self._clock() - self.opened_at >= self._reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            if self.state != "half_open":
+                return self.state == "closed"
+
+            # Let a single trial call through, the rest wait for its outcome.
+            self.opened_at = self._clock()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self._threshold:
+                self.opened_at = self._clock()
+
+
+class Resilience:
+    """Shared retry policy and circuit breakers keyed by institution.
+
+    `wrap` works for both blocking and coroutine functions. Counters are
+    exposed so an outage can be shown to cost almost no calls.
+    """
+
+    def __init__(
+        self,
+        retries=DEFAULT_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        threshold=DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout=DEFAULT_RESET_TIMEOUT,
+        clock=time.time,
+    ):
+        """Initialize the resilience layer."""
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._threshold = threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "short_circuits": 0}
+
+    def breaker(self, key):
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(
+                    threshold=self._threshold, reset_timeout=self._reset_timeout, clock=self._clock
+                )
+            return self._breakers[key]
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _before(self, key):
+        breaker = self.breaker(key)
+        if not breaker.allow():
+            self._count("short_circuits")
+            raise CircuitOpenError(f"Circuit open for {key}")
+
+        self._count("calls")
+        return breaker, backoff_delays(self._retries, self._backoff, self._max_backoff) + [None]
+
+    def _on_error(self, breaker, error, delay):
+        """Record a failed attempt, re-raising when it should not be retried."""
+        retryable = is_retryable(error)
+        if delay is None or not retryable:
+            self._count("failures")
+            if retryable:
+                breaker.record_failure()
+            raise error
+
+        self._count("retries")
+
+    def call(self, key, fn, *args, **kwargs):
+        breaker, delays = self._before(key)
+        for delay in delays:
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as error:
+                self._on_error(breaker, error, delay)
+                time.sleep(delay)
+                continue
+
+            breaker.record_success()
+            return result
+
+    async def async_call(self, key, fn, *args, **kwargs):
+        breaker, delays = self._before(key)
+        for delay in delays:
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as error:
+                self._on_error(breaker, error, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            return result
+
+    def wrap(self, key, fn):
+        """Wrap fn so every call goes through the breaker of `key` and the retry policy."""
+        if asyncio.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapped(*args, **kwargs):
+                return await self.async_call(key, fn, *args, **kwargs)
+
+            return async_wrapped
+
+        @functools.wraps(fn)
+        def wrapped(*args, **kwargs):
+            return self.call(key, fn, *args, **kwargs)
+
+        return wrapped
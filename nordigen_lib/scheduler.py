@@ -0,0 +1,100 @@
+"""Rate limit aware scheduling of account refreshes."""
+
+import re
+import threading
+from datetime import timedelta
+from time import time
+
+ACCOUNT_URL = re.compile(r"/accounts/(?:premium/)?([^/]+)/(balances|details|transactions)/")
+REMAINING_HEADER = "x-ratelimit-account-success-remaining"
+RESET_HEADER = "x-ratelimit-account-success-reset"
+
+
+def header(headers, name):
+    """Get a rate limit header, accepting both `X-Foo-Bar` and `HTTP_X_FOO_BAR` spellings."""
+    for key, value in headers.items():
+        key = key.lower().replace("_", "-")
+        if key.startswith("http-"):
+            key = key[5:]
+        if key == name:
+            return value
+
+
+class RateLimitScheduler:
+    """Track the remaining daily budget per account and endpoint.
+
+    `observe` is registered as a response hook and records the budget from
+    the rate limit headers. `wrap` spreads a coordinator's refreshes evenly
+    over the time left until the budget resets and serves the last data
+    instead of calling the API once the budget is down to the reserve.
+    """
+
+    def __init__(self, reserve=1, clock=time):
+        """Initialize the scheduler."""
+        self._reserve = reserve
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._budgets = {}
+        self.deferred = 0
+
+    def observe(self, response):
+        match = ACCOUNT_URL.search(str(response.url))
+        remaining = header(response.headers, REMAINING_HEADER)
+        reset = header(response.headers, RESET_HEADER)
+        if not match or remaining is None or reset is None:
+            return
+
+        self.record(match.group(1), match.group(2), int(remaining), int(reset))
+
+    def record(self, account_id, endpoint, remaining, reset):
+        with self._lock:
+            self._budgets[(account_id, endpoint)] = (remaining, self._clock() + reset)
+
+    def budget(self, account_id, endpoint):
+        """Get (remaining, seconds until reset), None when unknown or already reset."""
+        with self._lock:
+            budget = self._budgets.get((account_id, endpoint))
+
+        if not budget or budget[1] <= self._clock():
+            return None
+
+        return budget[0], budget[1] - self._clock()
+
+    def allow(self, account_id, endpoint):
+        budget = self.budget(account_id, endpoint)
+        return budget is None or budget[0] > self._reserve
+
+    def interval(self, account_id, endpoint, default):
+        """Get the refresh interval that makes the remaining budget last until it resets."""
+        budget = self.budget(account_id, endpoint)
+        if budget is None:
+            return default
+
+        remaining, reset = budget
+        spread = timedelta(seconds=reset / max(remaining - self._reserve, 1))
+        return max(default, spread)
+
+    def guard(self, updater, account_id, endpoint, last):
+        """Wrap updater to serve last() instead of calling once the budget is down to the reserve."""
+
+        async def update():
+            data = last()
+            if data is not None and not self.allow(account_id, endpoint):
+                self.deferred += 1
+                return data
+
+            return await updater()
+
+        return update
+
+    def pace(self, coordinator, updater, account_ids, endpoint, default):
+        """Wrap updater to stretch the coordinator interval to the tightest budget of its accounts."""
+
+        async def update():
+            data = await updater()
+            coordinator.update_interval = max(
+                [self.interval(account_id, endpoint, default) for account_id in account_ids] + [default]
+            )
+            return data
+
+        return update
@@ -1,27 +1,28 @@
 """Platform for sensor integration."""
+
+import asyncio
+import functools
 import random
 import re
 from datetime import datetime, timedelta
 
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity, DataUpdateCoordinator, UpdateFailed
 
-from .ng import get_accounts
-
-pattern = re.compile(r"(?<!^)(?=[A-Z])")
+from .account import account_metadata
+from .aggregates import SPENDING_TYPES, SpendingAggregates
+from .balances import DEFAULT_BALANCE_TYPES, DEFAULT_PARSER, BalanceParser
+from .defaults import DEFAULT_ACCOUNT_WORKERS
+from .ng import async_get_accounts, get_accounts, get_option, get_transactions
+from .polling import RequisitionPoller
+from .transactions import DEFAULT_HISTORICAL_DAYS, TRANSACTION_INTERVAL
 
-DEFAULT_BALANCE_TYPES = [
-    "expected",
-    "closingBooked",
-    "openingBooked",
-    "interimAvailable",
-    "interimBooked",
-    "forwardAvailable",
-    "nonInvoiced",
-]
+SPENDING_INTERVAL = timedelta(hours=1)
 
 
+@functools.lru_cache(maxsize=None)
 def snake(name):
-    return pattern.sub("_", name).lower()
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
 
 
 def random_balance(*args, **kwargs):
@@ -47,42 +48,131 @@ def random_balance(*args, **kwargs):
     }
 
 
-def balance_update(logger, async_executor, fn, account_id):
-    """Fetch latest information."""
+def get_api(hass, const):
+    """Get the async client when enabled, otherwise the blocking client."""
+    data = hass.data[const["DOMAIN"]]
+    return data.get("async_client") or data["client"]
+
+
+def resilient(hass, const, config, fn):
+    """Route fn through the shared retry policy and the circuit breaker of the config's institution."""
+    resilience = hass.data[const["DOMAIN"]].get("resilience")
+    if not resilience:
+        return fn
+
+    return resilience.wrap(get_option(config, const, "INSTITUTION_ID"), fn)
+
+
+def coalesced(hass, const, endpoint, fn):
+    """Share concurrent identical calls to endpoint through the single-flight group."""
+    flight = hass.data[const["DOMAIN"]].get("flight")
+    if not flight:
+        return fn
+
+    return flight.wrap(endpoint, fn)
+
+
+async def call_api(async_executor, fn, *args):
+    """Await async API functions directly, run blocking ones in the executor."""
+    if asyncio.iscoroutinefunction(fn):
+        return await fn(*args)
+
+    return await async_executor(fn, *args)
+
+
+def balance_update(logger, async_executor, fn, account_id, history=None, parser=DEFAULT_PARSER):
+    """Fetch latest information, recording it in the balance history when given."""
 
     async def update():
         logger.debug("Getting balance for account :%s", account_id)
         try:
-            data = (await async_executor(fn, account_id))["balances"]
+            data = (await call_api(async_executor, fn, account_id))["balances"]
         except Exception as err:
             raise UpdateFailed(f"Error updating Nordigen sensors: {err}")
 
-        data = {
-            **{
-                "closingBooked": None,
-                "expected": None,
-                "openingBooked": None,
-                "interimAvailable": None,
-                "interimBooked": None,
-                "forwardAvailable": None,
-                "nonInvoiced": None,
-            },
-            **{balance["balanceType"]: balance["balanceAmount"]["amount"] for balance in data},
-        }
+        data = parser.parse(data)
 
         logger.debug("balance for %s : %s", account_id, data)
+        if history:
+            history.record(account_id, data)
+        return data
+
+    return update
+
+
+def batch_update(logger, updaters):
+    """Run the updaters of several accounts concurrently, keyed by account id.
+
+    An account that fails keeps its previous data and is logged, the update
+    only fails when every account does. The updaters are read on every run.
+    """
+    last = {}
+
+    async def update():
+        account_ids = list(updaters)
+        gathered = await asyncio.gather(*[updaters[account_id]() for account_id in account_ids], return_exceptions=True)
+        results = dict(zip(account_ids, gathered))
+        errors = {account_id: result for account_id, result in results.items() if isinstance(result, Exception)}
+        for account_id, err in errors.items():
+            logger.warning("Unable to update %s, keeping its previous data: %s", account_id, err)
+        if errors and len(errors) == len(results):
+            raise UpdateFailed(f"Error updating Nordigen sensors: {next(iter(errors.values()))}")
+
+        # Accounts removed from the updaters drop out of the data.
+        data = {account_id: last[account_id] for account_id in errors if account_id in last}
+        data.update({account_id: result for account_id, result in results.items() if account_id not in errors})
+        last.clear()
+        last.update(data)
         return data
 
     return update
 
 
+async def restore_cursor(async_executor, sync, account_id, store):
+    """Seed the sync cursor of an account from the store once, so a restart does not fetch the whole window."""
+    if store and not sync.restored(account_id):
+        await async_executor(sync.restore, account_id, store)
+
+
+def persist(store, record, account_id, transactions):
+    """Store new transactions and hand them to `record`; blocking."""
+    if store:
+        store.upsert(account_id, transactions)
+    if record:
+        record(account_id, transactions)
+
+
+def transaction_update(logger, async_executor, fn, account_id, sync, historical_days, publish, store=None, record=None):
+    """Fetch the transactions booked since the account's cursor, then store, record and publish the new ones.
+
+    Storing and `record` run together in one executor job, `publish` runs on the event loop.
+    """
+
+    async def update():
+        await restore_cursor(async_executor, sync, account_id, store)
+        date_from = sync.date_from(account_id, historical_days)
+        try:
+            payload = await call_api(async_executor, fn, account_id, date_from)
+        except Exception as err:
+            raise UpdateFailed(f"Error syncing Nordigen transactions: {err}")
+
+        new = sync.merge(account_id, payload, date_from)
+        logger.debug("%s new transactions for %s since %s", len(new), account_id, date_from)
+        if new and (store or record):
+            await async_executor(persist, store, record, account_id, new)
+        publish(account_id, new)
+        return new
+
+    return update
+
+
 def requisition_update(logger, async_executor, fn, requisition_id):
     """Fetch latest information."""
 
     async def update():
         logger.debug("Getting requisition for account :%s", requisition_id)
         try:
-            data = await async_executor(fn, requisition_id)
+            data = await call_api(async_executor, fn, requisition_id)
         except Exception as err:
             raise UpdateFailed(f"Error updating Nordigen sensors: {err}")
 
@@ -92,69 +182,339 @@ def requisition_update(logger, async_executor, fn, requisition_id):
     return update
 
 
-def build_coordinator(hass, logger, updater, interval, reference):
+def build_coordinator(hass, logger, updater, interval, reference, always_update=False):
     return DataUpdateCoordinator(
         hass,
         logger,
         name=f"nordigen-balance-{reference}",
         update_method=updater,
         update_interval=interval,
+        # Unless always_update, listeners are only notified when the fetched data differs from the previous refresh.
+        always_update=always_update,
     )
 
 
+def state_changed(entity, value):
+    """Whether the entity's value changed enough since its last write to be written again."""
+    changes = entity.hass.data[entity._domain].get("changes")
+    return not changes or changes.changed(entity.unique_id, value)
+
+
+async def first_refresh(hass, const, coordinator, key, interval, spread=True):
+    """Run the first refresh, in the background at the key's staggered offset when staggered.
+
+    The staggered refresh does not hold up the platform setup, so offsets do not add up
+    across requisitions; the entities report no state until it completes.
+    """
+    stagger = hass.data[const["DOMAIN"]].get("stagger")
+    if not stagger:
+        await coordinator.async_config_entry_first_refresh()
+        return
+
+    if spread:
+        coordinator.update_method = stagger.spread(coordinator, coordinator.update_method, key, interval)
+
+    async def delayed():
+        await stagger.delay(key, interval)
+        await coordinator.async_refresh()
+
+    hass.async_create_task(delayed())
+
+
 def get_balance_types(logger, config, field, defaults=DEFAULT_BALANCE_TYPES):
     ret = [balance_type for balance_type in config.get(field) or defaults]
     logger.debug("configured balance types: %s", ret)
     return ret
 
 
-async def build_account_sensors(hass, logger, account, const, debug):
-    fn = random_balance if debug else hass.data[const["DOMAIN"]]["client"].account.balances
+def balance_parser(logger, account, const):
+    """Build the parser projecting balance responses onto the account's configured balance types."""
+    return BalanceParser(
+        balance_types=get_balance_types(logger=logger, config=account["config"], field=const["BALANCE_TYPES"]),
+        decimal=get_option(account["config"], const, "DECIMAL_AMOUNTS", False),
+    )
+
+
+def balance_fn(hass, const, account, debug):
+    if debug:
+        return random_balance
+
+    return coalesced(
+        hass, const, "balances", resilient(hass, const, account["config"], get_api(hass, const).account.balances)
+    )
+
+
+def build_balance_sensors(logger, account, const, coordinator, **kwargs):
+    """Build a sensor per balance type, all sharing the account's metadata."""
+    account = account_metadata(account)
+    balance_types = get_balance_types(logger=logger, config=account.config, field=const["BALANCE_TYPES"])
+
+    entities = []
+    for balance_type in balance_types:
+        entities.append(
+            BalanceSensor(
+                domain=const["DOMAIN"],
+                icons=const["ICON"],
+                balance_type=balance_type,
+                coordinator=coordinator,
+                account=account,
+                **kwargs,
+            )
+        )
+
+    return entities
+
+
+def account_updater(hass, logger, account, const, debug, scheduler, last):
     updater = balance_update(
         logger=logger,
         async_executor=hass.async_add_executor_job,
-        fn=fn,
+        fn=balance_fn(hass, const, account, debug),
         account_id=account["id"],
+        history=hass.data[const["DOMAIN"]].get("balance_history"),
+        parser=balance_parser(logger, account, const),
     )
-    interval = timedelta(minutes=int(account["config"][const["REFRESH_RATE"]]))
-    balance_coordinator = build_coordinator(
-        hass=hass, logger=logger, updater=updater, interval=interval, reference=account.get("unique_ref")
+    if scheduler:
+        return scheduler.guard(updater, account["id"], "balances", last)
+    return updater
+
+
+class AccountBatch:
+    """The balance updaters of a requisition's accounts and the one coordinator refreshing them.
+
+    Accounts discovered later join the coordinator of the first ones and
+    removed accounts leave it, so each requisition keeps a single coordinator.
+    """
+
+    def __init__(self):
+        """Initialize the batch."""
+        self.updaters = {}
+        self.coordinator = None
+
+    def last(self, account_id):
+        return lambda: (self.coordinator.data or {}).get(account_id)
+
+    def remove(self, account_id):
+        self.updaters.pop(account_id, None)
+
+
+async def batch_coordinator(hass, logger, accounts, const, batch):
+    """Build the coordinator of the batch and run its first refresh."""
+    scheduler = hass.data[const["DOMAIN"]].get("scheduler")
+    updater = batch_update(logger=logger, updaters=batch.updaters)
+    interval = timedelta(minutes=int(accounts[0]["config"][const["REFRESH_RATE"]]))
+    coordinator = build_coordinator(
+        hass=hass, logger=logger, updater=updater, interval=interval, reference=accounts[0]["requisition"]["reference"]
     )
+    if scheduler:
+        # The updaters are read on every tick, so accounts joining later are paced too.
+        coordinator.update_method = scheduler.pace(coordinator, updater, batch.updaters, "balances", interval)
 
-    await balance_coordinator.async_config_entry_first_refresh()
+    batch.coordinator = coordinator
+    await first_refresh(hass, const, coordinator, accounts[0]["requisition"]["reference"], interval)
 
-    logger.debug("listeners: %s", balance_coordinator._listeners)
 
-    balance_types = get_balance_types(logger=logger, config=account["config"], field=const["BALANCE_TYPES"])
+async def build_batch_account_sensors(hass, logger, accounts, const, debug, batch=None):
+    """Build the balance sensors of a requisition's accounts on the batch's shared coordinator."""
+    batch = batch or AccountBatch()
+    scheduler = hass.data[const["DOMAIN"]].get("scheduler")
+    for account in accounts:
+        batch.updaters[account["id"]] = account_updater(
+            hass, logger, account, const, debug, scheduler, batch.last(account["id"])
+        )
+
+    if batch.coordinator:
+        await batch.coordinator.async_request_refresh()
+    else:
+        await batch_coordinator(hass, logger, accounts, const, batch)
 
+    metadata = [account_metadata(account) for account in accounts]
     entities = []
-    for balance_type in balance_types:
+    for account in metadata:
+        entities.extend(
+            build_balance_sensors(
+                logger=logger, account=account, const=const, coordinator=batch.coordinator, batched=True
+            )
+        )
+
+    entities.extend(await build_spending_sensors(hass, logger, accounts, const, metadata=metadata))
+
+    return entities
+
+
+def transactions_fn(hass, const, config):
+    data = hass.data[const["DOMAIN"]]
+    if data.get("async_client"):
+        fn = data["async_client"].account.transactions
+    else:
+        fn = functools.partial(get_transactions, data["client"].account)
+    return coalesced(hass, const, "transactions", resilient(hass, const, config, fn))
+
+
+def transaction_updater(hass, logger, account, const, sync, scheduler, publish, record=None):
+    updater = transaction_update(
+        logger=logger,
+        async_executor=hass.async_add_executor_job,
+        fn=transactions_fn(hass, const, account["config"]),
+        account_id=account["id"],
+        sync=sync,
+        historical_days=get_option(account["config"], const, "HISTORICAL_DAYS", DEFAULT_HISTORICAL_DAYS),
+        publish=publish,
+        store=hass.data[const["DOMAIN"]].get("transaction_store"),
+        record=record,
+    )
+    if scheduler:
+        return scheduler.guard(updater, account["id"], "transactions", list)
+    return updater
+
+
+def logged(logger, update):
+    """Run update from a timer, logging a failed update instead of raising it."""
+
+    async def run(*args):
+        try:
+            await update()
+        except UpdateFailed as err:
+            logger.warning("%s", err)
+
+    return run
+
+
+def spending_update(async_executor, aggregates, account_ids):
+    """Aggregate the spending of the accounts in the executor, keyed by account id."""
+
+    def job():
+        return {account_id: aggregates.summary(account_id) for account_id in account_ids}
+
+    async def update():
+        return await async_executor(job)
+
+    return update
+
+
+def transaction_sync(hass, logger, accounts, const, publish, record=None):
+    """Build the update syncing the transactions of the accounts."""
+    data = hass.data[const["DOMAIN"]]
+    updaters = {}
+    for account in accounts:
+        updaters[account["id"]] = transaction_updater(
+            hass, logger, account, const, data["transactions"], data.get("scheduler"), publish, record
+        )
+
+    return logged(logger, batch_update(logger=logger, updaters=updaters))
+
+
+def share_release(entities, unsubscribe):
+    """Hand the entities a release callback that unsubscribes once the last of them was removed."""
+    remaining = [len(entities)]
+
+    def release():
+        remaining[0] -= 1
+        if not remaining[0]:
+            unsubscribe()
+
+    for entity in entities:
+        entity._release = release
+    return entities
+
+
+def build_spending_entities(accounts, const, coordinator):
+    entities = []
+    for account in map(account_metadata, accounts):
+        for spending_type in SPENDING_TYPES:
+            entities.append(
+                SpendingSensor(
+                    domain=const["DOMAIN"],
+                    icons=const["ICON"],
+                    balance_type=spending_type,
+                    coordinator=coordinator,
+                    batched=True,
+                    account=account,
+                )
+            )
         entities.append(
-            BalanceSensor(
+            TopMerchantsSensor(
                 domain=const["DOMAIN"],
                 icons=const["ICON"],
-                balance_type=balance_type,
-                coordinator=balance_coordinator,
-                **account,
+                balance_type="topMerchants",
+                coordinator=coordinator,
+                batched=True,
+                account=account,
             )
         )
 
     return entities
 
 
+async def build_spending_sensors(hass, logger, accounts, const, metadata=None):
+    """Sync the transactions of the accounts on an interval and build their spending sensors.
+
+    The sensors share the accounts' `metadata` when given, else it is built from the accounts.
+    """
+    data = hass.data[const["DOMAIN"]]
+    if not data.get("transactions") or not get_option(accounts[0]["config"], const, "SYNC_TRANSACTIONS", False):
+        return []
+
+    aggregates = data.get("aggregates") or SpendingAggregates(store=data.get("transaction_store"))
+    reference = f"{accounts[0]['requisition']['reference']}-spending"
+    coordinator = build_coordinator(
+        hass=hass,
+        logger=logger,
+        updater=spending_update(hass.async_add_executor_job, aggregates, [account["id"] for account in accounts]),
+        interval=SPENDING_INTERVAL,
+        reference=reference,
+    )
+
+    events = get_option(accounts[0]["config"], const, "TRANSACTION_EVENTS", False)
+
+    def publish(account_id, transactions):
+        for transaction in transactions if events else []:
+            hass.bus.async_fire(f"{const['DOMAIN']}_transaction", {"account_id": account_id, **transaction})
+
+    # Aggregating takes the aggregates' lock and re-sorts, so it runs in the executor along with storing.
+    refresh = transaction_sync(hass, logger, accounts, const, publish, record=aggregates.add)
+
+    async def sync(*args):
+        await refresh()
+        await coordinator.async_request_refresh()
+
+    unsubscribe = hass.helpers.event.async_track_time_interval(sync, TRANSACTION_INTERVAL)
+    hass.async_create_task(sync())
+    await first_refresh(hass, const, coordinator, reference, SPENDING_INTERVAL)
+
+    # The sync timer stops once the last spending sensor sharing it is removed.
+    return share_release(build_spending_entities(metadata or accounts, const, coordinator), unsubscribe)
+
+
 async def build_requisition_sensor(hass, logger, requisition, const, debug):
     updater = requisition_update(
         logger=logger,
         async_executor=hass.async_add_executor_job,
-        fn=hass.data[const["DOMAIN"]]["client"].requisitions.by_id,
+        fn=coalesced(
+            hass,
+            const,
+            "requisitions",
+            resilient(hass, const, requisition["config"], get_api(hass, const).requisitions.by_id),
+        ),
         requisition_id=requisition["id"],
     )
     interval = timedelta(seconds=15)
+    # Every refresh reaches the sensor, even with an unchanged payload, so accounts whose setup failed are retried;
+    # the sensor itself only writes its state when it changed.
     coordinator = build_coordinator(
-        hass=hass, logger=logger, updater=updater, interval=interval, reference=requisition.get("reference")
+        hass=hass,
+        logger=logger,
+        updater=updater,
+        interval=interval,
+        reference=requisition.get("reference"),
+        always_update=True,
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    poller = hass.data[const["DOMAIN"]].get("poller") or RequisitionPoller()
+    coordinator.update_method = poller.wrap(coordinator, updater, requisition["id"])
+
+    # The poller sets the interval from the status, only the first refresh is staggered.
+    await first_refresh(hass, const, coordinator, requisition["id"], interval, spread=False)
 
     logger.debug("listeners: %s", coordinator._listeners)
 
@@ -163,8 +523,12 @@ async def build_requisition_sensor(hass, logger, requisition, const, debug):
             domain=const["DOMAIN"],
             icons=const["ICON"],
             coordinator=coordinator,
-            client=hass.data[const["DOMAIN"]]["client"],
+            client=get_api(hass, const),
+            details_cache=hass.data[const["DOMAIN"]].get("details_cache"),
+            resilience=hass.data[const["DOMAIN"]].get("resilience"),
+            flight=hass.data[const["DOMAIN"]].get("flight"),
             ignored_accounts=requisition["config"][const["IGNORE_ACCOUNTS"]],
+            account_workers=int(get_option(requisition["config"], const, "ACCOUNT_WORKERS", DEFAULT_ACCOUNT_WORKERS)),
             logger=logger,
             const=const,
             debug=debug,
@@ -203,7 +567,15 @@ class RequisitionSensor(CoordinatorEntity):
         self._debug = kwargs.get("debug", False)
         self._config = kwargs["config"]
         self._details = kwargs["details"]
+        self._account_workers = kwargs.get("account_workers", 1)
+        self._details_cache = kwargs.get("details_cache")
+        self._resilience = kwargs.get("resilience")
+        self._flight = kwargs.get("flight")
         self._account_sensors = {}
+        self._account_entities = {}
+        self._batch = AccountBatch()
+        self._discovered = []
+        self._discovering = False
 
         super().__init__(coordinator)
 
@@ -228,7 +600,7 @@ class RequisitionSensor(CoordinatorEntity):
     @property
     def state(self):
         """Return the sensor state."""
-        return self.coordinator.data.get("status") == "LN"
+        return (self.coordinator.data or {}).get("status") == "LN"
 
     def _requisition(self):
         return {
@@ -243,20 +615,93 @@ class RequisitionSensor(CoordinatorEntity):
 
         return job
 
-    async def _setup_account_sensors(self, client, accounts, ignored):
-        accounts = await self.hass.async_add_executor_job(
-            self.do_job(
-                fn=client.account.details,
-                requisition={
-                    "id": self._id,
-                    "accounts": accounts,
-                },
-                logger=self._logger,
-                ignored=ignored,
-            )
+    async def _fetch_accounts(self, client, accounts, ignored):
+        fn = client.account.details
+        if self._resilience:
+            fn = self._resilience.wrap(get_option(self._config, self._const, "INSTITUTION_ID"), fn)
+        if self._flight:
+            fn = self._flight.wrap("details", fn)
+
+        kwargs = dict(
+            fn=fn,
+            requisition={
+                "id": self._id,
+                "accounts": accounts,
+            },
+            logger=self._logger,
+            ignored=ignored,
+            workers=self._account_workers,
+            cache=self._details_cache,
         )
+        if asyncio.iscoroutinefunction(fn):
+            return await async_get_accounts(async_executor=self.hass.async_add_executor_job, **kwargs)
+
+        return await self.hass.async_add_executor_job(self.do_job(**kwargs))
+
+    def _linked_accounts(self):
+        if not self.state:
+            return []
+        return (self.coordinator.data or {}).get("accounts") or []
+
+    async def async_added_to_hass(self):
+        """Discover the accounts of the first refresh once added."""
+        await super().async_added_to_hass()
+        bootstrap = self.hass.data[self._domain].get("bootstrap")
+        if bootstrap:
+            bootstrap.entity_added()
+        self._schedule_discovery()
+
+    @callback
+    def _handle_coordinator_update(self):
+        self._schedule_discovery()
+        if state_changed(self, self._fingerprint()):
+            super()._handle_coordinator_update()
+
+    def _fingerprint(self):
+        data = self.coordinator.data or {}
+        return {"status": data.get("status"), "accounts": data.get("accounts")}
+
+    def _schedule_discovery(self):
+        """Start account discovery when the linked accounts differ from the ones with sensors."""
+        accounts = self._linked_accounts()
+        if self._discovering or set(accounts) == set(self._discovered):
+            return
+
+        added = [account for account in accounts if account not in self._discovered]
+        removed = [account for account in self._discovered if account not in accounts]
+        self._discovering = True
+        self.hass.async_create_task(self._discover(added, removed))
+
+    async def _remove_accounts(self, accounts):
+        for account_id in accounts:
+            self._batch.remove(account_id)
+            for entity in self._account_entities.pop(account_id, []):
+                self._account_sensors.pop(entity._account.unique_ref, None)
+                await entity.async_remove()
+
+    async def _discover(self, added, removed):
+        """Remove and set up account sensors, an account only counts as discovered once its sensors exist."""
+        try:
+            await self._remove_accounts(removed)
+            self._discovered = [account for account in self._discovered if account not in removed]
+            if added:
+                settled = await self._setup_account_sensors(
+                    client=self._client, accounts=added, ignored=self._ignored_accounts
+                )
+                self._discovered += [account for account in added if account in settled]
+        except Exception as err:
+            # Accounts not discovered yet are retried on the next coordinator update.
+            self._logger.warning("Unable to discover accounts of %s: %s", self._reference, err)
+        finally:
+            self._discovering = False
+
+    async def _setup_account_sensors(self, client, accounts, ignored):
+        """Set up the sensors of new accounts, returning the ids of the accounts settled: set up or ignored."""
+        settled = [account for account in accounts if account in ignored]
+        accounts = await self._fetch_accounts(client=client, accounts=accounts, ignored=ignored)
+        settled += [account["id"] for account in accounts]
         self._logger.debug(accounts)
-        entities = []
+        new_accounts = []
         for account in accounts:
             self._logger.debug("account: %s", account)
 
@@ -264,23 +709,29 @@ class RequisitionSensor(CoordinatorEntity):
                 continue
 
             self._account_sensors[account["unique_ref"]] = True
-            entities.extend(
-                await build_account_sensors(
-                    hass=self.hass,
-                    logger=self._logger,
-                    const=self._const,
-                    debug=self._debug,
-                    account={
-                        **account,
-                        "config": self._config,
-                        "requisition": self._requisition(),
-                    },
-                )
+            new_accounts.append(
+                {
+                    **account,
+                    "config": self._config,
+                    "requisition": self._requisition(),
+                }
             )
 
-        if entities:
+        if new_accounts:
+            entities = await build_batch_account_sensors(
+                hass=self.hass,
+                logger=self._logger,
+                const=self._const,
+                debug=self._debug,
+                accounts=new_accounts,
+                batch=self._batch,
+            )
+            for entity in entities:
+                self._account_entities.setdefault(entity._id, []).append(entity)
             await self.platform.async_add_entities(entities)
 
+        return settled
+
     @property
     def state_attributes(self):
         """Return State attributes."""
@@ -296,23 +747,15 @@ class RequisitionSensor(CoordinatorEntity):
         state = {
             "link": self._link,
             "info": info,
-            "accounts": self.coordinator.data.get("accounts"),
-            "status": self.coordinator.data.get("status"),
+            "accounts": (self.coordinator.data or {}).get("accounts"),
+            "status": (self.coordinator.data or {}).get("status"),
             "last_update": datetime.now(),
         }
 
-        seconds = (120 if self.coordinator.data.get("status") == "LN" else 15)
-        self.coordinator.update_interval = timedelta(seconds=seconds)
-
         if self.state:
             del state["info"]
             del state["link"]
 
-            sensor_job = self._setup_account_sensors(
-                client=self._client, accounts=self.coordinator.data.get("accounts"), ignored=self._ignored_accounts
-            )
-            self.hass.add_job(sensor_job)
-
         return state
 
     @property
@@ -327,61 +770,43 @@ class RequisitionSensor(CoordinatorEntity):
 
 
 class BalanceSensor(CoordinatorEntity):
-    """Nordigen Balance Sensor."""
+    """Nordigen Balance Sensor.
 
-    def __init__(
-        self,
-        domain,
-        icons,
-        coordinator,
-        id,
-        iban,
-        bban,
-        unique_ref,
-        name,
-        owner,
-        currency,
-        product,
-        status,
-        bic,
-        requisition,
-        balance_type,
-        config,
-    ):
+    The account fields live in a shared AccountMetadata, given as `account`
+    or built from the account fields. The values derived from the account
+    alone are cached once on it for all of its sensors, the unique id and
+    name on first read and the state attributes once per coordinator
+    update, so reads on the state write path are lookups.
+    """
+
+    def __init__(self, domain, icons, coordinator, balance_type, account=None, batched=False, **fields):
         """Initialize the sensor."""
         self._icons = icons
         self._domain = domain
         self._balance_type = balance_type
-        self._id = id
-        self._iban = iban
-        self._bban = bban
-        self._unique_ref = unique_ref
-        self._name = name
-        self._owner = owner
-        self._currency = currency
-        self._product = product
-        self._status = status
-        self._bic = bic
-        self._requisition = requisition
-        self._config = config
+        self._account = account_metadata(account or fields)
+        self._batched = batched
+        self._attributes = None
+        self._unique_id = None
+        self._name = None
 
         super().__init__(coordinator)
 
+    @property
+    def _id(self):
+        return self._account.id
+
     @property
     def device_info(self):
         """Return device information."""
-        return dict(
-            default_manufacturer="Nordigen",
-            default_name=self._requisition.get("details", {}).get("name"),
-            identifiers={(self._domain, self._requisition.get("details", {}).get("id"))},
-            suggested_area="External",
-            sw_version="V2",
-        )
+        return self._account.device_info(self._domain)
 
     @property
     def unique_id(self):
         """Return the ID of the sensor."""
-        return f"{self._unique_ref}-{self.balance_type}"
+        if self._unique_id is None:
+            self._unique_id = f"{self._account.unique_ref}-{self.balance_type}"
+        return self._unique_id
 
     @property
     def balance_type(self):
@@ -391,48 +816,111 @@ class BalanceSensor(CoordinatorEntity):
     @property
     def name(self):
         """Return the name of the sensor."""
-        if self._owner and self._name:
-            return f"{self._owner} {self._name} ({self.balance_type})"
+        if self._name is None:
+            self._name = self._build_name(self.balance_type)
+        return self._name
+
+    def _build_name(self, balance_type):
+        account = self._account
+        if account.owner and account.name:
+            return f"{account.owner} {account.name} ({balance_type})"
 
-        if self._name:
-            return f"{self._name} {self._unique_ref} ({self.balance_type})"
+        if account.name:
+            return f"{account.name} {account.unique_ref} ({balance_type})"
 
-        return f"{self._unique_ref} ({self.balance_type})"
+        return f"{account.unique_ref} ({balance_type})"
 
     @property
     def state(self):
-        """Return the sensor state."""
-        if not self.coordinator.data[self._balance_type]:
+        """Return the sensor state, parsed from the response by the balance update."""
+        return self._balance()
+
+    @callback
+    def _handle_coordinator_update(self):
+        if state_changed(self, self._fingerprint()):
+            self._attributes = None
+            super()._handle_coordinator_update()
+
+    def _fingerprint(self):
+        return self.state
+
+    def _balance(self):
+        data = self.coordinator.data
+        if data is None:
+            # No refresh yet, the first one is staggered.
             return None
-        return round(float(self.coordinator.data[self._balance_type]), 2)
+        if self._batched:
+            return (data.get(self._id) or {}).get(self._balance_type)
+
+        return data[self._balance_type]
 
     @property
     def state_attributes(self):
-        """Return State attributes."""
+        """Return State attributes, built once per coordinator update."""
+        if self._attributes is None:
+            self._attributes = self._build_attributes()
+        return self._attributes
+
+    def _build_attributes(self):
         return {
             "balance_type": self._balance_type,
-            "iban": self._iban,
-            "unique_ref": self._unique_ref,
-            "name": self._name,
-            "owner": self._owner,
-            "product": self._product,
-            "status": self._status,
-            "bic": self._bic,
-            "reference": self._requisition["reference"],
+            **self._account.static_attributes,
             "last_update": datetime.now(),
+            **self._history_attributes(),
         }
 
+    def _history_attributes(self):
+        history = self.hass.data[self._domain].get("balance_history") if self.hass else None
+        return history.attributes(self._id, self._balance_type) if history else {}
+
     @property
     def unit_of_measurement(self):
         """Return the unit of measurement."""
-        return self._currency
+        return self._account.currency
 
     @property
     def icon(self):
         """Return the entity icon."""
-        return self._icons.get(self._currency, self._icons.get("default"))
+        return self._account.icon(self._icons)
 
     @property
     def available(self) -> bool:
         """Return True when account is enabled."""
         return True
+
+
+class SpendingSensor(BalanceSensor):
+    """Spending aggregate of an account's synced transactions."""
+
+    def __init__(self, release=None, **kwargs):
+        """Initialize the sensor."""
+        self._release = release
+
+        super().__init__(**kwargs)
+
+    async def async_will_remove_from_hass(self):
+        """Release the transaction sync timer shared with the other spending sensors."""
+        await super().async_will_remove_from_hass()
+        if self._release:
+            self._release()
+
+
+class TopMerchantsSensor(SpendingSensor):
+    """Merchants an account spent the most at over the last 30 days."""
+
+    @property
+    def state(self):
+        """Return the sensor state."""
+        merchants = self._balance() or []
+        return merchants[0]["merchant"] if merchants else None
+
+    def _fingerprint(self):
+        return self._balance()
+
+    def _build_attributes(self):
+        return {**super()._build_attributes(), "merchants": self._balance() or []}
+
+    @property
+    def unit_of_measurement(self):
+        """Return the unit of measurement."""
+        return None
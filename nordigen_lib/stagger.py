@@ -0,0 +1,48 @@
+"""Staggered, jittered refresh schedule across accounts."""
+
+import asyncio
+import random
+import zlib
+from datetime import timedelta
+
+DEFAULT_STARTUP_WINDOW = timedelta(seconds=60)
+DEFAULT_JITTER = 0.1
+
+
+def stable_fraction(key):
+    """Map key onto [0, 1) the same way on every restart."""
+    return zlib.crc32(str(key).encode()) / 2**32
+
+
+class Stagger:
+    """Spread the first refresh and the later ticks of coordinators across their interval.
+
+    Every key gets a deterministic offset for its first refresh, bounded by
+    the startup window, and a per-key seeded jitter on every later tick so
+    coordinators sharing an interval do not drift back into lockstep.
+    """
+
+    def __init__(self, window=DEFAULT_STARTUP_WINDOW, jitter=DEFAULT_JITTER, sleep=asyncio.sleep):
+        """Initialize the stagger."""
+        self._window = window
+        self._jitter = jitter
+        self._sleep = sleep
+
+    def offset(self, key, interval):
+        return min(interval, self._window) * stable_fraction(key)
+
+    async def delay(self, key, interval):
+        """Wait for the offset of key before its first refresh."""
+        await self._sleep(self.offset(key, interval).total_seconds())
+
+    def spread(self, coordinator, updater, key, interval):
+        """Wrap a coordinator update method to jitter the interval of the next tick."""
+        rand = random.Random(stable_fraction(key))
+
+        async def update():
+            coordinator.update_interval = interval
+            data = await updater()
+            coordinator.update_interval *= 1 + rand.uniform(-self._jitter, self._jitter)
+            return data
+
+        return update
@@ -0,0 +1,145 @@
+"""Indexed SQLite store for synced transactions."""
+
+import json
+import sqlite3
+import threading
+
+from .transactions import booking_date, transaction_id
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS transactions (
+        account_id TEXT NOT NULL,
+        transaction_id TEXT NOT NULL,
+        booking_date TEXT,
+        amount REAL,
+        currency TEXT,
+        data TEXT NOT NULL,
+        PRIMARY KEY (account_id, transaction_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS transactions_booking_date ON transactions (account_id, booking_date)",
+    "CREATE INDEX IF NOT EXISTS transactions_transaction_id ON transactions (transaction_id)",
+]
+
+UPSERT = """
+    INSERT INTO transactions (account_id, transaction_id, booking_date, amount, currency, data)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT (account_id, transaction_id) DO UPDATE SET
+        booking_date = excluded.booking_date,
+        amount = excluded.amount,
+        currency = excluded.currency,
+        data = excluded.data
+"""
+
+AGGREGATE = """
+    SELECT COUNT(*), SUM(amount), SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+        SUM(CASE WHEN amount < 0 THEN amount ELSE 0 END), MIN(booking_date), MAX(booking_date)
+    FROM transactions
+    WHERE account_id = ? AND booking_date >= ? AND booking_date <= ?
+"""
+
+
+def transaction_row(account_id, transaction):
+    amount = transaction.get("transactionAmount") or {}
+    return (
+        account_id,
+        transaction_id(transaction),
+        booking_date(transaction),
+        float(amount["amount"]) if amount.get("amount") is not None else None,
+        amount.get("currency"),
+        json.dumps(transaction),
+    )
+
+
+class TransactionStore:
+    """SQLite database of booked transactions, keyed by account and transaction id.
+
+    The database runs in WAL mode so readers never wait for a sync writing
+    to it, and every batch is upserted in a single transaction. The
+    connection is opened lazily on first use and shared between threads.
+    """
+
+    def __init__(self, path):
+        """Initialize the store."""
+        self._path = path
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _connect(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                for statement in SCHEMA:
+                    connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+    def upsert(self, account_id, transactions):
+        """Insert or update the transactions of an account, returning how many were written."""
+        rows = [transaction_row(account_id, transaction) for transaction in transactions]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(UPSERT, rows)
+        return len(rows)
+
+    def range(self, account_id, start, end):
+        """Get the transactions of an account booked between start and end, inclusive, oldest first."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT data FROM transactions WHERE account_id = ? AND booking_date >= ? AND booking_date <= ?"
+                " ORDER BY booking_date",
+                (account_id, start, end),
+            )
+            return [json.loads(data) for data, in rows]
+
+    def history(self, account_id):
+        """Get all transactions of an account, oldest first."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT data FROM transactions WHERE account_id = ? ORDER BY booking_date", (account_id,)
+            )
+            return [json.loads(data) for data, in rows]
+
+    def latest(self, account_id):
+        """Get the latest booking date of an account, None without transactions."""
+        with self._lock:
+            (latest,) = (
+                self._connect()
+                .execute("SELECT MAX(booking_date) FROM transactions WHERE account_id = ?", (account_id,))
+                .fetchone()
+            )
+        return latest
+
+    def booked_since(self, account_id, start):
+        """Get the booking date of each transaction id of an account booked on or after start."""
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT transaction_id, booking_date FROM transactions WHERE account_id = ? AND booking_date >= ?",
+                (account_id, start),
+            )
+            return dict(rows)
+
+    def aggregate(self, account_id, start, end):
+        """Count and sum the transactions of an account booked between start and end, inclusive."""
+        with self._lock:
+            count, total, income, expenses, first, last = (
+                self._connect().execute(AGGREGATE, (account_id, start, end)).fetchone()
+            )
+        return {
+            "count": count,
+            "total": total or 0.0,
+            "income": income or 0.0,
+            "expenses": expenses or 0.0,
+            "first": first,
+            "last": last,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
@@ -0,0 +1,98 @@
+"""Pooled keep-alive HTTP transport for the Nordigen client."""
+
+import threading
+
+import requests
+from apiclient.request_strategies import RequestStrategy
+from requests.adapters import HTTPAdapter
+
+from .defaults import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+
+SUB_CLIENTS = ["aspsps", "agreements", "account", "institutions", "premium", "requisitions"]
+
+
+class PooledTransport:
+    """One keep-alive session shared by every sub-client of a Nordigen client.
+
+    Bytes and connection reuse are counted so the saved handshakes can be
+    checked with `stats()`.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        """Initialize the transport."""
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+        self._lock = threading.Lock()
+        self._hooks = []
+        self._counters = {"requests": 0, "bytes": 0, "wire_bytes": 0}
+
+    def build_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        session.hooks["response"].append(self._on_response)
+        return session
+
+    def get_session(self):
+        if self.session is None:
+            self.session = self.build_session()
+        return self.session
+
+    def attach(self, client):
+        """Route every sub-client, including the token client, through this transport.
+
+        apiclient keeps a back reference from a strategy to its client, so
+        each sub-client gets its own strategy sharing this transport.
+        """
+        clients = [getattr(client, name) for name in SUB_CLIENTS]
+        auth_client = getattr(clients[0].get_authentication_method(), "_client", None)
+        for sub_client in clients + ([auth_client] if auth_client else []):
+            sub_client.set_request_strategy(PooledRequestStrategy(self))
+        return client
+
+    def add_response_hook(self, hook):
+        """Call hook(response) for every response, e.g. to read rate limit headers."""
+        self._hooks.append(hook)
+
+    def _on_response(self, response, *args, **kwargs):
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["bytes"] += len(response.content)
+            self._counters["wire_bytes"] += int(response.headers.get("Content-Length") or 0)
+
+        for hook in self._hooks:
+            hook(response)
+
+    def stats(self):
+        """Get request, byte and connection counters."""
+        connections = 0
+        for adapter in set(self.get_session().adapters.values()):
+            pools = adapter.poolmanager.pools
+            connections += sum(pools[key].num_connections for key in pools.keys())
+
+        with self._lock:
+            stats = dict(self._counters)
+
+        stats["connections"] = connections
+        stats["reused"] = max(stats["requests"] - connections, 0)
+        return stats
+
+
+class PooledRequestStrategy(RequestStrategy):
+    """Request strategy using the shared session and timeout of a PooledTransport."""
+
+    def __init__(self, transport):
+        """Initialize the request strategy."""
+        self._transport = transport
+
+    def get_session(self):
+        return self._transport.get_session()
+
+    def set_session(self, session):
+        self._transport.session = session
+
+    def _get_request_timeout(self):
+        return self._transport.timeout
@@ -0,0 +1,140 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+from parameterized import parameterized
+
+from nordigen_lib.aggregates import AccountColumns, SpendingAggregates, merchant, transaction_columns
+
+
+def day(value):
+    return date.fromisoformat(value).toordinal()
+
+
+def transaction(booked, amount, creditor="Shop"):
+    return {"bookingDate": booked, "transactionAmount": {"amount": str(amount)}, "creditorName": creditor}
+
+
+class TestColumns(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ({"creditorName": "Shop", "debtorName": "Me"}, "Shop"),
+            ({"debtorName": "Employer"}, "Employer"),
+            ({"remittanceInformationUnstructured": "Card payment"}, "Card payment"),
+            ({}, None),
+        ]
+    )
+    def test_merchant(self, value, expected):
+        self.assertEqual(expected, merchant(value))
+
+    def test_transaction_columns(self):
+        self.assertEqual((day("2024-01-02"), -1.5, "Shop"), transaction_columns(transaction("2024-01-02", "-1.50")))
+
+    @parameterized.expand([({"transactionAmount": {"amount": "1"}},), ({"bookingDate": "2024-01-01"},)])
+    def test_transaction_columns_incomplete(self, value):
+        self.assertIsNone(transaction_columns(value))
+
+
+class TestAccountColumns(unittest.TestCase):
+    def setUp(self):
+        self.columns = AccountColumns()
+        self.columns.extend(
+            [
+                (day("2024-01-03"), -30.0, "Cafe"),
+                (day("2024-01-01"), -10.0, "Shop"),
+                (day("2024-01-02"), 100.0, "Employer"),
+                (day("2024-02-01"), -5.0, "Shop"),
+            ]
+        )
+
+    def test_sorted(self):
+        days = [day("2024-01-01"), day("2024-01-02"), day("2024-01-03"), day("2024-02-01")]
+
+        self.assertEqual(days, list(self.columns.days))
+
+    def test_outflow(self):
+        self.assertEqual(40.0, self.columns.outflow(day("2024-01-01"), day("2024-01-31")))
+        self.assertEqual(30.0, self.columns.outflow(day("2024-01-02"), day("2024-01-03")))
+        self.assertEqual(0.0, self.columns.outflow(day("2023-01-01"), day("2023-12-31")))
+
+    def test_extend_appends_newer(self):
+        self.columns.outflow(day("2024-01-01"), day("2024-12-31"))
+        self.columns.extend([(day("2024-03-01"), -1.0, "Shop")])
+
+        self.assertEqual(46.0, self.columns.outflow(day("2024-01-01"), day("2024-12-31")))
+
+    def test_extend_merges_older(self):
+        self.columns.extend([(day("2023-12-31"), -7.0, "Bakery"), (day("2024-01-02"), -3.0, "Shop")])
+
+        self.assertEqual(sorted(self.columns.days), list(self.columns.days))
+        self.assertEqual(55.0, self.columns.outflow(day("2023-12-01"), day("2024-12-31")))
+        self.assertEqual(
+            [{"merchant": "Bakery", "amount": 7.0}], self.columns.top_merchants(day("2023-12-31"), day("2023-12-31"))
+        )
+
+    def test_extend_nothing(self):
+        self.columns.extend([])
+
+        self.assertEqual(4, len(self.columns.days))
+
+    def test_top_merchants(self):
+        self.columns.extend([(day("2024-01-04"), -25.0, "Shop")])
+
+        self.assertEqual(
+            [{"merchant": "Shop", "amount": 35.0}, {"merchant": "Cafe", "amount": 30.0}],
+            self.columns.top_merchants(day("2024-01-01"), day("2024-01-31")),
+        )
+        self.assertEqual(
+            [{"merchant": "Shop", "amount": 35.0}], self.columns.top_merchants(day("2024-01-01"), day("2024-01-31"), 1)
+        )
+
+
+class TestSpendingAggregates(unittest.TestCase):
+    def setUp(self):
+        self.store = MagicMock()
+        self.store.history.return_value = [
+            transaction("2024-02-20", -30, "Cafe"),
+            transaction("2024-03-02", -10),
+            transaction("2024-03-05", 500, "Employer"),
+            {"bookingDate": "2024-03-06"},
+        ]
+        self.aggregates = SpendingAggregates(store=self.store, today=lambda: date(2024, 3, 10))
+
+    def test_summary(self):
+        self.assertEqual(
+            {
+                "spentThisMonth": 10.0,
+                "averageDailyOutflow": round(40 / 30, 2),
+                "topMerchants": [{"merchant": "Cafe", "amount": 30.0}, {"merchant": "Shop", "amount": 10.0}],
+            },
+            self.aggregates.summary("account-1"),
+        )
+
+    def test_loaded_once(self):
+        self.aggregates.summary("account-1")
+        self.aggregates.summary("account-1")
+
+        self.store.history.assert_called_once_with("account-1")
+
+    def test_add(self):
+        self.aggregates.summary("account-1")
+        self.aggregates.add("account-1", [transaction("2024-03-09", -5)])
+
+        self.assertEqual(15.0, self.aggregates.summary("account-1")["spentThisMonth"])
+
+    def test_add_already_stored(self):
+        self.aggregates.summary("account-1")
+        self.aggregates.add("account-1", [transaction("2024-03-02", -10)])
+
+        self.assertEqual(10.0, self.aggregates.summary("account-1")["spentThisMonth"])
+
+    def test_add_before_load(self):
+        self.aggregates.add("account-1", [transaction("2024-03-09", -5)])
+
+        # Not loaded yet, the store already holds the transaction.
+        self.assertEqual(10.0, self.aggregates.summary("account-1")["spentThisMonth"])
+
+    def test_without_store(self):
+        aggregates = SpendingAggregates(today=lambda: date(2024, 3, 10))
+
+        self.assertEqual(0.0, aggregates.summary("account-1")["spentThisMonth"])
@@ -0,0 +1,167 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from nordigen_lib.aio import AsyncNordigenClient, build_async_client
+from nordigen_lib.auth import TokenStore
+from nordigen_lib.ng import async_get_accounts
+
+case = unittest.TestCase()
+
+
+def mocked_session(payload):
+    response = MagicMock()
+    response.json = AsyncMock(return_value=payload)
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=False)
+    session = MagicMock()
+    session.get.return_value = context
+    return session, response
+
+
+def async_client(session, auth, executor=None):
+    return AsyncNordigenClient(
+        session_factory=lambda: session,
+        auth=auth,
+        async_executor=executor or AsyncMock(),
+        base_url="https://example.com/api/v2",
+    )
+
+
+class TestAsyncNordigenClient:
+    @pytest.mark.asyncio
+    async def test_balances_with_valid_token(self):
+        session, response = mocked_session({"balances": []})
+        auth = MagicMock(_token_expiration=9999999999, _access_token="token")
+        executor = AsyncMock()
+        client = async_client(session, auth, executor)
+
+        res = await client.account.balances("account-1")
+
+        case.assertEqual({"balances": []}, res)
+        session.get.assert_called_once_with(
+            "https://example.com/api/v2/accounts/account-1/balances/",
+            params=None,
+            headers={"Authorization": "Bearer token"},
+            timeout=client._timeout,
+        )
+        response.raise_for_status.assert_called_once()
+        executor.assert_not_called()
+        auth.get_headers.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_valid_token_skips_store_lock(self):
+        auth = MagicMock(_token_expiration=9999999999, _access_token="token")
+        # Like the OAuth authentication, whose refresh_token the TokenStore takes over.
+        auth.get_headers.side_effect = lambda: auth.refresh_token() and {"Authorization": "Bearer token"}
+        store = TokenStore(MagicMock(**{"account.get_authentication_method.return_value": auth}), "tokens.json")
+        store._lock = MagicMock()
+
+        headers = await async_client(MagicMock(), auth).headers()
+
+        case.assertEqual({"Authorization": "Bearer token"}, headers)
+        store._lock.__enter__.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_response_hook(self):
+        session, response = mocked_session({"balances": []})
+        client = async_client(session, MagicMock(_token_expiration=9999999999))
+        hook = MagicMock()
+        client.add_response_hook(hook)
+
+        await client.account.balances("account-1")
+
+        hook.assert_called_once_with(response)
+
+    @pytest.mark.asyncio
+    async def test_expired_token_refreshed_in_executor(self):
+        session, response = mocked_session({"account": {}})
+        auth = MagicMock(_token_expiration=None)
+        executor = AsyncMock(return_value={"Authorization": "Bearer new"})
+        client = async_client(session, auth, executor)
+
+        await client.account.details("account-1")
+
+        executor.assert_called_once_with(auth.get_headers)
+        session.get.assert_called_once_with(
+            "https://example.com/api/v2/accounts/account-1/details/",
+            params=None,
+            headers={"Authorization": "Bearer new"},
+            timeout=client._timeout,
+        )
+
+    @pytest.mark.asyncio
+    async def test_requisition(self):
+        session, response = mocked_session({"id": "req-1"})
+        client = async_client(session, MagicMock(_token_expiration=9999999999))
+
+        case.assertEqual({"id": "req-1"}, await client.requisitions.by_id("req-1"))
+        case.assertEqual("https://example.com/api/v2/requisitions/req-1/", session.get.call_args[0][0])
+
+    @pytest.mark.asyncio
+    async def test_transactions(self):
+        session, response = mocked_session({"transactions": {"booked": []}})
+        client = async_client(session, MagicMock(_token_expiration=9999999999))
+
+        case.assertEqual({"transactions": {"booked": []}}, await client.account.transactions("account-1", "2024-01-01"))
+        case.assertEqual("https://example.com/api/v2/accounts/account-1/transactions/", session.get.call_args[0][0])
+        case.assertEqual({"date_from": "2024-01-01"}, session.get.call_args.kwargs["params"])
+
+    @patch("homeassistant.helpers.aiohttp_client.async_get_clientsession")
+    def test_build_async_client(self, mocked_async_get_clientsession):
+        hass = MagicMock()
+        client = MagicMock()
+
+        res = build_async_client(hass=hass, client=client, timeout=5)
+
+        case.assertIs(client.account.get_authentication_method(), res._auth)
+        case.assertEqual(5, res._timeout.total)
+        case.assertIs(mocked_async_get_clientsession.return_value, res._session_factory())
+        mocked_async_get_clientsession.assert_called_once_with(hass)
+
+
+class TestAsyncGetAccounts:
+    @pytest.mark.asyncio
+    async def test_keeps_order_and_filters(self):
+        logger = MagicMock()
+
+        async def fn(account_id):
+            if account_id == 2:
+                raise Exception("whoops")
+            return {"account": {"iban": f"iban-{account_id}"}}
+
+        res = await async_get_accounts(
+            fn=fn,
+            requisition={"accounts": [1, 2, 3, 4]},
+            logger=logger,
+            ignored=[4],
+            async_executor=AsyncMock(),
+            workers=2,
+        )
+
+        case.assertEqual(["iban-1", "iban-3"], [account["iban"] for account in res])
+
+    @pytest.mark.asyncio
+    async def test_cache(self):
+        cache = MagicMock()
+        cache.get.side_effect = [{"iban": "cached"}, None]
+
+        async def executor(fn, *args):
+            return fn(*args)
+
+        fn = AsyncMock(return_value={"account": {"iban": "fetched"}})
+
+        res = await async_get_accounts(
+            fn=fn,
+            requisition={"accounts": [1, 2]},
+            logger=MagicMock(),
+            ignored=[],
+            async_executor=executor,
+            cache=cache,
+        )
+
+        case.assertEqual(["cached", "fetched"], [account["iban"] for account in res])
+        fn.assert_called_once_with(2)
+        cache.set.assert_called_once_with(2, {"iban": "fetched"})
@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from nordigen.oauth import OAuthAuthentication
+from nordigen_lib.auth import TokenStore
+
+
+def token_response(access="access-1", refresh="refresh-1"):
+    return {"access": access, "access_expires": 3600, "refresh": refresh, "refresh_expires": 86400}
+
+
+class TestTokenStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "tokens.json")
+        self.clock = MagicMock(return_value=1000)
+        self.auth_client = MagicMock()
+        self.auth_client.token.return_value = token_response()
+        self.auth_client.refresh.return_value = {"access": "access-2", "access_expires": 3600}
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def store(self, margin=300):
+        auth = OAuthAuthentication(body={"secret_id": "id", "secret_key": "key"}, client=self.auth_client)
+        client = MagicMock()
+        client.account.get_authentication_method.return_value = auth
+        return auth, TokenStore(client=client, path=self.path, margin=margin, clock=self.clock)
+
+    def write(self, **tokens):
+        with open(self.path, "w") as fh:
+            json.dump(tokens, fh)
+
+    def test_first_request_persists_tokens(self):
+        auth, store = self.store()
+
+        self.assertEqual({"Authorization": "Bearer access-1"}, auth.get_headers())
+
+        with open(self.path) as fh:
+            self.assertEqual("refresh-1", json.load(fh)["refresh"])
+
+    def test_restart_reuses_persisted_tokens(self):
+        self.write(
+            access="stored", access_expiration=9999999999, refresh="stored-refresh", refresh_expiration=9999999999
+        )
+        auth, store = self.store()
+
+        self.assertEqual({"Authorization": "Bearer stored"}, auth.get_headers())
+        self.auth_client.token.assert_not_called()
+
+    def test_expired_refresh_token_ignored(self):
+        self.write(access="stored", access_expiration=10, refresh="stored-refresh", refresh_expiration=10)
+        auth, store = self.store()
+
+        self.assertFalse(store.load())
+        self.assertEqual({"Authorization": "Bearer access-1"}, auth.get_headers())
+
+    def test_unchanged_tokens_not_written(self):
+        auth, store = self.store()
+        auth.get_headers()
+        os.unlink(self.path)
+
+        auth.get_headers()
+
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_refresh_ahead_not_needed(self):
+        auth, store = self.store()
+        auth.get_headers()
+
+        self.assertFalse(store.refresh_ahead())
+        self.auth_client.refresh.assert_not_called()
+
+    def test_refresh_ahead_near_expiry(self):
+        self.write(access="stored", access_expiration=1100, refresh="stored-refresh", refresh_expiration=9999999999)
+        auth, store = self.store()
+
+        self.assertTrue(store.refresh_ahead("now"))
+
+        self.auth_client.refresh.assert_called_once_with(refresh_token="stored-refresh")
+        self.assertEqual("access-2", store.tokens()["access"])
+        with open(self.path) as fh:
+            self.assertEqual("access-2", json.load(fh)["access"])
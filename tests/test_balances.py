@@ -0,0 +1,36 @@
+import unittest
+from decimal import Decimal
+
+from nordigen_lib.balances import DEFAULT_BALANCE_TYPES, BalanceParser
+
+BALANCES = [
+    {"balanceAmount": {"amount": "123.456", "currency": "SEK"}, "balanceType": "interimAvailable"},
+    {"balanceAmount": {"amount": 321, "currency": "SEK"}, "balanceType": "interimBooked"},
+    {"balanceAmount": {"amount": "1.00", "currency": "SEK"}, "balanceType": "somethingElse"},
+]
+
+
+class TestBalanceParser(unittest.TestCase):
+    def test_default_types(self):
+        res = BalanceParser().parse(BALANCES)
+
+        self.assertEqual(DEFAULT_BALANCE_TYPES, list(res))
+        self.assertEqual(123.46, res["interimAvailable"])
+        self.assertEqual(321.0, res["interimBooked"])
+        self.assertIsNone(res["expected"])
+
+    def test_configured_types(self):
+        res = BalanceParser(balance_types=["interimAvailable", "closingBooked"]).parse(BALANCES)
+
+        self.assertEqual({"interimAvailable": 123.46, "closingBooked": None}, res)
+
+    def test_decimal(self):
+        res = BalanceParser(balance_types=["interimAvailable", "interimBooked"], decimal=True).parse(BALANCES)
+
+        self.assertEqual({"interimAvailable": Decimal("123.46"), "interimBooked": Decimal("321.00")}, res)
+
+    def test_parses_into_copy(self):
+        parser = BalanceParser(balance_types=["interimAvailable"])
+        parser.parse(BALANCES)
+
+        self.assertEqual({"interimAvailable": None}, parser.parse([]))
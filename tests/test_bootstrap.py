@@ -0,0 +1,113 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nordigen_lib.bootstrap import Bootstrap
+
+case = unittest.TestCase()
+
+CONST = {"DOMAIN": "foobar", "REQUISITIONS": "requisitions"}
+
+
+def build_hass():
+    async def executor(fn, *args):
+        return fn(*args)
+
+    hass = MagicMock()
+    hass.async_add_executor_job = AsyncMock(side_effect=executor)
+    hass.helpers.discovery.async_load_platform = AsyncMock()
+    return hass
+
+
+class TestBootstrap:
+    def test_time_to_first_entity(self):
+        now = [10.0]
+        bootstrap = Bootstrap(clock=lambda: now[0])
+
+        now[0] = 12.5
+        bootstrap.entity_added()
+        now[0] = 20.0
+        bootstrap.entity_added()
+
+        case.assertEqual(2.5, bootstrap.metrics["time_to_first_entity"])
+
+    @unittest.mock.patch("nordigen_lib.bootstrap.process_requisition")
+    @unittest.mock.patch("nordigen_lib.bootstrap.index_requisitions")
+    @pytest.mark.asyncio
+    async def test_run(self, mocked_index_requisitions, mocked_process_requisition):
+        hass = build_hass()
+        client, logger = MagicMock(), MagicMock()
+        configs = [{"enduser_id": "user-1"}, {"enduser_id": "user-2"}]
+        config = {"foobar": {"requisitions": configs}}
+        mocked_process_requisition.side_effect = lambda config, **kwargs: (
+            {"id": "req-1"} if config["enduser_id"] == "user-1" else None
+        )
+
+        bootstrap = Bootstrap()
+        await bootstrap.run(hass=hass, client=client, config=config, const=CONST, logger=logger)
+
+        mocked_index_requisitions.assert_called_once_with(client, configs, logger)
+        requisitions = mocked_process_requisition.call_args.kwargs["requisitions"]
+        case.assertIs(mocked_index_requisitions.return_value, requisitions)
+        hass.helpers.discovery.async_load_platform.assert_awaited_once_with(
+            "sensor", "foobar", {"requisitions": [{"id": "req-1"}]}, config
+        )
+        case.assertEqual(
+            {"requisitions": 2, "resolved": 1, "failed": 1, "errors": 0, "time_to_first_entity": None},
+            bootstrap.metrics,
+        )
+
+    @unittest.mock.patch("nordigen_lib.bootstrap.process_requisition")
+    @unittest.mock.patch("nordigen_lib.bootstrap.index_requisitions")
+    @pytest.mark.asyncio
+    async def test_loads_as_resolved(self, mocked_index_requisitions, mocked_process_requisition):
+        hass = build_hass()
+        slow = asyncio.Event()
+
+        async def executor(fn, *args):
+            if fn is mocked_index_requisitions:
+                return {}
+            if fn.keywords["config"]["enduser_id"] == "slow":
+                await slow.wait()
+            return {"id": fn.keywords["config"]["enduser_id"]}
+
+        async def load_platform(platform, domain, discovery, config):
+            slow.set()
+
+        hass.async_add_executor_job = AsyncMock(side_effect=executor)
+        hass.helpers.discovery.async_load_platform = AsyncMock(side_effect=load_platform)
+        config = {"foobar": {"requisitions": [{"enduser_id": "slow"}, {"enduser_id": "fast"}], "bootstrap_workers": 2}}
+
+        await Bootstrap().run(hass=hass, client=MagicMock(), config=config, const=CONST, logger=MagicMock())
+
+        calls = hass.helpers.discovery.async_load_platform.call_args_list
+        loaded = [call.args[2]["requisitions"][0]["id"] for call in calls]
+        case.assertEqual(["fast", "slow"], loaded)
+
+    @unittest.mock.patch("nordigen_lib.bootstrap.process_requisition")
+    @unittest.mock.patch("nordigen_lib.bootstrap.index_requisitions")
+    @pytest.mark.asyncio
+    async def test_retry(self, mocked_index_requisitions, mocked_process_requisition):
+        hass = build_hass()
+        hass.helpers.discovery.async_load_platform = AsyncMock(side_effect=[None, RuntimeError("whoops"), None])
+        logger = MagicMock()
+        config = {"foobar": {"requisitions": [{"enduser_id": "user-1"}, {"enduser_id": "user-2"}]}}
+        mocked_process_requisition.side_effect = lambda config, **kwargs: {"id": config["enduser_id"]}
+
+        bootstrap = Bootstrap(retry_delay=30)
+        await bootstrap.run(hass=hass, client=MagicMock(), config=config, const=CONST, logger=logger)
+
+        logger.error.assert_called_once()
+        case.assertEqual({"resolved": 1, "errors": 1}, {key: bootstrap.metrics[key] for key in ["resolved", "errors"]})
+        delay, retry = hass.helpers.event.async_call_later.call_args.args
+        case.assertEqual(30, delay)
+
+        await retry(None)
+
+        calls = hass.helpers.discovery.async_load_platform.call_args_list
+        loaded = [call.args[2]["requisitions"][0]["id"] for call in calls]
+        case.assertEqual(3, len(loaded))
+        case.assertEqual(loaded[1], loaded[2])
+        case.assertEqual(2, bootstrap.metrics["resolved"])
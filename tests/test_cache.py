@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from nordigen_lib.cache import DetailsCache
+from nordigen_lib.ng import get_account, get_accounts
+
+
+class TestDetailsCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "details.json")
+        self.clock = MagicMock(return_value=1000)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def cache(self, ttl=60):
+        return DetailsCache(path=self.path, ttl=ttl, clock=self.clock)
+
+    def test_missing(self):
+        self.assertEqual(None, self.cache().get("account-1"))
+
+    def test_set_get(self):
+        cache = self.cache()
+        cache.set("account-1", {"iban": "iban-1"})
+
+        self.assertEqual({"iban": "iban-1"}, cache.get("account-1"))
+
+    def test_persisted(self):
+        self.cache().set("account-1", {"iban": "iban-1"})
+
+        self.assertEqual({"iban": "iban-1"}, self.cache().get("account-1"))
+        self.assertEqual([], [name for name in os.listdir(self.dir.name) if name.endswith(".tmp")])
+
+    def test_expired(self):
+        cache = self.cache(ttl=60)
+        cache.set("account-1", {"iban": "iban-1"})
+
+        self.clock.return_value += 61
+        self.assertEqual(None, cache.get("account-1"))
+
+    def test_invalidate_key(self):
+        cache = self.cache()
+        cache.set("account-1", {"iban": "iban-1"})
+        cache.set("account-2", {"iban": "iban-2"})
+
+        cache.invalidate("account-1")
+
+        self.assertEqual(None, self.cache().get("account-1"))
+        self.assertEqual({"iban": "iban-2"}, self.cache().get("account-2"))
+
+    def test_invalidate_all(self):
+        cache = self.cache()
+        cache.set("account-1", {"iban": "iban-1"})
+
+        cache.invalidate()
+
+        with open(self.path) as fh:
+            self.assertEqual({}, json.load(fh))
+
+    def test_corrupt_file(self):
+        with open(self.path, "w") as fh:
+            fh.write("{not json")
+
+        self.assertEqual(None, self.cache().get("account-1"))
+
+    @patch("nordigen_lib.cache.os.replace")
+    def test_failed_write_leaves_no_temp_file(self, mocked_replace):
+        mocked_replace.side_effect = OSError("disk full")
+        cache = self.cache()
+
+        with self.assertRaises(OSError):
+            cache.set("account-1", {"iban": "iban-1"})
+
+        self.assertEqual([], os.listdir(self.dir.name))
+
+    def test_unserializable_leaves_no_temp_file(self):
+        cache = self.cache()
+
+        with self.assertRaises(TypeError):
+            cache.set("account-1", {"iban": object()})
+
+        self.assertEqual([], os.listdir(self.dir.name))
+
+
+class TestCachedAccounts(unittest.TestCase):
+    def test_fresh_cache_makes_no_calls(self):
+        fn = MagicMock()
+        cache = MagicMock()
+        cache.get.return_value = {"iban": "iban-1"}
+
+        res = get_account(fn=fn, id="account-1", requisition={}, logger=MagicMock(), cache=cache)
+
+        self.assertEqual("iban-1", res["iban"])
+        fn.assert_not_called()
+
+    def test_miss_populates_cache(self):
+        fn = MagicMock()
+        fn.return_value = {"account": {"iban": "iban-1"}}
+        cache = MagicMock()
+        cache.get.return_value = None
+
+        get_accounts(fn=fn, requisition={"accounts": ["account-1"]}, logger=MagicMock(), ignored=[], cache=cache)
+
+        fn.assert_called_once_with("account-1")
+        cache.set.assert_called_once_with("account-1", {"iban": "iban-1"})
@@ -0,0 +1,58 @@
+import unittest
+from decimal import Decimal
+
+from parameterized import parameterized
+
+from nordigen_lib.changes import ChangeDetector, content_hash, is_number
+
+
+class TestContentHash(unittest.TestCase):
+    def test_key_order(self):
+        self.assertEqual(content_hash({"a": 1, "b": [1, 2]}), content_hash({"b": [1, 2], "a": 1}))
+
+    def test_changed(self):
+        self.assertNotEqual(content_hash({"status": "CR"}), content_hash({"status": "LN"}))
+
+
+class TestIsNumber(unittest.TestCase):
+    @parameterized.expand([(1, True), (1.5, True), (Decimal("1.50"), True), (True, False), (None, False), ("1", False)])
+    def test_is_number(self, value, expected):
+        self.assertEqual(expected, is_number(value))
+
+
+class TestChangeDetector(unittest.TestCase):
+    def test_first_write(self):
+        changes = ChangeDetector()
+
+        self.assertTrue(changes.changed("key", 1.0))
+        self.assertEqual({"writes": 1, "suppressed": 0}, changes.counters)
+
+    def test_unchanged(self):
+        changes = ChangeDetector()
+        changes.changed("key", {"status": "LN"})
+
+        self.assertFalse(changes.changed("key", {"status": "LN"}))
+        self.assertTrue(changes.changed("key", {"status": "EX"}))
+        self.assertEqual({"writes": 2, "suppressed": 1}, changes.counters)
+
+    def test_keys_are_independent(self):
+        changes = ChangeDetector()
+        changes.changed("key-1", 1.0)
+
+        self.assertTrue(changes.changed("key-2", 1.0))
+
+    def test_deadband(self):
+        changes = ChangeDetector(deadband=0.5)
+        changes.changed("key", 10.0)
+
+        self.assertFalse(changes.changed("key", 10.3))
+        # Compared against the last written value, so small moves add up.
+        self.assertTrue(changes.changed("key", 10.6))
+        self.assertFalse(changes.changed("key", 10.2))
+
+    def test_number_to_none(self):
+        changes = ChangeDetector(deadband=0.5)
+        changes.changed("key", 10.0)
+
+        self.assertTrue(changes.changed("key", None))
+        self.assertFalse(changes.changed("key", None))
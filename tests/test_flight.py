@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import pytest
+
+from nordigen_lib.flight import SingleFlight
+
+case = unittest.TestCase()
+
+
+def collect_error(errors, fn, *args):
+    try:
+        fn(*args)
+    except ValueError as error:
+        errors.append(error)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+        fn = MagicMock(side_effect=[1, 2])
+
+        self.assertEqual(1, flight.call("key", fn))
+        self.assertEqual(2, flight.call("key", fn))
+        self.assertEqual({"hits": 0, "misses": 2}, flight.counters)
+
+    def test_concurrent_calls_share_one_call(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fn(account_id):
+            calls.append(account_id)
+            release.wait(5)
+            return {"id": account_id}
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.call("key", fn, "id")))
+        leader.start()
+        while not calls:
+            pass
+        follower = threading.Thread(target=lambda: results.append(flight.call("key", fn, "id")))
+        follower.start()
+        while not flight.counters["hits"]:
+            pass
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(["id"], calls)
+        self.assertEqual([{"id": "id"}, {"id": "id"}], results)
+        self.assertEqual({"hits": 1, "misses": 1}, flight.counters)
+
+    def test_concurrent_calls_share_the_error(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        started = threading.Event()
+
+        def fn():
+            started.set()
+            release.wait(5)
+            raise ValueError("whoops")
+
+        errors = []
+        leader = threading.Thread(target=collect_error, args=(errors, flight.call, "key", fn))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=collect_error, args=(errors, flight.call, "key", fn))
+        follower.start()
+        while not flight.counters["hits"]:
+            pass
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(2, len(errors))
+        self.assertIs(errors[0], errors[1])
+        self.assertEqual({}, flight._calls)
+
+    def test_wrap_keys_by_endpoint_and_args(self):
+        flight = SingleFlight()
+        fn = MagicMock(return_value="result")
+        flight.call = MagicMock(return_value="result")
+
+        self.assertEqual("result", flight.wrap("balances", fn)("account-1"))
+        flight.call.assert_called_once_with(("balances", "account-1"), fn, "account-1")
+
+
+class TestAsyncSingleFlight:
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def fn(account_id):
+            calls.append(account_id)
+            await asyncio.sleep(0)
+            return {"id": account_id}
+
+        wrapped = flight.wrap("balances", fn)
+        results = await asyncio.gather(wrapped("id"), wrapped("id"), wrapped("other"))
+
+        case.assertEqual(["id", "other"], calls)
+        case.assertEqual([{"id": "id"}, {"id": "id"}, {"id": "other"}], results)
+        case.assertEqual({"hits": 1, "misses": 2}, flight.counters)
+        case.assertEqual({}, flight._tasks)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_the_error(self):
+        flight = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0)
+            raise ValueError("whoops")
+
+        results = await asyncio.gather(
+            flight.async_call("key", fn), flight.async_call("key", fn), return_exceptions=True
+        )
+
+        case.assertIsInstance(results[0], ValueError)
+        case.assertIs(results[0], results[1])
+        case.assertEqual({"hits": 1, "misses": 1}, flight.counters)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "result"
+
+        first = asyncio.ensure_future(flight.async_call("key", fn))
+        second = asyncio.ensure_future(flight.async_call("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        case.assertEqual("result", await second)
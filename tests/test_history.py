@@ -0,0 +1,86 @@
+import unittest
+
+from nordigen_lib.history import DAY, BalanceHistory, RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_append(self):
+        buffer = RingBuffer(capacity=3)
+        buffer.append(1.0, 10.0)
+        buffer.append(2.0, 20.0)
+
+        self.assertEqual(2, len(buffer))
+        self.assertEqual([(1.0, 10.0), (2.0, 20.0)], buffer.window(0))
+
+    def test_wraparound(self):
+        buffer = RingBuffer(capacity=3)
+        for i in range(5):
+            buffer.append(float(i), float(i * 10))
+
+        self.assertEqual(3, len(buffer))
+        self.assertEqual([(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)], buffer.window(0))
+
+    def test_window(self):
+        buffer = RingBuffer(capacity=3)
+        for i in range(5):
+            buffer.append(float(i), float(i * 10))
+
+        self.assertEqual([(3.0, 30.0), (4.0, 40.0)], buffer.window(3.0))
+        self.assertEqual([], buffer.window(5.0))
+
+    def test_delta(self):
+        buffer = RingBuffer()
+        buffer.append(1.0, 100.0)
+        buffer.append(2.0, 80.0)
+        buffer.append(3.0, 95.0)
+
+        self.assertEqual(-5.0, buffer.delta(0))
+        self.assertEqual(15.0, buffer.delta(2.0))
+        self.assertEqual(0.0, buffer.delta(3.0))
+        self.assertIsNone(buffer.delta(4.0))
+
+    def test_trend(self):
+        buffer = RingBuffer()
+        for day in range(4):
+            buffer.append(day * DAY, 100.0 - 10 * day)
+
+        self.assertAlmostEqual(-10.0, buffer.trend(0))
+
+    def test_trend_too_few_records(self):
+        buffer = RingBuffer()
+        buffer.append(0.0, 100.0)
+
+        self.assertIsNone(buffer.trend(0))
+
+    def test_trend_same_timestamp(self):
+        buffer = RingBuffer()
+        buffer.append(0.0, 100.0)
+        buffer.append(0.0, 200.0)
+
+        self.assertIsNone(buffer.trend(0))
+
+
+class TestBalanceHistory(unittest.TestCase):
+    def test_record(self):
+        history = BalanceHistory(capacity=2, clock=lambda: 1.0)
+        history.record("account", {"interimAvailable": "12.5", "expected": None})
+
+        self.assertEqual([(1.0, 12.5)], history.buffer("account", "interimAvailable").window(0))
+        self.assertIsNone(history.buffer("account", "expected"))
+
+    def test_attributes(self):
+        now = [0.0]
+        history = BalanceHistory(clock=lambda: now[0])
+        for day, amount in enumerate([100, 90, 70]):
+            now[0] = day * DAY
+            history.record("account", {"interimAvailable": amount})
+
+        self.assertEqual(
+            {"delta_24h": -20.0, "trend_7d": -15.0},
+            history.attributes("account", "interimAvailable"),
+        )
+
+    def test_attributes_without_history(self):
+        history = BalanceHistory()
+
+        self.assertEqual({}, history.attributes("account", "interimAvailable"))
@@ -1,20 +1,81 @@
+import os
+import subprocess
+import sys
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
+import pytest
+import requests
+import voluptuous
+from apiclient.exceptions import ServerError, UnexpectedError
+from homeassistant.helpers import config_validation
 from parameterized import parameterized
 
+import nordigen_lib
 from nordigen.client import AccountClient
-from nordigen_lib import config_schema, entry, get_client, get_config
+from nordigen_lib import TOKEN_REFRESH_INTERVAL, async_entry, config_schema, entry, get_client, get_config
+from nordigen_lib.auth import TokenStore
+from nordigen_lib.bootstrap import Bootstrap
+from nordigen_lib.cache import DetailsCache
+from nordigen_lib.changes import ChangeDetector
+from nordigen_lib.flight import SingleFlight
+from nordigen_lib.history import BalanceHistory
 from nordigen_lib.ng import (
     get_account,
     get_accounts,
+    get_option,
     get_or_create_requisition,
     get_reference,
     get_requisitions,
+    get_transactions,
+    iter_requisitions,
+    map_concurrent,
     matched_requisition,
-    requests,
+    next_offset,
+    reference_index,
+    requisition_reference,
     unique_ref,
 )
+from nordigen_lib.polling import RequisitionPoller
+from nordigen_lib.resilience import Resilience
+from nordigen_lib.scheduler import RateLimitScheduler
+from nordigen_lib.stagger import Stagger
+from nordigen_lib.store import TransactionStore
+from nordigen_lib.transactions import TransactionSync
+from nordigen_lib.transport import PooledRequestStrategy, PooledTransport
+
+HEAVY_MODULES = ["aiohttp", "apiclient", "homeassistant", "nordigen", "requests", "sqlite3"]
+
+
+class TestLazyImports(unittest.TestCase):
+    def heavy_modules(self, code):
+        """Run code in a fresh interpreter, returning the heavy modules it loaded."""
+        report = "print(' '.join(sorted(m for m in HEAVY if m in sys.modules)))"
+        res = subprocess.run(
+            [sys.executable, "-c", f"import sys; HEAVY = {HEAVY_MODULES!r}; {code}; {report}"],
+            capture_output=True,
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(nordigen_lib.__file__)),
+            text=True,
+        )
+        return res.stdout.strip()
+
+    def test_cold_import(self):
+        self.assertEqual("", self.heavy_modules("import nordigen_lib"))
+
+    def test_config_schema(self):
+        # The integration builds its CONFIG_SCHEMA when it loads.
+        code = "from unittest.mock import MagicMock; import nordigen_lib; "
+        code += "nordigen_lib.config_schema(MagicMock(), MagicMock(), MagicMock())"
+
+        self.assertEqual("", self.heavy_modules(code))
+
+    def test_lazy_attribute(self):
+        self.assertIs(nordigen_lib.PooledTransport, PooledTransport)
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            nordigen_lib.whatever
 
 
 class TestSchema(unittest.TestCase):
@@ -27,7 +88,44 @@ class TestSchema(unittest.TestCase):
 
         self.assertEqual(vol.Schema.call_count, 2)
         self.assertEqual(vol.Required.call_count, 5)
-        self.assertEqual(vol.Optional.call_count, 6)
+        self.assertEqual(vol.Optional.call_count, 18)
+
+    def test_options(self):
+        const = {
+            "DOMAIN": "foobar",
+            "SECRET_ID": "secret_id",
+            "SECRET_KEY": "secret_key",
+            "DEBUG": "debug",
+            "REQUISITIONS": "requisitions",
+            "ENDUSER_ID": "enduser_id",
+            "INSTITUTION_ID": "institution_id",
+            "REFRESH_RATE": "refresh_rate",
+            "BALANCE_TYPES": "balance_types",
+            "HISTORICAL_DAYS": "historical_days",
+            "IGNORE_ACCOUNTS": "ignore_accounts",
+            "ICON_FIELD": "icon",
+        }
+        config = {
+            "foobar": {
+                "secret_id": "id",
+                "secret_key": "key",
+                "timeout": "12.5",
+                "async_client": "yes",
+                "requisitions": [{"enduser_id": "user", "institution_id": "bank", "historical_days": "7"}],
+            }
+        }
+
+        schema = config_schema(voluptuous, config_validation, const)
+        res = schema(config)["foobar"]
+
+        self.assertEqual(12.5, res["timeout"])
+        self.assertEqual(True, res["async_client"])
+        self.assertEqual(1, res["bootstrap_workers"])
+        self.assertEqual(7, res["requisitions"][0]["historical_days"])
+        self.assertEqual(4, res["requisitions"][0]["account_workers"])
+        self.assertEqual(False, res["requisitions"][0]["sync_transactions"])
+        with self.assertRaises(voluptuous.Invalid):
+            schema({"foobar": {**config["foobar"], "pool_size": "many"}})
 
 
 class TestGetConfig(unittest.TestCase):
@@ -60,6 +158,43 @@ class TestGetConfig(unittest.TestCase):
 
         self.assertEqual({"enduser_id": "user3", "institution_id": "aspsp3"}, res)
 
+    def test_index(self):
+        configs = [
+            {"enduser_id": "user1", "institution_id": "aspsp1"},
+            {"enduser_id": "user2", "institution_id": "aspsp2"},
+        ]
+        index = reference_index(configs, lambda config: get_reference(**config))
+
+        self.assertEqual(configs[1], get_config(index, {"reference": "user2-aspsp2"}))
+        self.assertEqual(None, get_config(index, {"reference": "user3-aspsp3"}))
+
+
+class TestReferenceIndex(unittest.TestCase):
+    def test_basic(self):
+        res = reference_index([{"reference": "ref"}, {"reference": "fer"}], requisition_reference)
+
+        self.assertEqual({"ref": {"reference": "ref"}, "fer": {"reference": "fer"}}, res)
+
+    def test_duplicates_first_wins(self):
+        logger = MagicMock()
+        requisitions = [
+            {"id": 1, "reference": "ref"},
+            {"id": 2, "reference": "fer"},
+            {"id": 3, "reference": "ref"},
+            {"id": 4, "reference": "fer"},
+            {"id": 5, "reference": "erf"},
+        ]
+
+        res = reference_index(requisitions, requisition_reference, logger=logger)
+
+        self.assertEqual([1, 2, 5], [requisition["id"] for requisition in res.values()])
+        logger.warning.assert_called_once_with("Duplicate references found, using the first match: %s", ["fer", "ref"])
+
+    def test_duplicates_without_logger(self):
+        res = reference_index([{"reference": "ref"}, {"reference": "ref", "id": 2}], requisition_reference)
+
+        self.assertEqual({"ref": {"reference": "ref"}}, res)
+
 
 class TestGetClient(unittest.TestCase):
     def test_basic(self):
@@ -71,6 +206,10 @@ class TestGetClient(unittest.TestCase):
         )
 
         self.assertIsInstance(res.account, AccountClient)
+        self.assertIsInstance(res.account.get_request_strategy(), PooledRequestStrategy)
+        self.assertIs(
+            res.account.get_request_strategy().get_session(), res.requisitions.get_request_strategy().get_session()
+        )
 
 
 class TestReference(unittest.TestCase):
@@ -92,6 +231,98 @@ class TestReference(unittest.TestCase):
         self.assertEqual(expected, res)
 
 
+class TestGetOption(unittest.TestCase):
+    def test_from_const(self):
+        res = get_option({"workers": 4}, {"BOOTSTRAP_WORKERS": "workers"}, "BOOTSTRAP_WORKERS", 1)
+        self.assertEqual(4, res)
+
+    def test_lower_case_fallback(self):
+        res = get_option({"bootstrap_workers": 4}, {}, "BOOTSTRAP_WORKERS", 1)
+        self.assertEqual(4, res)
+
+    def test_default(self):
+        res = get_option({}, {}, "BOOTSTRAP_WORKERS", 1)
+        self.assertEqual(1, res)
+
+
+class TestMapConcurrent(unittest.TestCase):
+    def test_serial(self):
+        res = map_concurrent(lambda item: item * 2, [1, 2, 3])
+        self.assertEqual([2, 4, 6], res)
+
+    def test_concurrent_keeps_order(self):
+        res = map_concurrent(lambda item: item * 2, range(20), workers=8)
+        self.assertEqual([item * 2 for item in range(20)], res)
+
+    def test_single_item(self):
+        res = map_concurrent(lambda item: item * 2, [1], workers=8)
+        self.assertEqual([2], res)
+
+
+def paginated_client(pages):
+    client = MagicMock()
+    responses = []
+    for number, page in enumerate(pages):
+        last = number == len(pages) - 1
+        next_url = None if last else f"https://example.com/requisitions/?limit=2&offset={(number + 1) * 2}"
+        responses.append({"count": 2 * len(pages), "next": next_url, "results": page})
+    client.requisitions.list.side_effect = responses
+    return client
+
+
+class TestIterRequisitions(unittest.TestCase):
+    pages = [
+        [{"id": 1, "reference": "ref-1"}, {"id": 2, "reference": "ref-2"}],
+        [{"id": 3, "reference": "ref-3"}, {"id": 4, "reference": "ref-4", "status": "LN"}],
+        [{"id": 5, "reference": "ref-5"}],
+    ]
+
+    @parameterized.expand(
+        [
+            (None, None),
+            ("", None),
+            ("https://example.com/requisitions/?limit=2", None),
+            ("https://example.com/requisitions/?limit=2&offset=4", 4),
+        ]
+    )
+    def test_next_offset(self, url, expected):
+        self.assertEqual(expected, next_offset(url))
+
+    def test_all_pages(self):
+        client = paginated_client(self.pages)
+
+        res = list(iter_requisitions(client, limit=2))
+
+        self.assertEqual([1, 2, 3, 4, 5], [requisition["id"] for requisition in res])
+        client.requisitions.list.assert_has_calls(
+            [
+                unittest.mock.call(limit=2, offset=None),
+                unittest.mock.call(limit=2, offset=2),
+                unittest.mock.call(limit=2, offset=4),
+            ]
+        )
+
+    def test_stops_once_matched(self):
+        client = paginated_client(self.pages)
+
+        res = list(iter_requisitions(client, references={"ref-1", "ref-3"}, limit=2))
+
+        self.assertEqual([1, 2, 3], [requisition["id"] for requisition in res])
+        self.assertEqual(2, client.requisitions.list.call_count)
+
+    def test_get_requisitions_matches_later_pages(self):
+        client = paginated_client(self.pages)
+        logger = MagicMock()
+        configs = [{"enduser_id": "ref", "institution_id": "4"}]
+
+        res = get_requisitions(
+            client=client, configs=configs, logger=logger, const={"INSTITUTION_ID": "institution_id"}
+        )
+
+        self.assertEqual([4], [requisition["id"] for requisition in res])
+        client.requisitions.create.assert_not_called()
+
+
 class TestGetAccount(unittest.TestCase):
     def test_request_error(self):
         fn = MagicMock()
@@ -117,6 +348,17 @@ class TestGetAccount(unittest.TestCase):
         self.assertEqual(321, res["iban"])
 
 
+class TestGetTransactions(unittest.TestCase):
+    def test_date_from(self):
+        client = MagicMock()
+
+        res = get_transactions(client, "account-1", "2024-01-01")
+
+        client.url.assert_called_once_with(fragment="accounts/account-1/transactions")
+        client.get.assert_called_once_with(client.url.return_value, params={"date_from": "2024-01-01"})
+        self.assertEqual(client.get.return_value, res)
+
+
 class TestRequisition(unittest.TestCase):
     def test_non_match(self):
         res = matched_requisition("ref", [])
@@ -144,6 +386,12 @@ class TestRequisition(unittest.TestCase):
         )
         self.assertEqual({"reference": "erf"}, res)
 
+    def test_index(self):
+        index = reference_index([{"reference": "ref"}, {"reference": "fer"}], requisition_reference)
+
+        self.assertEqual({"reference": "fer"}, matched_requisition("fer", index))
+        self.assertEqual({}, matched_requisition("erf", index))
+
     @unittest.mock.patch("nordigen_lib.ng.matched_requisition")
     def test_get_or_create_requisition_EX(self, mocked_matched_requisition):
         logger = MagicMock()
@@ -337,13 +585,71 @@ class TestGetAccounts(unittest.TestCase):
         client = MagicMock()
         logger = MagicMock()
 
-        HTTPError = requests.exceptions.HTTPError()
-        client.requisitions.list.side_effect = HTTPError
+        error = ServerError("Service unavailable", status_code=503)
+        client.requisitions.list.side_effect = error
 
         res = get_requisitions(client=client, configs={}, logger=logger, const={})
 
         self.assertEqual([], res)
-        logger.error.assert_called_with("Unable to fetch Nordigen requisitions: %s", HTTPError)
+        logger.error.assert_called_with("Unable to fetch Nordigen requisitions: %s", error)
+
+    @unittest.mock.patch("requests.Session.post", side_effect=requests.exceptions.ConnectionError("down"))
+    @unittest.mock.patch("requests.Session.get", side_effect=requests.exceptions.ConnectionError("down"))
+    def test_client_connection_error(self, mocked_get, mocked_post):
+        logger = MagicMock()
+
+        res = get_requisitions(
+            client=get_client(secret_id="id", secret_key="key"),
+            configs=[{"enduser_id": "user", "institution_id": "bank"}],
+            logger=logger,
+            const={},
+        )
+
+        self.assertEqual([], res)
+        self.assertIsInstance(logger.error.call_args_list[0].args[1], UnexpectedError)
+
+    def test_connection_error(self):
+        client = MagicMock()
+        logger = MagicMock()
+
+        error = UnexpectedError("Connection refused")
+        client.requisitions.list.side_effect = error
+
+        res = get_requisitions(client=client, configs={}, logger=logger, const={})
+
+        self.assertEqual([], res)
+        logger.error.assert_called_with("Unable to fetch Nordigen requisitions: %s", error)
+
+    def test_concurrent_keeps_config_order(self):
+        client = MagicMock()
+        logger = MagicMock()
+        client.requisitions.list.return_value = {
+            "results": [{"id": f"req-{i}", "status": "LN", "reference": f"user-{i}"} for i in range(10)]
+        }
+        configs = [{"enduser_id": "user", "institution_id": i} for i in range(10)]
+
+        res = get_requisitions(
+            client=client, configs=configs, logger=logger, const={"INSTITUTION_ID": "institution_id"}, workers=4
+        )
+
+        self.assertEqual([f"req-{i}" for i in range(10)], [requisition["id"] for requisition in res])
+        client.requisitions.create.assert_not_called()
+
+    @unittest.mock.patch("nordigen_lib.ng.get_or_create_requisition")
+    def test_failing_config_is_isolated(self, mocked_get_or_create_requisition):
+        client = MagicMock()
+        logger = MagicMock()
+        client.requisitions.list.return_value = {"results": []}
+        error = requests.exceptions.HTTPError("boom")
+        mocked_get_or_create_requisition.side_effect = [{"id": "req-1"}, error, {"id": "req-3"}]
+        configs = [{"enduser_id": "user", "institution_id": i} for i in range(1, 4)]
+
+        res = get_requisitions(
+            client=client, configs=configs, logger=logger, const={"INSTITUTION_ID": "institution_id"}
+        )
+
+        self.assertEqual([{"id": "req-1"}, {"id": "req-3"}], res)
+        logger.error.assert_called_with("Unable to setup Nordigen requisition %s: %s", "user-2", error)
 
     def test_key_error(self):
         fn = MagicMock()
@@ -390,6 +696,27 @@ class TestGetAccounts(unittest.TestCase):
             res,
         )
 
+    def test_concurrent_keeps_order(self):
+        logger = MagicMock()
+
+        def fn(account_id):
+            return {"account": {"iban": f"iban-{account_id}"}}
+
+        requisition = {"id": "req-1", "accounts": list(range(12))}
+        res = get_accounts(fn=fn, requisition=requisition, logger=logger, ignored=[3], workers=4)
+
+        self.assertEqual([f"iban-{i}" for i in range(12) if i != 3], [account["iban"] for account in res])
+
+    def test_concurrent_filters_failed(self):
+        fn = MagicMock()
+        logger = MagicMock()
+        fn.side_effect = requests.exceptions.HTTPError
+
+        res = get_accounts(fn=fn, requisition={"accounts": [1, 2]}, logger=logger, ignored=[], workers=4)
+
+        self.assertEqual([], res)
+        self.assertEqual(2, fn.call_count)
+
 
 class TestEntry(unittest.TestCase):
     @unittest.mock.patch("nordigen_lib.ng.Client")
@@ -400,10 +727,35 @@ class TestEntry(unittest.TestCase):
 
         self.assertTrue(res)
 
+    @unittest.mock.patch("nordigen_lib.build_async_client")
+    @unittest.mock.patch("nordigen_lib.get_requisitions")
+    @unittest.mock.patch("nordigen_lib.get_client")
+    def test_entry_async_client(self, mocked_get_client, mocked_get_requisitions, mocked_build_async_client):
+        hass = MagicMock()
+        hass.data = {}
+        config = {"foobar": {"secret_id": "xxxx", "secret_key": "yyyy", "requisitions": [], "async_client": True}}
+        const = {
+            "DOMAIN": "foobar",
+            "SECRET_ID": "secret_id",
+            "SECRET_KEY": "secret_key",
+            "REQUISITIONS": "requisitions",
+        }
+
+        entry(hass=hass, config=config, const=const, logger=MagicMock())
+
+        mocked_build_async_client.assert_called_once_with(
+            hass=hass, client=mocked_get_client.return_value, timeout=hass.data["foobar"]["transport"].timeout
+        )
+        self.assertEqual(mocked_build_async_client.return_value, hass.data["foobar"]["async_client"])
+        mocked_build_async_client.return_value.add_response_hook.assert_called_once_with(
+            hass.data["foobar"]["scheduler"].observe
+        )
+
     @unittest.mock.patch("nordigen_lib.get_requisitions")
     @unittest.mock.patch("nordigen_lib.get_client")
     def test_entry(self, mocked_get_client, mocked_get_requisitions):
         hass = MagicMock()
+        hass.data = {}
         client = MagicMock()
         logger = MagicMock()
 
@@ -420,10 +772,62 @@ class TestEntry(unittest.TestCase):
 
         res = entry(hass=hass, config=config, const=const, logger=logger)
 
-        mocked_get_client.assert_called_with(secret_id="xxxx", secret_key="yyyy")
-        mocked_get_requisitions.assert_called_with(client=client, configs="requisitions", logger=logger, const=const)
+        transport = hass.data["foobar"]["transport"]
+        self.assertIsInstance(transport, PooledTransport)
+        mocked_get_client.assert_called_with(secret_id="xxxx", secret_key="yyyy", transport=transport)
+        mocked_get_requisitions.assert_called_with(
+            client=client, configs="requisitions", logger=logger, const=const, workers=1
+        )
         hass.helpers.discovery.load_platform.assert_called_with(
             "sensor", "foobar", {"requisitions": ["requisition"]}, config
         )
+        self.assertIsInstance(hass.data["foobar"]["details_cache"], DetailsCache)
+        hass.config.path.assert_any_call(".storage", "nordigen_details.json")
+        self.assertIsInstance(hass.data["foobar"]["transaction_store"], TransactionStore)
+        self.assertIs(hass.data["foobar"]["transaction_store"], hass.data["foobar"]["aggregates"]._store)
+        hass.config.path.assert_any_call(".storage", "nordigen_transactions.db")
+        self.assertNotIn("async_client", hass.data["foobar"])
+        self.assertIsInstance(hass.data["foobar"]["scheduler"], RateLimitScheduler)
+        self.assertIsInstance(hass.data["foobar"]["resilience"], Resilience)
+        self.assertIsInstance(hass.data["foobar"]["flight"], SingleFlight)
+        self.assertIsInstance(hass.data["foobar"]["stagger"], Stagger)
+        self.assertIsInstance(hass.data["foobar"]["poller"], RequisitionPoller)
+        self.assertIsInstance(hass.data["foobar"]["changes"], ChangeDetector)
+        self.assertIsInstance(hass.data["foobar"]["transactions"], TransactionSync)
+        self.assertIsInstance(hass.data["foobar"]["balance_history"], BalanceHistory)
+        self.assertEqual([hass.data["foobar"]["scheduler"].observe], transport._hooks)
+        token_store = hass.data["foobar"]["token_store"]
+        self.assertIsInstance(token_store, TokenStore)
+        hass.helpers.event.track_time_interval.assert_called_with(token_store.refresh_ahead, TOKEN_REFRESH_INTERVAL)
 
         self.assertTrue(res)
+
+
+class TestAsyncEntry:
+    @pytest.mark.asyncio
+    async def test_not_configured(self):
+        logger = MagicMock()
+
+        res = await async_entry(hass=None, config={}, const={"DOMAIN": "foo"}, logger=logger)
+
+        logger.warning.assert_called_with("Nordigen not configured")
+        assert res is True
+
+    @unittest.mock.patch("nordigen_lib.setup_domain")
+    @pytest.mark.asyncio
+    async def test_background_bootstrap(self, mocked_setup_domain):
+        hass = MagicMock()
+        hass.data = {}
+        hass.async_add_executor_job = AsyncMock(side_effect=lambda fn, *args: fn(*args))
+        mocked_setup_domain.side_effect = lambda hass, domain_config, const: hass.data.setdefault("foobar", {})
+        config = {"foobar": {"requisitions": []}}
+
+        res = await async_entry(hass=hass, config=config, const={"DOMAIN": "foobar"}, logger=MagicMock())
+
+        assert res is True
+        mocked_setup_domain.assert_called_once_with(hass, config["foobar"], {"DOMAIN": "foobar"})
+        assert isinstance(hass.data["foobar"]["bootstrap"], Bootstrap)
+        task = hass.async_create_task.call_args.args[0]
+        assert task.cr_code.co_name == "run"
+        task.close()
+        hass.helpers.discovery.load_platform.assert_not_called()
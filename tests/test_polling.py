@@ -0,0 +1,62 @@
+import unittest
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from nordigen_lib.polling import FAST_INTERVAL, LINKED_INTERVAL, MAX_INTERVAL, RequisitionPoller
+
+case = unittest.TestCase()
+
+
+class TestRequisitionPoller(unittest.TestCase):
+    def setUp(self):
+        self.poller = RequisitionPoller()
+
+    def test_backs_off_while_unchanged(self):
+        intervals = [self.poller.interval("req-1", "CR") for _ in range(5)]
+
+        self.assertEqual([timedelta(seconds=s) for s in [15, 30, 60, 120, 240]], intervals)
+
+    def test_capped(self):
+        intervals = [self.poller.interval("req-1", "CR") for _ in range(20)]
+
+        self.assertEqual(MAX_INTERVAL, intervals[-1])
+
+    def test_snaps_back_on_status_change(self):
+        for _ in range(5):
+            self.poller.interval("req-1", "CR")
+
+        self.assertEqual(FAST_INTERVAL, self.poller.interval("req-1", "UA"))
+
+    def test_linked(self):
+        self.poller.interval("req-1", "UA")
+
+        self.assertEqual(LINKED_INTERVAL, self.poller.interval("req-1", "LN"))
+        self.assertEqual(LINKED_INTERVAL, self.poller.interval("req-1", "LN"))
+
+    def test_pauses_terminal(self):
+        self.assertIsNone(self.poller.interval("req-1", "EX"))
+        self.assertTrue(self.poller.counters["req-1"]["paused"])
+
+    def test_counters_per_requisition(self):
+        for _ in range(3):
+            self.poller.interval("req-1", "CR")
+        self.poller.interval("req-2", "CR")
+
+        # 15s, 30s and 60s intervals save 0, 1 and 3 polls of the fixed 15s loop.
+        self.assertEqual({"polls": 3, "saved": 4, "paused": False}, self.poller.counters["req-1"])
+        self.assertEqual({"polls": 1, "saved": 0, "paused": False}, self.poller.counters["req-2"])
+
+
+class TestRequisitionPollerWrap:
+    @pytest.mark.asyncio
+    async def test_sets_interval(self):
+        poller = RequisitionPoller()
+        coordinator = MagicMock()
+        updater = AsyncMock(return_value={"status": "LN"})
+
+        update = poller.wrap(coordinator, updater, "req-1")
+
+        case.assertEqual({"status": "LN"}, await update())
+        case.assertEqual(LINKED_INTERVAL, coordinator.update_interval)
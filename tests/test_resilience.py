@@ -0,0 +1,142 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+import requests
+from apiclient.exceptions import ClientError, ServerError
+from parameterized import parameterized
+
+from nordigen_lib.resilience import CircuitBreaker, CircuitOpenError, Resilience, backoff_delays, is_retryable
+
+case = unittest.TestCase()
+
+
+def response_error(status):
+    return aiohttp.ClientResponseError(MagicMock(), (), status=status)
+
+
+class TestIsRetryable(unittest.TestCase):
+    @parameterized.expand(
+        [
+            (ServerError("500"), True),
+            (ClientError("404"), False),
+            (requests.exceptions.ConnectionError(), True),
+            (requests.exceptions.Timeout(), True),
+            (asyncio.TimeoutError(), True),
+            (aiohttp.ClientConnectionError(), True),
+            (response_error(503), True),
+            (response_error(400), False),
+            (KeyError("balances"), False),
+        ]
+    )
+    def test_is_retryable(self, error, expected):
+        self.assertEqual(expected, is_retryable(error))
+
+
+class TestBackoff(unittest.TestCase):
+    def test_exponential_capped(self):
+        res = backoff_delays(5, base=1, cap=10, rand=lambda low, high: high)
+
+        self.assertEqual([1, 2, 4, 8, 10], res)
+
+    def test_jitter(self):
+        for delay in backoff_delays(10, base=1, cap=10):
+            self.assertTrue(0 <= delay <= 10)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = MagicMock(return_value=1000)
+        self.breaker = CircuitBreaker(threshold=2, reset_timeout=60, clock=self.clock)
+
+    def test_opens_after_threshold(self):
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+
+        self.breaker.record_failure()
+        self.assertEqual("open", self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_single_trial(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.return_value += 60
+
+        self.assertEqual("half_open", self.breaker.state)
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+    def test_success_closes(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+
+        self.assertEqual("closed", self.breaker.state)
+        self.assertEqual(0, self.breaker.failures)
+
+
+@patch("nordigen_lib.resilience.time.sleep")
+class TestResilience(unittest.TestCase):
+    def resilience(self, **kwargs):
+        return Resilience(**{"retries": 2, "threshold": 2, "clock": MagicMock(return_value=1000), **kwargs})
+
+    def test_success(self, mocked_sleep):
+        resilience = self.resilience()
+        fn = MagicMock(return_value="ok")
+
+        self.assertEqual("ok", resilience.wrap("bank", fn)("id"))
+        fn.assert_called_once_with("id")
+        mocked_sleep.assert_not_called()
+
+    def test_retries_transient_errors(self, mocked_sleep):
+        resilience = self.resilience()
+        fn = MagicMock(side_effect=[ServerError("500"), ServerError("502"), "ok"])
+
+        self.assertEqual("ok", resilience.call("bank", fn, "id"))
+        self.assertEqual(2, mocked_sleep.call_count)
+        self.assertEqual({"calls": 1, "retries": 2, "failures": 0, "short_circuits": 0}, resilience.counters)
+
+    def test_client_error_not_retried(self, mocked_sleep):
+        resilience = self.resilience()
+        fn = MagicMock(side_effect=ClientError("404"))
+
+        with self.assertRaises(ClientError):
+            resilience.call("bank", fn)
+
+        fn.assert_called_once()
+        self.assertEqual("closed", resilience.breaker("bank").state)
+
+    def test_outage_opens_circuit(self, mocked_sleep):
+        resilience = self.resilience()
+        fn = MagicMock(side_effect=ServerError("500"))
+
+        for _ in range(2):
+            with self.assertRaises(ServerError):
+                resilience.call("bank", fn)
+
+        with self.assertRaises(CircuitOpenError):
+            resilience.call("bank", fn)
+
+        self.assertEqual(6, fn.call_count)
+        self.assertEqual(1, resilience.counters["short_circuits"])
+        self.assertTrue(resilience.breaker("other-bank").allow())
+
+
+class TestAsyncResilience:
+    @pytest.mark.asyncio
+    @patch("nordigen_lib.resilience.asyncio.sleep")
+    async def test_retries(self, mocked_sleep):
+        resilience = Resilience(retries=2)
+
+        async def balances(account_id):
+            return await inner(account_id)
+
+        inner = AsyncMock(side_effect=[aiohttp.ClientConnectionError(), {"balances": []}])
+        wrapped = resilience.wrap("bank", balances)
+
+        case.assertTrue(asyncio.iscoroutinefunction(wrapped))
+        case.assertEqual({"balances": []}, await wrapped("id"))
+        mocked_sleep.assert_called_once()
+        case.assertEqual(1, resilience.counters["retries"])
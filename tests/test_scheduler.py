@@ -0,0 +1,125 @@
+import unittest
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from parameterized import parameterized
+
+from nordigen_lib.scheduler import RateLimitScheduler, header
+
+case = unittest.TestCase()
+
+URL = "https://bankaccountdata.gocardless.com/api/v2/accounts/account-1/balances/"
+
+
+def response(url=URL, **headers):
+    return MagicMock(url=url, headers=headers)
+
+
+class TestHeader(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ({"X-RateLimit-Account-Success-Remaining": "3"}, "3"),
+            ({"HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_REMAINING": "3"}, "3"),
+            ({"X-RateLimit-Remaining": "3"}, None),
+            ({}, None),
+        ]
+    )
+    def test_header(self, headers, expected):
+        self.assertEqual(expected, header(headers, "x-ratelimit-account-success-remaining"))
+
+
+class TestRateLimitScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = MagicMock(return_value=1000)
+        self.scheduler = RateLimitScheduler(reserve=1, clock=self.clock)
+
+    def test_observe(self):
+        self.scheduler.observe(
+            response(
+                **{
+                    "HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_REMAINING": "3",
+                    "HTTP_X_RATELIMIT_ACCOUNT_SUCCESS_RESET": "600",
+                }
+            )
+        )
+
+        self.assertEqual((3, 600), self.scheduler.budget("account-1", "balances"))
+        self.assertEqual(None, self.scheduler.budget("account-1", "details"))
+
+    @parameterized.expand(
+        [
+            ("https://example.com/api/v2/requisitions/req-1/", {"X-RateLimit-Account-Success-Remaining": "3"}),
+            (URL, {"X-RateLimit-Account-Success-Remaining": "3"}),
+            (URL, {}),
+        ]
+    )
+    def test_observe_ignored(self, url, headers):
+        self.scheduler.observe(response(url, **headers))
+
+        self.assertEqual({}, self.scheduler._budgets)
+
+    def test_unknown_budget(self):
+        self.assertTrue(self.scheduler.allow("account-1", "balances"))
+        self.assertEqual(timedelta(minutes=5), self.scheduler.interval("account-1", "balances", timedelta(minutes=5)))
+
+    def test_budget_spread_until_reset(self):
+        self.scheduler.record("account-1", "balances", remaining=4, reset=6 * 3600)
+
+        self.assertTrue(self.scheduler.allow("account-1", "balances"))
+        self.assertEqual(timedelta(hours=2), self.scheduler.interval("account-1", "balances", timedelta(minutes=5)))
+
+    def test_plenty_of_budget_keeps_default(self):
+        self.scheduler.record("account-1", "balances", remaining=1000, reset=3600)
+
+        self.assertEqual(timedelta(minutes=5), self.scheduler.interval("account-1", "balances", timedelta(minutes=5)))
+
+    def test_exhausted_budget(self):
+        self.scheduler.record("account-1", "balances", remaining=1, reset=3600)
+
+        self.assertFalse(self.scheduler.allow("account-1", "balances"))
+        self.assertEqual(timedelta(hours=1), self.scheduler.interval("account-1", "balances", timedelta(minutes=5)))
+
+    def test_budget_reset(self):
+        self.scheduler.record("account-1", "balances", remaining=0, reset=60)
+        self.clock.return_value += 60
+
+        self.assertTrue(self.scheduler.allow("account-1", "balances"))
+
+
+class TestSchedulerUpdates:
+    @pytest.mark.asyncio
+    async def test_guard_calls(self):
+        scheduler = RateLimitScheduler(clock=MagicMock(return_value=1000))
+        scheduler.record("account-1", "balances", remaining=5, reset=4 * 3600)
+        updater = AsyncMock(return_value={"expected": 1})
+
+        update = scheduler.guard(updater, "account-1", "balances", MagicMock(return_value=None))
+
+        case.assertEqual({"expected": 1}, await update())
+        case.assertEqual(0, scheduler.deferred)
+
+    @pytest.mark.asyncio
+    async def test_guard_defers_when_exhausted(self):
+        scheduler = RateLimitScheduler(clock=MagicMock(return_value=1000))
+        scheduler.record("account-1", "balances", remaining=1, reset=3600)
+        updater = AsyncMock()
+
+        update = scheduler.guard(updater, "account-1", "balances", MagicMock(return_value={"expected": 1}))
+
+        case.assertEqual({"expected": 1}, await update())
+        updater.assert_not_called()
+        case.assertEqual(1, scheduler.deferred)
+
+    @pytest.mark.asyncio
+    async def test_pace_uses_tightest_account(self):
+        scheduler = RateLimitScheduler(clock=MagicMock(return_value=1000))
+        scheduler.record("account-1", "balances", remaining=5, reset=4 * 3600)
+        scheduler.record("account-2", "balances", remaining=3, reset=4 * 3600)
+        coordinator = MagicMock(data=None)
+        updater = AsyncMock(return_value={"expected": 1})
+
+        update = scheduler.pace(coordinator, updater, ["account-1", "account-2"], "balances", timedelta(minutes=5))
+
+        case.assertEqual({"expected": 1}, await update())
+        case.assertEqual(timedelta(hours=2), coordinator.update_interval)
@@ -1,20 +1,46 @@
 import unittest
+from datetime import timedelta
+from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from homeassistant.helpers.update_coordinator import UpdateFailed
 
+from nordigen_lib.account import AccountMetadata
+from nordigen_lib.changes import ChangeDetector
+from nordigen_lib.history import BalanceHistory
 from nordigen_lib.sensor import (
+    AccountBatch,
     BalanceSensor,
     RequisitionSensor,
+    SpendingSensor,
+    TopMerchantsSensor,
+    balance_fn,
+    balance_parser,
     balance_update,
-    build_account_sensors,
+    batch_update,
+    build_batch_account_sensors,
     build_coordinator,
     build_requisition_sensor,
     build_sensors,
+    build_spending_sensors,
+    call_api,
+    coalesced,
+    first_refresh,
+    get_api,
+    logged,
+    persist,
     random_balance,
     requisition_update,
+    resilient,
+    share_release,
+    spending_update,
+    state_changed,
+    transaction_update,
+    transaction_updater,
+    transactions_fn,
 )
+from nordigen_lib.transactions import TRANSACTION_INTERVAL, TransactionSync
 from . import AsyncMagicMock
 
 case = unittest.TestCase()
@@ -40,6 +66,7 @@ class TestBuildCoordinator(unittest.TestCase):
         self.assertEqual(res.update_method, updater)
         self.assertEqual(res.update_interval, interval)
         self.assertEqual(res.name, "nordigen-balance-ref")
+        self.assertFalse(res.always_update)
 
     def test_listners(self):
         hass = MagicMock()
@@ -52,6 +79,331 @@ class TestBuildCoordinator(unittest.TestCase):
         self.assertEqual([], res._listeners)
 
 
+class TestStateChanged(unittest.TestCase):
+    def build_entity(self, changes):
+        entity = MagicMock(_domain="domain", unique_id="unique_id")
+        entity.hass.data = {"domain": {"changes": changes} if changes else {}}
+        return entity
+
+    def test_without_detector(self):
+        self.assertTrue(state_changed(self.build_entity(None), 1.0))
+
+    def test_detector(self):
+        changes = MagicMock()
+
+        res = state_changed(self.build_entity(changes), 1.0)
+
+        changes.changed.assert_called_once_with("unique_id", 1.0)
+        self.assertIs(changes.changed.return_value, res)
+
+
+class TestFirstRefresh:
+    @pytest.mark.asyncio
+    async def test_without_stagger(self):
+        hass = MagicMock()
+        hass.data = {"domain": {}}
+        coordinator = MagicMock(async_config_entry_first_refresh=AsyncMock())
+
+        await first_refresh(hass, {"DOMAIN": "domain"}, coordinator, "key", timedelta(minutes=5))
+
+        coordinator.async_config_entry_first_refresh.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_staggered(self):
+        hass = MagicMock()
+        stagger = MagicMock(delay=AsyncMock())
+        hass.data = {"domain": {"stagger": stagger}}
+        coordinator = MagicMock(async_refresh=AsyncMock())
+        updater = coordinator.update_method
+
+        await first_refresh(hass, {"DOMAIN": "domain"}, coordinator, "key", timedelta(minutes=5))
+
+        stagger.spread.assert_called_once_with(coordinator, updater, "key", timedelta(minutes=5))
+        case.assertIs(stagger.spread.return_value, coordinator.update_method)
+        stagger.delay.assert_not_called()
+        coordinator.async_refresh.assert_not_called()
+
+        await hass.async_create_task.call_args.args[0]
+
+        stagger.delay.assert_awaited_once_with("key", timedelta(minutes=5))
+        coordinator.async_refresh.assert_awaited_once()
+        coordinator.async_config_entry_first_refresh.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_staggered_without_spread(self):
+        hass = MagicMock()
+        stagger = MagicMock(delay=AsyncMock())
+        hass.data = {"domain": {"stagger": stagger}}
+        coordinator = MagicMock(async_refresh=AsyncMock())
+
+        await first_refresh(hass, {"DOMAIN": "domain"}, coordinator, "key", timedelta(seconds=15), spread=False)
+        await hass.async_create_task.call_args.args[0]
+
+        stagger.spread.assert_not_called()
+        stagger.delay.assert_awaited_once_with("key", timedelta(seconds=15))
+
+
+BALANCE_ACCOUNT = {
+    "id": "account-1",
+    "iban": "iban",
+    "bban": "bban",
+    "unique_ref": "unique_ref",
+    "name": "name",
+    "owner": "owner",
+    "currency": "EUR",
+    "product": "product",
+    "status": "status",
+    "bic": "bic",
+    "requisition": {"reference": "ref"},
+}
+
+
+def transactions_executor(fn, *args):
+    """Run the jobs persisting transactions, answer the API calls with one booked transaction."""
+    return fn(*args) if fn is persist else {"transactions": {"booked": [{"transactionId": "tx-1"}]}}
+
+
+class TestTransactionUpdate:
+    @pytest.mark.asyncio
+    async def test_publishes_new(self):
+        sync = MagicMock()
+        sync.date_from.return_value = "2024-01-01"
+        sync.merge.return_value = ["tx-1", "tx-2"]
+        executor = AsyncMagicMock(return_value={"transactions": {}})
+        fn = MagicMock()
+        publish = MagicMock()
+
+        update = transaction_update(MagicMock(), executor, fn, "account-1", sync, 30, publish)
+
+        case.assertEqual(["tx-1", "tx-2"], await update())
+        sync.date_from.assert_called_once_with("account-1", 30)
+        executor.assert_called_once_with(fn, "account-1", "2024-01-01")
+        sync.merge.assert_called_once_with("account-1", {"transactions": {}}, "2024-01-01")
+        publish.assert_called_once_with("account-1", ["tx-1", "tx-2"])
+
+    @pytest.mark.asyncio
+    async def test_stores_new(self):
+        sync = MagicMock()
+        sync.merge.return_value = ["tx-1"]
+        executor = AsyncMagicMock(return_value={"transactions": {}})
+        store = MagicMock()
+
+        update = transaction_update(MagicMock(), executor, MagicMock(), "account-1", sync, 30, MagicMock(), store)
+        await update()
+
+        executor.assert_called_with(persist, store, None, "account-1", ["tx-1"])
+
+    @pytest.mark.asyncio
+    async def test_records_new_in_executor(self):
+        sync = MagicMock()
+        sync.merge.return_value = ["tx-1"]
+        executor = AsyncMagicMock(return_value={"transactions": {}})
+        publish = MagicMock()
+        record = MagicMock()
+
+        update = transaction_update(MagicMock(), executor, MagicMock(), "account-1", sync, 30, publish, record=record)
+        await update()
+
+        executor.assert_called_with(persist, None, record, "account-1", ["tx-1"])
+        record.assert_not_called()
+        publish.assert_called_once_with("account-1", ["tx-1"])
+
+    def test_persist(self):
+        store = MagicMock()
+        record = MagicMock()
+
+        persist(store, record, "account-1", ["tx-1"])
+        persist(None, None, "account-1", ["tx-2"])
+
+        store.upsert.assert_called_once_with("account-1", ["tx-1"])
+        record.assert_called_once_with("account-1", ["tx-1"])
+
+    @pytest.mark.asyncio
+    async def test_restores_from_store(self):
+        sync = MagicMock()
+        sync.restored.return_value = False
+        sync.merge.return_value = []
+        executor = AsyncMagicMock(return_value={"transactions": {}})
+        store = MagicMock()
+
+        update = transaction_update(MagicMock(), executor, MagicMock(), "account-1", sync, 30, MagicMock(), store)
+        await update()
+
+        case.assertEqual(unittest.mock.call(sync.restore, "account-1", store), executor.call_args_list[0])
+
+    @pytest.mark.asyncio
+    async def test_exception(self):
+        sync = MagicMock()
+        executor = AsyncMagicMock(side_effect=Exception("whoops"))
+
+        update = transaction_update(MagicMock(), executor, MagicMock(), "account-1", sync, 30, MagicMock())
+
+        with case.assertRaises(UpdateFailed):
+            await update()
+        sync.merge.assert_not_called()
+
+
+class TestTransactionSetup:
+    const = {"DOMAIN": "domain", "SYNC_TRANSACTIONS": "sync_transactions", "HISTORICAL_DAYS": "historical_days"}
+
+    def test_transactions_fn_blocking(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock()}}
+
+        fn = transactions_fn(hass, self.const, {})
+        fn("account-1", "2024-01-01")
+
+        hass.data["domain"]["client"].account.get.assert_called_once()
+
+    def test_transactions_fn_async(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock(), "async_client": MagicMock()}}
+
+        case.assertIs(hass.data["domain"]["async_client"].account.transactions, transactions_fn(hass, self.const, {}))
+
+    def test_updater_guarded(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock()}}
+        scheduler = MagicMock()
+        account = {"id": "account-1", "config": {}}
+
+        res = transaction_updater(hass, MagicMock(), account, self.const, MagicMock(), scheduler, MagicMock())
+
+        case.assertEqual(("account-1", "transactions", list), scheduler.guard.call_args.args[1:])
+        case.assertIs(scheduler.guard.return_value, res)
+
+    @pytest.mark.asyncio
+    async def test_logged(self):
+        logger = MagicMock()
+
+        await logged(logger, AsyncMock(side_effect=UpdateFailed("whoops")))()
+
+        logger.warning.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock(), "transactions": MagicMock()}}
+
+        res = await build_spending_sensors(hass, MagicMock(), [{"id": "account-1", "config": {}}], self.const)
+
+        case.assertEqual([], res)
+        hass.helpers.event.async_track_time_interval.assert_not_called()
+
+    @unittest.mock.patch("nordigen_lib.sensor.build_coordinator")
+    @pytest.mark.asyncio
+    async def test_enabled(self, mocked_build_coordinator):
+        hass = MagicMock()
+        sync = TransactionSync()
+        aggregates = MagicMock()
+        hass.data = {"domain": {"client": MagicMock(), "transactions": sync, "aggregates": aggregates}}
+        hass.async_add_executor_job = AsyncMock(side_effect=transactions_executor)
+        coordinator = mocked_build_coordinator.return_value
+        coordinator.async_config_entry_first_refresh = AsyncMock()
+        coordinator.async_request_refresh = AsyncMock()
+        accounts = [
+            {**BALANCE_ACCOUNT, "config": {"sync_transactions": True, "historical_days": 7, "transaction_events": True}}
+        ]
+
+        entities = await build_spending_sensors(hass, MagicMock(), accounts, {**self.const, "ICON": {}})
+
+        case.assertEqual(
+            ["spent_this_month", "average_daily_outflow", "top_merchants"], [entity.balance_type for entity in entities]
+        )
+        case.assertIsInstance(entities[-1], TopMerchantsSensor)
+        case.assertEqual("ref-spending", mocked_build_coordinator.call_args.kwargs["reference"])
+        coordinator.async_config_entry_first_refresh.assert_awaited_once()
+        sync_job, interval = hass.helpers.event.async_track_time_interval.call_args.args
+        case.assertEqual(TRANSACTION_INTERVAL, interval)
+        hass.async_create_task.call_args.args[0].close()
+
+        await sync_job()
+
+        aggregates.add.assert_called_once_with("account-1", [{"transactionId": "tx-1"}])
+        hass.bus.async_fire.assert_called_once_with(
+            "domain_transaction", {"account_id": "account-1", "transactionId": "tx-1"}
+        )
+        coordinator.async_request_refresh.assert_awaited_once()
+
+        for entity in entities:
+            entity.async_remove = AsyncMock()
+            await entity.async_will_remove_from_hass()
+
+        hass.helpers.event.async_track_time_interval.return_value.assert_called_once_with()
+
+    def test_share_release(self):
+        unsubscribe = MagicMock()
+        entities = [MagicMock(), MagicMock()]
+
+        case.assertIs(entities, share_release(entities, unsubscribe))
+
+        entities[0]._release()
+        unsubscribe.assert_not_called()
+        entities[1]._release()
+        unsubscribe.assert_called_once_with()
+
+    @unittest.mock.patch("nordigen_lib.sensor.CoordinatorEntity.async_will_remove_from_hass")
+    @pytest.mark.asyncio
+    async def test_removed_without_release(self, mocked_will_remove):
+        sensor = SpendingSensor(
+            domain="domain",
+            icons={},
+            coordinator=MagicMock(),
+            balance_type="spentThisMonth",
+            config={},
+            **BALANCE_ACCOUNT,
+        )
+
+        await sensor.async_will_remove_from_hass()
+
+        mocked_will_remove.assert_awaited_once()
+
+    @unittest.mock.patch("nordigen_lib.sensor.build_coordinator")
+    @pytest.mark.asyncio
+    async def test_events_off_by_default(self, mocked_build_coordinator):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock(), "transactions": TransactionSync(), "aggregates": MagicMock()}}
+        hass.async_add_executor_job = AsyncMock(side_effect=transactions_executor)
+        coordinator = mocked_build_coordinator.return_value
+        coordinator.async_config_entry_first_refresh = AsyncMock()
+        coordinator.async_request_refresh = AsyncMock()
+        accounts = [{**BALANCE_ACCOUNT, "config": {"sync_transactions": True}}]
+
+        await build_spending_sensors(hass, MagicMock(), accounts, {**self.const, "ICON": {}})
+        hass.async_create_task.call_args.args[0].close()
+        sync_job, _ = hass.helpers.event.async_track_time_interval.call_args.args
+        await sync_job()
+
+        hass.data["domain"]["aggregates"].add.assert_called_once_with("account-1", [{"transactionId": "tx-1"}])
+        hass.bus.async_fire.assert_not_called()
+
+    @unittest.mock.patch("nordigen_lib.sensor.build_coordinator")
+    @pytest.mark.asyncio
+    async def test_shared_metadata(self, mocked_build_coordinator):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock(), "transactions": TransactionSync()}}
+        mocked_build_coordinator.return_value.async_config_entry_first_refresh = AsyncMock()
+        accounts = [{**BALANCE_ACCOUNT, "config": {"sync_transactions": True}}]
+        metadata = [AccountMetadata(**accounts[0])]
+
+        entities = await build_spending_sensors(hass, MagicMock(), accounts, {**self.const, "ICON": {}}, metadata)
+        hass.async_create_task.call_args.args[0].close()
+
+        case.assertTrue(all(entity._account is metadata[0] for entity in entities))
+
+    @pytest.mark.asyncio
+    async def test_spending_update(self):
+        aggregates = MagicMock()
+        aggregates.summary.side_effect = lambda account_id: {"spentThisMonth": account_id}
+        executor = AsyncMock(side_effect=lambda job: job())
+
+        res = await spending_update(executor, aggregates, ["account-1", "account-2"])()
+
+        case.assertEqual(
+            {"account-1": {"spentThisMonth": "account-1"}, "account-2": {"spentThisMonth": "account-2"}}, res
+        )
+
+
 class TestRequisitionUpdate:
     @pytest.mark.asyncio
     async def test_return(self):
@@ -68,6 +420,22 @@ class TestRequisitionUpdate:
             {"id": "req-id"},
         )
 
+    @pytest.mark.asyncio
+    async def test_records_history(self):
+        executor = AsyncMagicMock()
+        executor.return_value = {
+            "balances": [{"balanceAmount": {"amount": 123, "currency": "SEK"}, "balanceType": "interimAvailable"}]
+        }
+        history = BalanceHistory(clock=lambda: 1.0)
+
+        res = balance_update(
+            logger=MagicMock(), async_executor=executor, fn=MagicMock(), account_id="id", history=history
+        )
+        await res()
+
+        case.assertEqual([(1.0, 123.0)], history.buffer("id", "interimAvailable").window(0))
+        case.assertIsNone(history.buffer("id", "expected"))
+
     @pytest.mark.asyncio
     async def test_exception(self):
         executor = AsyncMagicMock()
@@ -136,9 +504,152 @@ class TestBalanceUpdate:
             await res()
 
 
+class TestBalanceParser:
+    def test_configured(self):
+        account = {"config": {"balance_types": ["interimBooked"], "decimal_amounts": True}}
+        const = {"BALANCE_TYPES": "balance_types"}
+
+        res = balance_parser(MagicMock(), account, const).parse(
+            [{"balanceAmount": {"amount": "1.5"}, "balanceType": "interimBooked"}]
+        )
+
+        case.assertEqual({"interimBooked": Decimal("1.50")}, res)
+
+
+class TestBatchUpdate:
+    @pytest.mark.asyncio
+    async def test_return(self):
+        updaters = {
+            "account-1": AsyncMock(return_value={"interimAvailable": 1}),
+            "account-2": AsyncMock(return_value={"interimAvailable": 2}),
+        }
+
+        res = await batch_update(logger=MagicMock(), updaters=updaters)()
+
+        case.assertEqual({"account-1": {"interimAvailable": 1}, "account-2": {"interimAvailable": 2}}, res)
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_keeps_previous(self):
+        logger = MagicMock()
+        updaters = {
+            "account-1": AsyncMock(side_effect=[{"interimAvailable": 1}, {"interimAvailable": 10}]),
+            "account-2": AsyncMock(side_effect=[{"interimAvailable": 2}, UpdateFailed("whoops")]),
+        }
+        update = batch_update(logger=logger, updaters=updaters)
+
+        await update()
+        res = await update()
+
+        case.assertEqual({"account-1": {"interimAvailable": 10}, "account-2": {"interimAvailable": 2}}, res)
+        logger.warning.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_removed_account(self):
+        updaters = {
+            "account-1": AsyncMock(return_value={"interimAvailable": 1}),
+            "account-2": AsyncMock(return_value={"interimAvailable": 2}),
+        }
+        update = batch_update(logger=MagicMock(), updaters=updaters)
+
+        await update()
+        del updaters["account-2"]
+        res = await update()
+
+        case.assertEqual({"account-1": {"interimAvailable": 1}}, res)
+
+    @pytest.mark.asyncio
+    async def test_all_failed(self):
+        logger = MagicMock()
+        updaters = {
+            "account-1": AsyncMock(side_effect=UpdateFailed("whoops")),
+            "account-2": AsyncMock(side_effect=UpdateFailed("whoops")),
+        }
+
+        with case.assertRaises(UpdateFailed):
+            await batch_update(logger=logger, updaters=updaters)()
+
+        case.assertEqual(2, logger.warning.call_count)
+
+
+class TestApi:
+    def test_get_api_blocking(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": "client"}}
+
+        case.assertEqual("client", get_api(hass, {"DOMAIN": "domain"}))
+
+    def test_get_api_async(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": "client", "async_client": "async_client"}}
+
+        case.assertEqual("async_client", get_api(hass, {"DOMAIN": "domain"}))
+
+    def test_resilient_without_layer(self):
+        hass = MagicMock()
+        hass.data = {"domain": {}}
+        fn = MagicMock()
+
+        case.assertIs(fn, resilient(hass, {"DOMAIN": "domain"}, {}, fn))
+
+    def test_resilient(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"resilience": MagicMock()}}
+        fn = MagicMock()
+
+        res = resilient(hass, {"DOMAIN": "domain", "INSTITUTION_ID": "institution_id"}, {"institution_id": "bank"}, fn)
+
+        hass.data["domain"]["resilience"].wrap.assert_called_once_with("bank", fn)
+        case.assertIs(hass.data["domain"]["resilience"].wrap.return_value, res)
+
+    def test_coalesced_without_flight(self):
+        hass = MagicMock()
+        hass.data = {"domain": {}}
+        fn = MagicMock()
+
+        case.assertIs(fn, coalesced(hass, {"DOMAIN": "domain"}, "balances", fn))
+
+    def test_coalesced(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"flight": MagicMock()}}
+        fn = MagicMock()
+
+        res = coalesced(hass, {"DOMAIN": "domain"}, "balances", fn)
+
+        hass.data["domain"]["flight"].wrap.assert_called_once_with("balances", fn)
+        case.assertIs(hass.data["domain"]["flight"].wrap.return_value, res)
+
+    def test_balance_fn(self):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock()}}
+
+        res = balance_fn(hass, {"DOMAIN": "domain"}, {"config": {}}, False)
+
+        case.assertIs(hass.data["domain"]["client"].account.balances, res)
+        case.assertIs(random_balance, balance_fn(hass, {"DOMAIN": "domain"}, {"config": {}}, True))
+
+    @pytest.mark.asyncio
+    async def test_call_api_async(self):
+        executor = AsyncMagicMock()
+
+        async def fn(account_id):
+            return {"id": account_id}
+
+        case.assertEqual({"id": "id"}, await call_api(executor, fn, "id"))
+        executor.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_call_api_blocking(self):
+        executor = AsyncMagicMock()
+        executor.return_value = {"id": "id"}
+        fn = MagicMock()
+
+        case.assertEqual({"id": "id"}, await call_api(executor, fn, "id"))
+        executor.assert_called_once_with(fn, "id")
+
+
 class TestBuildSensors:
     @unittest.mock.patch("nordigen_lib.sensor.build_requisition_sensor")
-    @unittest.mock.patch("nordigen_lib.sensor.build_account_sensors")
+    @unittest.mock.patch("nordigen_lib.sensor.build_batch_account_sensors")
     @pytest.mark.asyncio
     async def test_build_sensors_unconfirmed(self, mocked_build_account_sensors, mocked_build_requisition_sensor):
         args = {
@@ -156,196 +667,89 @@ class TestBuildSensors:
         mocked_build_requisition_sensor.assert_called_with(**args)
 
 
-class TestBuildAccountSensors:
-    def build_sensors_helper(self, account, const, debug=False):
-        hass = MagicMock()
-        logger = MagicMock()
+class TestBuildBatchAccountSensors:
+    const = {
+        "REFRESH_RATE": "refresh_rate",
+        "BALANCE_TYPES": "balance_types",
+        "DOMAIN": "domain",
+        "ICON": "icon",
+    }
 
-        return dict(hass=hass, logger=logger, account=account, const=const, debug=debug)
+    def accounts(self):
+        return [
+            {
+                "config": {"refresh_rate": 5, "balance_types": ["interimAvailable"]},
+                "id": account_id,
+                "iban": "iban",
+                "bban": "bban",
+                "unique_ref": account_id,
+                "name": "name",
+                "owner": "owner",
+                "currency": "currency",
+                "product": "product",
+                "status": "status",
+                "bic": "bic",
+                "requisition": {"reference": "ref"},
+            }
+            for account_id in ["account-1", "account-2"]
+        ]
 
-    @unittest.mock.patch("nordigen_lib.sensor.random_balance")
     @unittest.mock.patch("nordigen_lib.sensor.build_coordinator")
-    @unittest.mock.patch("nordigen_lib.sensor.balance_update")
     @pytest.mark.asyncio
-    async def test_balance_debug(self, mocked_balance_update, mocked_build_coordinator, mocked_random_balance):
-        account = {
-            "config": {
-                "refresh_rate": 1,
-                "disable": False,
-                "balance_types": [],
-            },
-            "id": "foobar-id",
-            "iban": "iban",
-            "bban": "bban",
-            "unique_ref": "unique_ref",
-            "name": "name",
-            "owner": "owner",
-            "currency": "currency",
-            "product": "product",
-            "status": "status",
-            "bic": "bic",
-            "requisition": "requisition",
-        }
-        const = {
-            "REFRESH_RATE": "refresh_rate",
-            "BALANCE_TYPES": "balance_types",
-            "DOMAIN": "domain",
-            "ICON": "icon",
-        }
-
-        mocked_balance_coordinator = MagicMock()
-        mocked_build_coordinator.return_value = mocked_balance_coordinator
-
-        mocked_balance_coordinator.async_config_entry_first_refresh = AsyncMock()
+    async def test_shared_coordinator(self, mocked_build_coordinator):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock()}}
+        mocked_build_coordinator.return_value.async_config_entry_first_refresh = AsyncMock()
 
-        args = self.build_sensors_helper(account=account, const=const, debug=True)
-        await build_account_sensors(**args)
+        entities = await build_batch_account_sensors(hass, MagicMock(), self.accounts(), self.const, debug=True)
 
-        mocked_balance_update.assert_called_with(
-            logger=args["logger"],
-            async_executor=args["hass"].async_add_executor_job,
-            fn=mocked_random_balance,
-            account_id="foobar-id",
-        )
+        mocked_build_coordinator.assert_called_once()
+        case.assertEqual(timedelta(minutes=5), mocked_build_coordinator.call_args.kwargs["interval"])
+        case.assertEqual(["account-1", "account-2"], [entity._id for entity in entities])
+        case.assertTrue(all(entity._batched for entity in entities))
+        case.assertTrue(all(entity.coordinator is mocked_build_coordinator.return_value for entity in entities))
 
     @unittest.mock.patch("nordigen_lib.sensor.build_coordinator")
-    @unittest.mock.patch("nordigen_lib.sensor.balance_update")
     @pytest.mark.asyncio
-    async def test_balance(self, mocked_balance_update, mocked_build_coordinator):
-        account = {
-            "config": {
-                "refresh_rate": 1,
-                "disable": False,
-            },
-            "id": "foobar-id",
-            "iban": "iban",
-            "bban": "bban",
-            "unique_ref": "unique_ref",
-            "name": "name",
-            "owner": "owner",
-            "currency": "currency",
-            "product": "product",
-            "status": "status",
-            "bic": "bic",
-            "requisition": "requisition",
-        }
-        const = {
-            "DOMAIN": "domain",
-            "REFRESH_RATE": "refresh_rate",
-            "ICON": "icon",
-            "BALANCE_TYPES": "balance_types",
-        }
-
-        mocked_balance_coordinator = MagicMock()
-        mocked_build_coordinator.return_value = mocked_balance_coordinator
-
-        mocked_balance_coordinator.async_config_entry_first_refresh = AsyncMock()
-
-        args = self.build_sensors_helper(account=account, const=const)
-        await build_account_sensors(**args)
-
-        mocked_balance_update.assert_called_with(
-            logger=args["logger"],
-            async_executor=args["hass"].async_add_executor_job,
-            fn=args["hass"].data["domain"]["client"].account.balances,
-            account_id="foobar-id",
-        )
-
-    @unittest.mock.patch("nordigen_lib.sensor.BalanceSensor")
-    @unittest.mock.patch("nordigen_lib.sensor.random_balance")
-    @unittest.mock.patch("nordigen_lib.sensor.build_coordinator")
-    @unittest.mock.patch("nordigen_lib.sensor.timedelta")
-    @unittest.mock.patch("nordigen_lib.sensor.balance_update")
-    @pytest.mark.asyncio
-    async def test_available_entities(
-        self,
-        mocked_balance_update,
-        mocked_timedelta,
-        mocked_build_coordinator,
-        mocked_random_balance,
-        mocked_nordigen_balance_sensor,
-    ):
-        account = {
-            "config": {
-                "refresh_rate": 1,
-                "balance_types": ["interimAvailable"],
-            },
-            "id": "foobar-id",
-        }
-        const = {
-            "ICON": {},
-            "DOMAIN": "domain",
-            "REFRESH_RATE": "refresh_rate",
-            "BALANCE_TYPES": "balance_types",
-        }
+    async def test_reused_coordinator(self, mocked_build_coordinator):
+        hass = MagicMock()
+        hass.data = {"domain": {"client": MagicMock()}}
+        coordinator = mocked_build_coordinator.return_value
+        coordinator.async_config_entry_first_refresh = AsyncMock()
+        coordinator.async_request_refresh = AsyncMock()
+        first, later = self.accounts()
+        batch = AccountBatch()
 
-        mocked_balance_coordinator = MagicMock()
-        mocked_build_coordinator.return_value = mocked_balance_coordinator
+        await build_batch_account_sensors(hass, MagicMock(), [first], self.const, debug=True, batch=batch)
+        entities = await build_batch_account_sensors(hass, MagicMock(), [later], self.const, debug=True, batch=batch)
 
-        mocked_balance_coordinator.async_config_entry_first_refresh = AsyncMock()
+        mocked_build_coordinator.assert_called_once()
+        coordinator.async_request_refresh.assert_awaited_once()
+        case.assertTrue(all(entity.coordinator is coordinator for entity in entities))
+        case.assertEqual(["account-1", "account-2"], list(batch.updaters))
 
-        args = self.build_sensors_helper(account=account, const=const)
-        res = await build_account_sensors(**args)
+        batch.remove("account-1")
+        batch.remove("account-3")
 
-        assert 1 == len(res)
-        mocked_nordigen_balance_sensor.assert_called_with(
-            **{
-                "id": "foobar-id",
-                "balance_type": "interimAvailable",
-                "config": {"refresh_rate": 1, "balance_types": ["interimAvailable"]},
-                "coordinator": mocked_balance_coordinator,
-                "domain": "domain",
-                "icons": {},
-            }
-        )
+        case.assertEqual(["account-2"], list(batch.updaters))
 
-    @unittest.mock.patch("nordigen_lib.sensor.BalanceSensor")
-    @unittest.mock.patch("nordigen_lib.sensor.random_balance")
     @unittest.mock.patch("nordigen_lib.sensor.build_coordinator")
-    @unittest.mock.patch("nordigen_lib.sensor.timedelta")
-    @unittest.mock.patch("nordigen_lib.sensor.balance_update")
-    @pytest.mark.asyncio
-    async def test_booked_entities(
-        self,
-        mocked_balance_update,
-        mocked_timedelta,
-        mocked_build_coordinator,
-        mocked_random_balance,
-        mocked_nordigen_balance_sensor,
-    ):
-        account = {
-            "id": "foobar-id",
-            "config": {
-                "refresh_rate": 1,
-                "balance_types": ["interimBooked"],
-            },
-        }
-        const = {
-            "ICON": {},
-            "DOMAIN": "domain",
-            "REFRESH_RATE": "refresh_rate",
-            "BALANCE_TYPES": "balance_types",
-        }
-
-        mocked_balance_coordinator = MagicMock()
-        mocked_build_coordinator.return_value = mocked_balance_coordinator
-
-        mocked_balance_coordinator.async_config_entry_first_refresh = AsyncMock()
+    @pytest.mark.asyncio
+    async def test_scheduler(self, mocked_build_coordinator):
+        hass = MagicMock()
+        scheduler = MagicMock()
+        hass.data = {"domain": {"client": MagicMock(), "scheduler": scheduler}}
+        coordinator = mocked_build_coordinator.return_value
+        coordinator.async_config_entry_first_refresh = AsyncMock()
+        coordinator.data = {"account-2": "previous"}
 
-        args = self.build_sensors_helper(account=account, const=const)
-        res = await build_account_sensors(**args)
+        await build_batch_account_sensors(hass, MagicMock(), self.accounts(), self.const, debug=True)
 
-        assert 1 == len(res)
-        mocked_nordigen_balance_sensor.assert_called_with(
-            **{
-                "id": "foobar-id",
-                "balance_type": "interimBooked",
-                "config": {"refresh_rate": 1, "balance_types": ["interimBooked"]},
-                "coordinator": mocked_balance_coordinator,
-                "domain": "domain",
-                "icons": {},
-            }
-        )
+        case.assertEqual(2, scheduler.guard.call_count)
+        last = [call.args[3] for call in scheduler.guard.call_args_list]
+        case.assertEqual([None, "previous"], [fn() for fn in last])
+        case.assertEqual(["account-1", "account-2"], list(scheduler.pace.call_args.args[2]))
+        case.assertIs(scheduler.pace.return_value, coordinator.update_method)
 
 
 class TestSensors(unittest.TestCase):
@@ -387,7 +791,37 @@ class TestSensors(unittest.TestCase):
         for k in self.data:
             if k in ["coordinator"]:
                 continue
-            self.assertEqual(getattr(sensor, f"_{k}"), self.data[k])
+            if k in AccountMetadata._fields:
+                self.assertEqual(getattr(sensor._account, k), self.data[k])
+            else:
+                self.assertEqual(getattr(sensor, f"_{k}"), self.data[k])
+
+    def test_init_shared_account(self):
+        account = AccountMetadata(**{k: self.data[k] for k in AccountMetadata._fields})
+        sensors = [
+            BalanceSensor(
+                domain="domain", icons={}, coordinator=MagicMock(), balance_type=balance_type, account=account
+            )
+            for balance_type in ["interimAvailable", "expected"]
+        ]
+
+        self.assertTrue(all(sensor._account is account for sensor in sensors))
+        self.assertEqual("account_id", sensors[0]._id)
+
+    def test_account_values_shared(self):
+        account = AccountMetadata(**{k: self.data[k] for k in AccountMetadata._fields})
+        first, second = (
+            BalanceSensor(
+                domain="domain", icons={}, coordinator=MagicMock(), balance_type=balance_type, account=account
+            )
+            for balance_type in ["interimAvailable", "expected"]
+        )
+
+        self.assertIs(first.device_info, second.device_info)
+        self.assertIs(account.static_attributes, account.static_attributes)
+        self.assertEqual("interimAvailable", first._build_attributes()["balance_type"])
+        self.assertEqual("expected", second._build_attributes()["balance_type"])
+        self.assertNotIn("device_info", vars(first))
 
     def test_device_info(self):
         sensor = BalanceSensor(**self.data)
@@ -429,7 +863,7 @@ class TestSensors(unittest.TestCase):
         self.assertEqual("unique_ref (interim_whatever)", sensor.name)
 
     def test_state(self):
-        ret = {"interimWhatever": "123.990"}
+        ret = {"interimWhatever": 123.99}
         self.data["coordinator"].data.__getitem__.side_effect = ret.__getitem__
 
         sensor = BalanceSensor(**self.data)
@@ -444,6 +878,40 @@ class TestSensors(unittest.TestCase):
 
         self.assertEqual(None, sensor.state)
 
+    def test_state_before_first_refresh(self):
+        sensor = BalanceSensor(**{**self.data, "coordinator": MagicMock(data=None)})
+
+        self.assertEqual(None, sensor.state)
+
+    def test_batched_state(self):
+        coordinator = MagicMock(data={"account_id": {"interimWhatever": 123.99}})
+
+        sensor = BalanceSensor(**{**self.data, "coordinator": coordinator, "batched": True})
+
+        self.assertEqual(123.99, sensor.state)
+
+    def test_batched_state_missing_account(self):
+        coordinator = MagicMock(data={})
+
+        sensor = BalanceSensor(**{**self.data, "coordinator": coordinator, "batched": True})
+
+        self.assertEqual(None, sensor.state)
+
+    def test_handle_coordinator_update(self):
+        coordinator = MagicMock(data={"account_id": {"interimWhatever": 1.0}})
+        sensor = BalanceSensor(**{**self.data, "coordinator": coordinator, "batched": True})
+        sensor.hass = MagicMock()
+        sensor.hass.data = {"domain": {"changes": ChangeDetector()}}
+        sensor.async_write_ha_state = MagicMock()
+
+        sensor._handle_coordinator_update()
+        sensor._handle_coordinator_update()
+        coordinator.data = {"account_id": {"interimWhatever": 2.0}}
+        sensor._handle_coordinator_update()
+
+        self.assertEqual(2, sensor.async_write_ha_state.call_count)
+        self.assertEqual({"writes": 2, "suppressed": 1}, sensor.hass.data["domain"]["changes"].counters)
+
     def test_unit_of_measurement(self):
         sensor = BalanceSensor(**self.data)
 
@@ -489,6 +957,79 @@ class TestSensors(unittest.TestCase):
             sensor.state_attributes,
         )
 
+    @unittest.mock.patch("nordigen_lib.sensor.snake")
+    def test_properties_cached(self, mocked_snake):
+        mocked_snake.return_value = "interim_whatever"
+        sensor = BalanceSensor(**self.data)
+
+        for _ in range(2):
+            self.assertEqual("unique_ref-interim_whatever", sensor.unique_id)
+            self.assertEqual("owner name (interim_whatever)", sensor.name)
+
+        # Once for the unique id and once for the name, not again on the second reads.
+        self.assertEqual(2, mocked_snake.call_count)
+        self.assertIs(sensor.device_info, sensor.device_info)
+
+    def test_state_attributes_cached_per_update(self):
+        coordinator = MagicMock(data={"account_id": {"interimWhatever": 1.0}})
+        sensor = BalanceSensor(**{**self.data, "coordinator": coordinator, "batched": True})
+        sensor.hass = MagicMock()
+        sensor.hass.data = {"domain": {}}
+        sensor.async_write_ha_state = MagicMock()
+
+        attributes = sensor.state_attributes
+        self.assertIs(attributes, sensor.state_attributes)
+
+        sensor._handle_coordinator_update()
+
+        self.assertIsNot(attributes, sensor.state_attributes)
+
+    def test_state_attributes_history(self):
+        sensor = BalanceSensor(**self.data)
+        sensor.hass = MagicMock()
+        history = BalanceHistory(clock=lambda: 0.0)
+        history.record("account_id", {"interimWhatever": 1.0})
+        sensor.hass.data = {"domain": {"balance_history": history}}
+
+        case.assertEqual(0.0, sensor.state_attributes["delta_24h"])
+        case.assertIsNone(sensor.state_attributes["trend_7d"])
+
+
+class TestSpendingSensors(unittest.TestCase):
+    def build(self, cls, kind, data):
+        coordinator = MagicMock(data={"account-1": data})
+        return cls(
+            domain="domain",
+            icons={},
+            coordinator=coordinator,
+            balance_type=kind,
+            config={},
+            batched=True,
+            **BALANCE_ACCOUNT,
+        )
+
+    def test_spending_state(self):
+        sensor = self.build(SpendingSensor, "spentThisMonth", {"spentThisMonth": 0.0})
+
+        self.assertEqual(0.0, sensor.state)
+        self.assertEqual("unique_ref-spent_this_month", sensor.unique_id)
+        self.assertEqual("EUR", sensor.unit_of_measurement)
+
+    def test_top_merchants(self):
+        merchants = [{"merchant": "Shop", "amount": 10.0}, {"merchant": "Cafe", "amount": 5.0}]
+        sensor = self.build(TopMerchantsSensor, "topMerchants", {"topMerchants": merchants})
+
+        self.assertEqual("Shop", sensor.state)
+        self.assertEqual(merchants, sensor.state_attributes["merchants"])
+        self.assertEqual(merchants, sensor._fingerprint())
+        self.assertIsNone(sensor.unit_of_measurement)
+
+    def test_top_merchants_empty(self):
+        sensor = self.build(TopMerchantsSensor, "topMerchants", {})
+
+        self.assertIsNone(sensor.state)
+        self.assertEqual([], sensor.state_attributes["merchants"])
+
 
 class TestRequisitionSensor(unittest.TestCase):
     mocked_client = MagicMock()
@@ -558,6 +1099,15 @@ class TestRequisitionSensor(unittest.TestCase):
 
         self.assertEqual(False, sensor.state)
 
+    def test_state_before_first_refresh(self):
+        mocked_coordinator = MagicMock()
+        mocked_coordinator.data = None
+
+        sensor = RequisitionSensor(**{**self.data, "coordinator": mocked_coordinator})
+
+        self.assertEqual(False, sensor.state)
+        self.assertEqual({"status": None, "accounts": None}, sensor._fingerprint())
+
     def test_unconfirmed_icon(self):
         sensor = RequisitionSensor(**self.data)
 
@@ -594,7 +1144,7 @@ class TestRequisitionSensor(unittest.TestCase):
             sensor.state_attributes,
         )
 
-    @unittest.mock.patch("nordigen_lib.sensor.build_account_sensors")
+    @unittest.mock.patch("nordigen_lib.sensor.build_batch_account_sensors")
     @unittest.mock.patch("nordigen_lib.sensor.datetime")
     def test_unconfirmed_state_attributes_linked(self, mocked_datatime, mocked_build_account_sensors):
         mocked_datatime.now.return_value = "last_update"
@@ -638,14 +1188,13 @@ class TestAccountSensorSetup:
         "details": "details",
     }
 
-    @unittest.mock.patch("nordigen_lib.sensor.build_account_sensors")
+    @unittest.mock.patch("nordigen_lib.sensor.build_batch_account_sensors")
     @unittest.mock.patch("nordigen_lib.sensor.datetime")
     @pytest.mark.asyncio
     async def test_setup_account_sensors_new(self, mocked_datatime, mocked_build_account_sensors):
         mocked_datatime.now.return_value = "last_update"
-        mocked_build_account_sensors.return_value = [
-            "account-sensor-1",
-        ]
+        entity = MagicMock(_id="account-1")
+        mocked_build_account_sensors.return_value = [entity]
         mocked_coordinator = AsyncMagicMock()
         mocked_coordinator.data = {"accounts": ["account-1", "account-2"], "status": "LN"}
         sensor = RequisitionSensor(**{**self.data, "coordinator": mocked_coordinator})
@@ -656,6 +1205,7 @@ class TestAccountSensorSetup:
         mocked_client = AsyncMagicMock()
         sensor.hass.async_add_executor_job.return_value = [
             {
+                "id": "account-1",
                 "balance_type": "whatever",
                 "iban": "iban",
                 "unique_ref": "unique_ref",
@@ -669,38 +1219,45 @@ class TestAccountSensorSetup:
                 "last_update": "last_update",
             }
         ]
-        await sensor._setup_account_sensors(client=mocked_client, accounts=["account-1"], ignored=[])
+        settled = await sensor._setup_account_sensors(client=mocked_client, accounts=["account-1"], ignored=[])
 
+        assert ["account-1"] == settled
+        assert 1 == sensor._account_workers
         build_call = {
-            "account": {
-                "balance_type": "whatever",
-                "iban": "iban",
-                "unique_ref": "unique_ref",
-                "name": "name",
-                "owner": "owner",
-                "product": "product",
-                "status": "status",
-                "bic": "bic",
-                "enduser_id": "req-user-id",
-                "reference": "req-ref",
-                "last_update": "last_update",
-                "config": "config",
-                "requisition": {
-                    'details': 'details',
-                    'id': 'account_id',
-                    'reference': 'reference',
+            "accounts": [
+                {
+                    "id": "account-1",
+                    "balance_type": "whatever",
+                    "iban": "iban",
+                    "unique_ref": "unique_ref",
+                    "name": "name",
+                    "owner": "owner",
+                    "product": "product",
+                    "status": "status",
+                    "bic": "bic",
+                    "enduser_id": "req-user-id",
+                    "reference": "req-ref",
+                    "last_update": "last_update",
+                    "config": "config",
+                    "requisition": {
+                        "details": "details",
+                        "id": "account_id",
+                        "reference": "reference",
+                    },
                 }
-            },
-            'const': {},
-            'debug': 'debug',
+            ],
+            "const": {},
+            "debug": "debug",
             "hass": sensor.hass,
             "logger": self.mocked_logger,
+            "batch": sensor._batch,
         }
         mocked_build_account_sensors.assert_called_once_with(**build_call)
-        sensor.platform.async_add_entities.assert_called_once_with(["account-sensor-1"])
+        sensor.platform.async_add_entities.assert_called_once_with([entity])
+        assert {"account-1": [entity]} == sensor._account_entities
 
     @unittest.mock.patch("nordigen_lib.sensor.get_accounts")
-    @unittest.mock.patch("nordigen_lib.sensor.build_account_sensors")
+    @unittest.mock.patch("nordigen_lib.sensor.build_batch_account_sensors")
     @unittest.mock.patch("nordigen_lib.sensor.datetime")
     @pytest.mark.asyncio
     async def test_setup_account_sensors_existing(
@@ -720,6 +1277,7 @@ class TestAccountSensorSetup:
 
         sensor.hass.async_add_executor_job.return_value = [
             {
+                "id": "account-1",
                 "balance_type": "whatever",
                 "iban": "iban",
                 "unique_ref": "zzz",
@@ -734,11 +1292,276 @@ class TestAccountSensorSetup:
             }
         ]
         mocked_client = AsyncMagicMock()
-        await sensor._setup_account_sensors(client=mocked_client, accounts=["account-1"], ignored=[])
+        settled = await sensor._setup_account_sensors(
+            client=mocked_client, accounts=["account-1", "ignored"], ignored=["ignored"]
+        )
 
+        assert ["ignored", "account-1"] == settled
         mocked_build_account_sensors.assert_not_called()
         sensor.platform.async_add_entities.assert_not_called()
 
+    @unittest.mock.patch("nordigen_lib.sensor.async_get_accounts")
+    @pytest.mark.asyncio
+    async def test_fetch_accounts_async_client(self, mocked_async_get_accounts):
+        mocked_async_get_accounts.return_value = [{"unique_ref": "ref"}]
+        sensor = RequisitionSensor(**{**self.data, "account_workers": 3})
+        sensor.hass = MagicMock()
+
+        async def details(account_id):
+            pass  # pragma: no cover
+
+        client = MagicMock()
+        client.account.details = details
+
+        res = await sensor._fetch_accounts(client=client, accounts=["account-1"], ignored=[])
+
+        assert [{"unique_ref": "ref"}] == res
+        mocked_async_get_accounts.assert_called_once_with(
+            async_executor=sensor.hass.async_add_executor_job,
+            fn=details,
+            requisition={"id": "account_id", "accounts": ["account-1"]},
+            logger=self.mocked_logger,
+            ignored=[],
+            workers=3,
+            cache=None,
+        )
+        sensor.hass.async_add_executor_job.assert_not_called()
+
+    @unittest.mock.patch("nordigen_lib.sensor.get_accounts")
+    @pytest.mark.asyncio
+    async def test_fetch_accounts_resilience(self, mocked_get_accounts):
+        resilience = MagicMock()
+        sensor = RequisitionSensor(
+            **{**self.data, "resilience": resilience, "config": {"bank": "bank-1"}, "const": {"INSTITUTION_ID": "bank"}}
+        )
+        sensor.hass = MagicMock()
+        sensor.hass.async_add_executor_job = AsyncMock(side_effect=lambda job: job())
+        client = MagicMock()
+
+        await sensor._fetch_accounts(client=client, accounts=["account-1"], ignored=[])
+
+        resilience.wrap.assert_called_once_with("bank-1", client.account.details)
+        assert mocked_get_accounts.call_args.kwargs["fn"] == resilience.wrap.return_value
+
+    @unittest.mock.patch("nordigen_lib.sensor.get_accounts")
+    @pytest.mark.asyncio
+    async def test_fetch_accounts_flight(self, mocked_get_accounts):
+        flight = MagicMock()
+        sensor = RequisitionSensor(**{**self.data, "flight": flight})
+        sensor.hass = MagicMock()
+        sensor.hass.async_add_executor_job = AsyncMock(side_effect=lambda job: job())
+        client = MagicMock()
+
+        await sensor._fetch_accounts(client=client, accounts=["account-1"], ignored=[])
+
+        flight.wrap.assert_called_once_with("details", client.account.details)
+        assert mocked_get_accounts.call_args.kwargs["fn"] == flight.wrap.return_value
+
+
+class TestAccountDiscovery:
+    data = {
+        "domain": "foobar",
+        "id": "req-id",
+        "reference": "reference",
+        "link": "link",
+        "icons": {},
+        "config": "config",
+        "client": "client",
+        "logger": MagicMock(),
+        "ignored_accounts": ["ignored"],
+        "const": {},
+        "details": "details",
+    }
+
+    def build_sensor(self, status="LN", accounts=("account-1", "account-2")):
+        coordinator = MagicMock()
+        coordinator.data = {"status": status, "accounts": list(accounts)}
+        sensor = RequisitionSensor(**{**self.data, "coordinator": coordinator})
+        sensor.hass = MagicMock()
+        sensor._discover = MagicMock()
+        return sensor
+
+    def test_not_linked(self):
+        sensor = self.build_sensor(status="CR")
+
+        sensor._schedule_discovery()
+
+        sensor._discover.assert_not_called()
+        sensor.hass.async_create_task.assert_not_called()
+
+    def test_linked(self):
+        sensor = self.build_sensor()
+
+        sensor._schedule_discovery()
+
+        sensor._discover.assert_called_once_with(["account-1", "account-2"], [])
+        sensor.hass.async_create_task.assert_called_once_with(sensor._discover.return_value)
+
+    def test_steady_state(self):
+        sensor = self.build_sensor()
+        sensor._discovered = ["account-2", "account-1"]
+
+        sensor._schedule_discovery()
+
+        sensor._discover.assert_not_called()
+
+    def test_in_flight(self):
+        sensor = self.build_sensor()
+
+        sensor._schedule_discovery()
+        sensor._schedule_discovery()
+
+        sensor._discover.assert_called_once()
+
+    def test_changed_accounts(self):
+        sensor = self.build_sensor(accounts=["account-2", "account-3"])
+        sensor._discovered = ["account-1", "account-2"]
+
+        sensor._schedule_discovery()
+
+        sensor._discover.assert_called_once_with(["account-3"], ["account-1"])
+        case.assertTrue(sensor._discovering)
+
+    def test_unlinked(self):
+        sensor = self.build_sensor(status="EX")
+        sensor._discovered = ["account-1", "account-2"]
+
+        sensor._schedule_discovery()
+
+        sensor._discover.assert_called_once_with([], ["account-1", "account-2"])
+
+    def test_handle_coordinator_update(self):
+        sensor = self.build_sensor()
+        sensor.async_write_ha_state = MagicMock()
+
+        sensor._handle_coordinator_update()
+
+        sensor._discover.assert_called_once()
+        sensor.async_write_ha_state.assert_called_once()
+
+    def test_handle_coordinator_update_unchanged(self):
+        sensor = self.build_sensor()
+        sensor.hass.data = {"foobar": {"changes": ChangeDetector()}}
+        sensor.async_write_ha_state = MagicMock()
+
+        sensor._handle_coordinator_update()
+        sensor._handle_coordinator_update()
+
+        sensor.async_write_ha_state.assert_called_once()
+
+    @unittest.mock.patch("nordigen_lib.sensor.CoordinatorEntity.async_added_to_hass")
+    @pytest.mark.asyncio
+    async def test_added_to_hass(self, mocked_added_to_hass):
+        sensor = self.build_sensor()
+
+        await sensor.async_added_to_hass()
+
+        mocked_added_to_hass.assert_awaited_once()
+        sensor._discover.assert_called_once_with(["account-1", "account-2"], [])
+
+    @unittest.mock.patch("nordigen_lib.sensor.CoordinatorEntity.async_added_to_hass")
+    @pytest.mark.asyncio
+    async def test_added_to_hass_bootstrap(self, mocked_added_to_hass):
+        sensor = self.build_sensor()
+        bootstrap = MagicMock()
+        sensor.hass.data = {"foobar": {"bootstrap": bootstrap}}
+
+        await sensor.async_added_to_hass()
+
+        bootstrap.entity_added.assert_called_once_with()
+
+    @pytest.mark.asyncio
+    async def test_discover(self):
+        sensor = RequisitionSensor(**{**self.data, "coordinator": MagicMock()})
+        sensor._setup_account_sensors = AsyncMock(return_value=["account-3"])
+        entity = BalanceSensor(
+            domain="foobar",
+            icons={},
+            coordinator=MagicMock(),
+            balance_type="interimAvailable",
+            config={},
+            **{**BALANCE_ACCOUNT, "id": "account-1", "unique_ref": "iban-1"},
+        )
+        entity.async_remove = AsyncMock()
+        sensor._account_entities = {"account-1": [entity]}
+        sensor._account_sensors = {"iban-1": True}
+        sensor._batch.updaters = {"account-1": MagicMock()}
+        sensor._discovered = ["account-1"]
+        sensor._discovering = True
+
+        await sensor._discover(["account-3"], ["account-1"])
+
+        entity.async_remove.assert_awaited_once()
+        case.assertEqual({}, sensor._account_entities)
+        case.assertEqual({}, sensor._account_sensors)
+        case.assertEqual({}, sensor._batch.updaters)
+        sensor._setup_account_sensors.assert_awaited_once_with(
+            client="client", accounts=["account-3"], ignored=["ignored"]
+        )
+        case.assertEqual(["account-3"], sensor._discovered)
+        case.assertFalse(sensor._discovering)
+
+    @pytest.mark.asyncio
+    async def test_discover_removed_only(self):
+        sensor = RequisitionSensor(**{**self.data, "coordinator": MagicMock()})
+        sensor._setup_account_sensors = AsyncMock()
+
+        sensor._discovered = ["account-1", "account-2"]
+
+        await sensor._discover([], ["account-1"])
+
+        sensor._setup_account_sensors.assert_not_called()
+        case.assertEqual(["account-2"], sensor._discovered)
+
+    @pytest.mark.asyncio
+    async def test_retried_on_unchanged_refresh(self):
+        hass = MagicMock()
+        hass.data = {"foobar": {}}
+        discoveries = []
+        hass.async_create_task.side_effect = discoveries.append
+        coordinator = build_coordinator(
+            hass=hass,
+            logger=MagicMock(),
+            updater=AsyncMock(return_value={"status": "LN", "accounts": ["account-1"]}),
+            interval=timedelta(seconds=15),
+            reference="ref",
+            always_update=True,
+        )
+        sensor = RequisitionSensor(**{**self.data, "coordinator": coordinator})
+        sensor.hass = hass
+        sensor.async_write_ha_state = MagicMock()
+        # The details of the account can not be fetched, so it never settles.
+        sensor._setup_account_sensors = AsyncMock(return_value=[])
+        coordinator.async_add_listener(sensor._handle_coordinator_update)
+
+        for _ in range(2):
+            await coordinator.async_refresh()
+            await discoveries.pop()
+
+        case.assertEqual(2, sensor._setup_account_sensors.await_count)
+        case.assertEqual([], sensor._discovered)
+
+    @pytest.mark.asyncio
+    async def test_discover_partial(self):
+        sensor = RequisitionSensor(**{**self.data, "coordinator": MagicMock()})
+        sensor._setup_account_sensors = AsyncMock(return_value=["account-2"])
+
+        await sensor._discover(["account-2", "account-3"], [])
+
+        case.assertEqual(["account-2"], sensor._discovered)
+
+    @pytest.mark.asyncio
+    async def test_discover_failed(self):
+        sensor = RequisitionSensor(**{**self.data, "coordinator": MagicMock()})
+        sensor._setup_account_sensors = AsyncMock(side_effect=Exception("whoops"))
+        sensor._discovered = ["account-1"]
+        sensor._discovering = True
+
+        await sensor._discover(["account-2"], [])
+
+        case.assertEqual(["account-1"], sensor._discovered)
+        case.assertFalse(sensor._discovering)
+
 
 class TestBuildUnconfirmedSensor:
     @unittest.mock.patch("nordigen_lib.sensor.timedelta")
@@ -746,6 +1569,7 @@ class TestBuildUnconfirmedSensor:
     @pytest.mark.asyncio
     async def test_build_requisition_sensor(self, mocked_build_coordinator, mocked_timedelta):
         hass = MagicMock()
+        hass.data = {"foo": {"client": MagicMock()}}
         logger = MagicMock()
         requisition = {
             "id": "req-id",
@@ -775,5 +1599,32 @@ class TestBuildUnconfirmedSensor:
         sensor = sensors[0]
         assert isinstance(sensor, RequisitionSensor)
         assert sensor.name == "ref-123"
+        assert sensor._account_workers == 4
 
         mocked_timedelta.assert_called_with(seconds=15)
+        assert mocked_build_coordinator.call_args.kwargs["always_update"]
+
+    @unittest.mock.patch("nordigen_lib.sensor.build_coordinator")
+    @pytest.mark.asyncio
+    async def test_build_requisition_sensor_poller(self, mocked_build_coordinator):
+        hass = MagicMock()
+        poller = MagicMock()
+        hass.data = {"foo": {"client": MagicMock(), "poller": poller}}
+        requisition = {
+            "id": "req-id",
+            "reference": "ref-123",
+            "link": "https://whatever.com",
+            "config": {"ignore_accounts": []},
+            "details": "details",
+        }
+        const = {"DOMAIN": "foo", "ICON": {}, "IGNORE_ACCOUNTS": "ignore_accounts"}
+        mocked_coordinator = MagicMock()
+        mocked_coordinator.async_config_entry_first_refresh = AsyncMagicMock()
+        mocked_build_coordinator.return_value = mocked_coordinator
+
+        await build_requisition_sensor(hass, MagicMock(), requisition, const, False)
+
+        poller.wrap.assert_called_once_with(
+            mocked_coordinator, mocked_build_coordinator.call_args.kwargs["updater"], "req-id"
+        )
+        case.assertIs(poller.wrap.return_value, mocked_coordinator.update_method)
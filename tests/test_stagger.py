@@ -0,0 +1,93 @@
+import unittest
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from parameterized import parameterized
+
+from nordigen_lib.stagger import Stagger, stable_fraction
+
+case = unittest.TestCase()
+
+
+class TestStableFraction(unittest.TestCase):
+    @parameterized.expand([("account-1",), ("account-2",), ("req-123",)])
+    def test_range(self, key):
+        self.assertTrue(0 <= stable_fraction(key) < 1)
+
+    def test_deterministic(self):
+        self.assertEqual(stable_fraction("account-1"), stable_fraction("account-1"))
+        self.assertNotEqual(stable_fraction("account-1"), stable_fraction("account-2"))
+
+
+class TestStagger(unittest.TestCase):
+    def test_offset_bounded_by_window(self):
+        stagger = Stagger(window=timedelta(seconds=60))
+
+        offset = stagger.offset("account-1", timedelta(minutes=30))
+
+        self.assertEqual(timedelta(seconds=60) * stable_fraction("account-1"), offset)
+
+    def test_offset_bounded_by_interval(self):
+        stagger = Stagger(window=timedelta(seconds=60))
+
+        offset = stagger.offset("req-123", timedelta(seconds=15))
+
+        self.assertEqual(timedelta(seconds=15) * stable_fraction("req-123"), offset)
+
+    def test_offsets_are_spread(self):
+        stagger = Stagger(window=timedelta(seconds=60))
+
+        offsets = {stagger.offset(f"account-{i}", timedelta(minutes=30)).seconds for i in range(20)}
+
+        self.assertGreater(len(offsets), 10)
+
+
+class TestStaggerAsync:
+    @pytest.mark.asyncio
+    async def test_delay(self):
+        sleep = AsyncMock()
+        stagger = Stagger(window=timedelta(seconds=60), sleep=sleep)
+
+        await stagger.delay("account-1", timedelta(minutes=5))
+
+        sleep.assert_awaited_once_with((timedelta(seconds=60) * stable_fraction("account-1")).total_seconds())
+
+    @pytest.mark.asyncio
+    async def test_spread_jitters_around_interval(self):
+        stagger = Stagger(jitter=0.1)
+        coordinator = MagicMock()
+        updater = AsyncMock(return_value="data")
+        interval = timedelta(minutes=10)
+
+        update = stagger.spread(coordinator, updater, "account-1", interval)
+
+        intervals = []
+        for _ in range(10):
+            case.assertEqual("data", await update())
+            intervals.append(coordinator.update_interval)
+
+        case.assertTrue(all(timedelta(minutes=9) <= i <= timedelta(minutes=11) for i in intervals))
+        case.assertGreater(len(set(intervals)), 1)
+
+    @pytest.mark.asyncio
+    async def test_spread_is_deterministic_per_key(self):
+        stagger = Stagger()
+        first, second = MagicMock(), MagicMock()
+
+        await stagger.spread(first, AsyncMock(), "account-1", timedelta(minutes=10))()
+        await stagger.spread(second, AsyncMock(), "account-1", timedelta(minutes=10))()
+
+        case.assertEqual(first.update_interval, second.update_interval)
+
+    @pytest.mark.asyncio
+    async def test_spread_keeps_inner_interval(self):
+        stagger = Stagger(jitter=0.1)
+        coordinator = MagicMock()
+
+        async def updater():
+            coordinator.update_interval = timedelta(hours=1)
+
+        await stagger.spread(coordinator, updater, "account-1", timedelta(minutes=10))()
+
+        case.assertTrue(timedelta(minutes=54) <= coordinator.update_interval <= timedelta(minutes=66))
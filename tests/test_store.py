@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+
+from nordigen_lib.store import TransactionStore, transaction_row
+
+
+def transaction(id, booked, amount, currency="SEK"):
+    return {
+        "transactionId": id,
+        "bookingDate": booked,
+        "transactionAmount": {"amount": str(amount), "currency": currency},
+    }
+
+
+class TestTransactionRow(unittest.TestCase):
+    def test_row(self):
+        row = transaction_row("account-1", transaction("tx-1", "2024-01-01", "-1.50"))
+
+        self.assertEqual(("account-1", "tx-1", "2024-01-01", -1.5, "SEK"), row[:5])
+
+    def test_without_amount(self):
+        row = transaction_row("account-1", {"transactionId": "tx-1"})
+
+        self.assertEqual(("account-1", "tx-1", None, None, None), row[:5])
+
+
+class TestTransactionStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "transactions.db")
+        self.store = TransactionStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.dir.cleanup()
+
+    def test_wal_and_indexes(self):
+        self.store.upsert("account-1", [])
+        connection = self.store._connect()
+
+        self.assertEqual("wal", connection.execute("PRAGMA journal_mode").fetchone()[0])
+        indexes = {row[1] for row in connection.execute("PRAGMA index_list(transactions)")}
+        self.assertIn("transactions_booking_date", indexes)
+        self.assertIn("transactions_transaction_id", indexes)
+
+    def test_range(self):
+        self.store.upsert(
+            "account-1",
+            [
+                transaction("tx-2", "2024-01-02", 2),
+                transaction("tx-1", "2024-01-01", 1),
+                transaction("tx-3", "2024-01-03", 3),
+            ],
+        )
+        self.store.upsert("account-2", [transaction("tx-9", "2024-01-02", 9)])
+
+        res = self.store.range("account-1", "2024-01-01", "2024-01-02")
+
+        self.assertEqual(["tx-1", "tx-2"], [row["transactionId"] for row in res])
+
+    def test_history(self):
+        self.store.upsert("account-1", [transaction("tx-2", "2024-02-01", 2), transaction("tx-1", "2024-01-01", 1)])
+
+        self.assertEqual(["tx-1", "tx-2"], [row["transactionId"] for row in self.store.history("account-1")])
+        self.assertEqual([], self.store.history("account-2"))
+
+    def test_upsert_updates(self):
+        self.assertEqual(1, self.store.upsert("account-1", [transaction("tx-1", "2024-01-01", 1)]))
+        self.store.upsert("account-1", [transaction("tx-1", "2024-01-01", 5)])
+
+        res = self.store.range("account-1", "2024-01-01", "2024-01-01")
+
+        self.assertEqual([transaction("tx-1", "2024-01-01", 5)], res)
+
+    def test_latest(self):
+        self.store.upsert("account-1", [transaction("tx-1", "2024-01-01", 1), transaction("tx-2", "2024-02-01", 2)])
+
+        self.assertEqual("2024-02-01", self.store.latest("account-1"))
+        self.assertIsNone(self.store.latest("account-2"))
+
+    def test_booked_since(self):
+        self.store.upsert("account-1", [transaction("tx-1", "2024-01-01", 1), transaction("tx-2", "2024-02-01", 2)])
+
+        self.assertEqual({"tx-2": "2024-02-01"}, self.store.booked_since("account-1", "2024-01-15"))
+
+    def test_aggregate(self):
+        self.store.upsert(
+            "account-1",
+            [
+                transaction("tx-1", "2024-01-01", 100),
+                transaction("tx-2", "2024-01-02", -30),
+                transaction("tx-3", "2024-01-03", -20),
+                transaction("tx-4", "2024-02-01", 1000),
+            ],
+        )
+
+        self.assertEqual(
+            {
+                "count": 3,
+                "total": 50.0,
+                "income": 100.0,
+                "expenses": -50.0,
+                "first": "2024-01-01",
+                "last": "2024-01-03",
+            },
+            self.store.aggregate("account-1", "2024-01-01", "2024-01-31"),
+        )
+
+    def test_aggregate_empty(self):
+        self.assertEqual(
+            {"count": 0, "total": 0.0, "income": 0.0, "expenses": 0.0, "first": None, "last": None},
+            self.store.aggregate("account-1", "2024-01-01", "2024-01-31"),
+        )
+
+    def test_persisted(self):
+        self.store.upsert("account-1", [transaction("tx-1", "2024-01-01", 1)])
+        self.store.close()
+
+        reopened = TransactionStore(self.path)
+
+        self.assertEqual(1, reopened.aggregate("account-1", "2024-01-01", "2024-01-01")["count"])
+        reopened.close()
@@ -0,0 +1,114 @@
+import unittest
+from datetime import date
+from unittest.mock import MagicMock
+
+from nordigen_lib.changes import content_hash
+from nordigen_lib.transactions import TransactionSync, booking_date, transaction_id
+
+
+def booked(*transactions, pending=()):
+    return {"transactions": {"booked": list(transactions), "pending": list(pending)}}
+
+
+class TestTransactionId(unittest.TestCase):
+    def test_transaction_id(self):
+        self.assertEqual("tx-1", transaction_id({"transactionId": "tx-1", "internalTransactionId": "int-1"}))
+
+    def test_internal_transaction_id(self):
+        self.assertEqual("int-1", transaction_id({"internalTransactionId": "int-1"}))
+
+    def test_content_hash(self):
+        transaction = {"bookingDate": "2024-01-01", "transactionAmount": {"amount": "1.00"}}
+
+        self.assertEqual(content_hash(transaction).hex(), transaction_id(transaction))
+
+    def test_booking_date(self):
+        self.assertEqual("2024-01-02", booking_date({"valueDate": "2024-01-02"}))
+        self.assertEqual("2024-01-01", booking_date({"bookingDate": "2024-01-01", "valueDate": "2024-01-02"}))
+
+
+class TestTransactionSync(unittest.TestCase):
+    def setUp(self):
+        self.today = date(2024, 3, 10)
+        self.sync = TransactionSync(overlap_days=3, today=lambda: self.today)
+
+    def test_backfill_window(self):
+        self.assertEqual("2024-02-09", self.sync.date_from("account-1", 30))
+        self.assertEqual("2024-03-03", self.sync.date_from("account-1", "7"))
+
+    def test_incremental_from_cursor(self):
+        self.sync.merge("account-1", booked(), "2024-02-09")
+        self.today = date(2024, 3, 11)
+
+        self.assertEqual("2024-03-07", self.sync.date_from("account-1", 30))
+        self.assertEqual("2024-02-10", self.sync.date_from("account-2", 30))
+
+    def test_cursor_bounded_by_window(self):
+        self.sync.merge("account-1", booked(), "2024-02-09")
+
+        self.assertEqual("2024-03-08", self.sync.date_from("account-1", 2))
+
+    def test_deduplicated(self):
+        first = {"transactionId": "tx-1", "bookingDate": "2024-03-09"}
+        second = {"transactionId": "tx-2", "bookingDate": "2024-03-10"}
+
+        self.assertEqual([first], self.sync.merge("account-1", booked(first), "2024-02-09"))
+        self.assertEqual([second], self.sync.merge("account-1", booked(first, second), "2024-03-07"))
+        self.assertEqual(
+            {"syncs": 2, "fetched": 3, "new": 2, "duplicates": 1},
+            self.sync.counters,
+        )
+
+    def test_accounts_are_independent(self):
+        transaction = {"transactionId": "tx-1", "bookingDate": "2024-03-09"}
+        self.sync.merge("account-1", booked(transaction), "2024-02-09")
+
+        self.assertEqual([transaction], self.sync.merge("account-2", booked(transaction), "2024-02-09"))
+
+    def test_forgets_ids_out_of_overlap(self):
+        old = {"transactionId": "tx-1", "bookingDate": "2024-02-10"}
+        recent = {"transactionId": "tx-2", "bookingDate": "2024-03-09"}
+        undated = {"transactionId": "tx-3"}
+        self.sync.merge("account-1", booked(old, recent, undated), "2024-02-09")
+
+        self.sync.merge("account-1", booked(), "2024-03-07")
+
+        self.assertEqual({"tx-2": "2024-03-09", "tx-3": None}, self.sync._seen["account-1"])
+
+    def test_pending(self):
+        self.sync.merge("account-1", booked(pending=[{"transactionAmount": {"amount": "1.00"}}]), "2024-02-09")
+        self.assertEqual([{"transactionAmount": {"amount": "1.00"}}], self.sync.pending["account-1"])
+
+        self.sync.merge("account-1", {}, "2024-03-07")
+        self.assertEqual([], self.sync.pending["account-1"])
+
+    def test_restore(self):
+        store = MagicMock()
+        store.latest.return_value = "2024-03-08"
+        store.booked_since.return_value = {"tx-1": "2024-03-08"}
+
+        self.sync.restore("account-1", store)
+
+        self.assertTrue(self.sync.restored("account-1"))
+        self.assertEqual("2024-03-05", self.sync.date_from("account-1", 30))
+        store.booked_since.assert_called_once_with("account-1", "2024-03-05")
+        self.assertEqual([], self.sync.merge("account-1", booked({"transactionId": "tx-1"}), "2024-03-05"))
+
+    def test_restore_empty_store(self):
+        store = MagicMock()
+        store.latest.return_value = None
+
+        self.sync.restore("account-1", store)
+
+        self.assertTrue(self.sync.restored("account-1"))
+        self.assertEqual("2024-02-09", self.sync.date_from("account-1", 30))
+
+    def test_restore_keeps_cursor(self):
+        self.sync.merge("account-1", booked(), "2024-02-09")
+        store = MagicMock()
+        store.latest.return_value = "2024-01-01"
+
+        self.sync.restore("account-1", store)
+
+        self.assertEqual("2024-03-07", self.sync.date_from("account-1", 30))
+        store.booked_since.assert_not_called()
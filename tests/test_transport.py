@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock
+
+import requests_mock
+
+from nordigen_lib.ng import get_client
+from nordigen_lib.transport import PooledRequestStrategy, PooledTransport
+
+
+class TestPooledTransport(unittest.TestCase):
+    def test_session_shared_between_sub_clients(self):
+        transport = PooledTransport(pool_size=4)
+        client = get_client(secret_id="id", secret_key="key", transport=transport)
+        auth_client = client.account.get_authentication_method()._client
+
+        for sub_client in [client.account, client.requisitions, client.institutions, auth_client]:
+            self.assertIsInstance(sub_client.get_request_strategy(), PooledRequestStrategy)
+            self.assertIs(transport.get_session(), sub_client.get_request_strategy().get_session())
+
+        adapter = transport.get_session().get_adapter("https://bankaccountdata.gocardless.com")
+        self.assertEqual(4, adapter._pool_maxsize)
+        self.assertEqual("gzip, deflate", transport.get_session().headers["Accept-Encoding"])
+
+    def test_token_client(self):
+        transport = PooledTransport()
+        with self.assertWarns(DeprecationWarning):
+            client = get_client(token="token", transport=transport)
+
+        self.assertIs(transport.get_session(), client.account.get_request_strategy().get_session())
+
+    def test_set_session(self):
+        transport = PooledTransport()
+        strategy = PooledRequestStrategy(transport)
+        session = MagicMock()
+        strategy.set_session(session)
+
+        self.assertIs(session, transport.get_session())
+
+    def test_timeout(self):
+        strategy = PooledRequestStrategy(PooledTransport(timeout=2.5))
+
+        self.assertEqual(2.5, strategy._get_request_timeout())
+
+    def test_counters_and_hooks(self):
+        transport = PooledTransport()
+        hook = MagicMock()
+        transport.add_response_hook(hook)
+        client = get_client(secret_id="id", secret_key="key", transport=transport)
+
+        with requests_mock.Mocker() as mocker:
+            mocker.post(
+                "https://bankaccountdata.gocardless.com/api/v2/token/new/",
+                json={"access": "a", "access_expires": 3600, "refresh": "r", "refresh_expires": 86400},
+            )
+            mocker.get(
+                "https://bankaccountdata.gocardless.com/api/v2/accounts/account-1/details/",
+                text='{"account": {}}',
+                headers={"Content-Length": "15"},
+            )
+
+            self.assertEqual({"account": {}}, client.account.details("account-1"))
+
+        stats = transport.stats()
+        self.assertEqual(2, stats["requests"])
+        self.assertEqual(15, stats["wire_bytes"])
+        self.assertTrue(stats["bytes"] > 15)
+        self.assertEqual(2, hook.call_count)
+
+    def test_connection_reuse(self):
+        transport = PooledTransport()
+        adapter = MagicMock()
+        adapter.poolmanager.pools = {"key": MagicMock(num_connections=1)}
+        transport.session = MagicMock()
+        transport.session.adapters = {"https://": adapter, "http://": adapter}
+        transport._counters["requests"] = 5
+
+        stats = transport.stats()
+
+        self.assertEqual(1, stats["connections"])
+        self.assertEqual(4, stats["reused"])